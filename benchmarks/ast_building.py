@@ -0,0 +1,80 @@
+"""
+Measures speed of AST construction from already parsed javalang trees.
+Besides the given Java files, synthetic classes of growing size are generated
+to check that building time scales linearly, including deeply nested expressions.
+Files, which can not be parsed, are counted and reported.
+
+Usage: python3 benchmarks/ast_building.py [--repeat N] [directory]
+"""
+
+from argparse import ArgumentParser
+from collections import Counter
+from pathlib import Path
+from timeit import default_timer
+from typing import List, Tuple
+
+from javalang.parse import parse
+from javalang.tree import CompilationUnit
+
+from veniq.ast_framework import AST
+from veniq.utils.ast_builder import build_ast
+
+from semantic_extraction import report_skipped
+
+
+def generate_class(methods_qty: int, expression_depth: int) -> str:
+    expression = " + ".join(f"a{index % 10}" for index in range(expression_depth))
+    methods = "\n".join(
+        f"    int method{index}(int a0, int a1) {{\n"
+        f"        int a2 = a0 * {index}, a3 = a1, a4 = a2, a5 = a3, a6 = a4, a7 = a5, a8 = a6, a9 = a7;\n"
+        f"        return {expression};\n"
+        f"    }}"
+        for index in range(methods_qty)
+    )
+    return f"class Generated {{\n{methods}\n}}\n"
+
+
+def measure(javalang_asts: List[CompilationUnit], repeat: int) -> Tuple[int, float]:
+    nodes_qty = sum(len(list(AST.build_from_javalang(javalang_ast))) for javalang_ast in javalang_asts)
+    best_time = float("inf")
+    for _ in range(repeat):
+        start_time = default_timer()
+        for javalang_ast in javalang_asts:
+            AST.build_from_javalang(javalang_ast)
+        best_time = min(best_time, default_timer() - start_time)
+    return nodes_qty, best_time
+
+
+def report(title: str, nodes_qty: int, time: float) -> None:
+    print(f"{title:<40} {nodes_qty:>9} nodes {time:>8.3f} s {nodes_qty / time:>12.0f} nodes/s")
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "directory", nargs="?", default=str(Path(__file__).absolute().parent.parent / "test"),
+        help="Directory with Java files, test files are used by default",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs for each measurement")
+    args = parser.parse_args()
+
+    javalang_asts: List[CompilationUnit] = []
+    skipped_files: List[Path] = []
+    for filepath in sorted(Path(args.directory).glob("**/*.java")):
+        try:
+            javalang_asts.append(build_ast(str(filepath)))
+        except Exception:
+            skipped_files.append(filepath)
+    report_skipped("files, which can not be parsed", Counter(str(filepath) for filepath in skipped_files))
+    report(f"{len(javalang_asts)} files from {Path(args.directory).name}", *measure(javalang_asts, args.repeat))
+
+    for methods_qty in (250, 500, 1000, 2000):
+        generated_ast = parse(generate_class(methods_qty, expression_depth=20))
+        report(f"{methods_qty} generated methods", *measure([generated_ast], args.repeat))
+
+    deep_ast = parse(generate_class(methods_qty=1, expression_depth=5000))
+    report("expression with 5000 operands", *measure([deep_ast], args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Measures how ASTNode attributes lookup affects SEMI statements semantic extraction on methods from test Java files.
+Attributes are read by per node type accessors compiled once and, for comparison,
+by a generic lookup, which checks schemas of a node type and resolves references on each access.
+Sources are parsed before measurements, so only work on already built ASTs is timed.
+Files, which can not be parsed, and methods, which are not supported, are counted and reported,
+so they can not make a run look faster silently.
+
+Usage: python3 benchmarks/semantic_extraction.py [--repeat N] [directory]
+"""
+
+from argparse import ArgumentParser
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from timeit import default_timer
+from typing import Any, Callable, Iterator, List, Tuple
+
+from veniq.ast_framework import AST, ASTNode, ASTNodeType
+from veniq.ast_framework._auxiliary_data import (
+    ASTNodeReference,
+    ASTNodeReferences,
+    attributes_by_node_type,
+    common_attributes,
+)
+from veniq.ast_framework.computed_fields_registry import computed_fields_registry
+from veniq.baselines.semi.extract_semantic import extract_method_statements_semantic
+from veniq.utils.ast_builder import build_ast
+
+
+def generic_getattr(node: ASTNode, attribute_name: str) -> Any:
+    """
+    Attribute lookup as it was done before accessors were compiled.
+    """
+    if node.is_fake:
+        return None
+
+    node_type = node._ast._storage.get_type(node.node_index)
+    javalang_fields = attributes_by_node_type[node_type]
+    computed_fields = computed_fields_registry.get_fields(node_type)
+    if (
+        attribute_name not in common_attributes
+        and attribute_name not in javalang_fields
+        and attribute_name not in computed_fields
+    ):
+        raise AttributeError(f"'{node_type}' node does not have '{attribute_name}' attribute.")
+
+    if attribute_name in computed_fields:
+        return computed_fields[attribute_name](node)
+    if attribute_name == "node_type":
+        return node_type
+
+    attribute = node._ast._storage.get_attribute(node.node_index, attribute_name)
+    if isinstance(attribute, ASTNodeReference):
+        return node._ast._get_node(attribute.node_index)
+    elif isinstance(attribute, ASTNodeReferences):
+        return [node._ast._get_node(node_index) for node_index in attribute]
+    elif isinstance(attribute, list):
+        return node._replace_references_with_nodes(attribute)
+    return attribute
+
+
+@contextmanager
+def generic_attributes_lookup() -> Iterator[None]:
+    compiled_getattr = ASTNode.__getattr__
+    ASTNode.__getattr__ = generic_getattr  # type: ignore
+    try:
+        yield
+    finally:
+        ASTNode.__getattr__ = compiled_getattr  # type: ignore
+
+
+def collect_methods_asts(directory: Path) -> Tuple[List[AST], List[Path]]:
+    """
+    Returns ASTs of all methods from Java files of a directory and files, which can not be parsed.
+    """
+    methods_asts: List[AST] = []
+    skipped_files: List[Path] = []
+    for filepath in sorted(directory.glob("**/*.java")):
+        try:
+            ast = AST.build_from_javalang(build_ast(str(filepath)))
+        except Exception:
+            skipped_files.append(filepath)
+            continue
+
+        for method_declaration in ast.get_proxy_nodes(ASTNodeType.METHOD_DECLARATION):
+            methods_asts.append(ast.get_subtree(method_declaration))
+    return methods_asts, skipped_files
+
+
+def report_skipped(title: str, errors: Counter) -> None:
+    print(f"Skipped {title}: {sum(errors.values())}")
+    for error, qty in errors.most_common():
+        print(f"\t{qty} x {error}")
+
+
+def measure(function: Callable[[AST], Any], methods_asts: List[AST], repeat: int) -> float:
+    best_time = float("inf")
+    for _ in range(repeat):
+        start_time = default_timer()
+        for method_ast in methods_asts:
+            function(method_ast)
+        best_time = min(best_time, default_timer() - start_time)
+    return best_time
+
+
+def read_all_attributes(method_ast: AST) -> None:
+    for node in method_ast:
+        for attribute_name in attributes_by_node_type[node.node_type]:
+            getattr(node, attribute_name)
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "directory", nargs="?", default=str(Path(__file__).absolute().parent.parent / "test"),
+        help="Directory with Java files, test files are used by default",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs over all methods")
+    args = parser.parse_args()
+
+    methods_asts, skipped_files = collect_methods_asts(Path(args.directory))
+    supported_methods_asts: List[AST] = []
+    methods_errors: Counter = Counter()
+    for method_ast in methods_asts:
+        try:
+            extract_method_statements_semantic(method_ast)
+            supported_methods_asts.append(method_ast)
+        except Exception as e:
+            methods_errors[f"{type(e).__name__}: {e}"] += 1
+
+    report_skipped("files, which can not be parsed", Counter(str(filepath) for filepath in skipped_files))
+    report_skipped("methods, which are not supported", methods_errors)
+    print(f"Methods: {len(supported_methods_asts)}, best of {args.repeat} runs")
+
+    for title, function in [
+        ("reading all attributes", read_all_attributes),
+        ("semantic extraction", extract_method_statements_semantic),
+    ]:
+        compiled_time = measure(function, supported_methods_asts, args.repeat)
+        with generic_attributes_lookup():
+            generic_time = measure(function, supported_methods_asts, args.repeat)
+        print(f"{title:<25} generic lookup {generic_time:.3f} s, compiled accessors {compiled_time:.3f} s, "
+              f"speedup {generic_time / compiled_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Measures time of each stage of SEMI pipeline on methods from test Java files:
+statements semantic extraction, creation, filtering and ranking of extraction opportunities.
+Each stage is timed separately on results of previous stages computed beforehand.
+The whole pipeline is timed as well, with a single method analysis context shared by all stages.
+Files, which can not be parsed, and methods, which are not supported, are counted and reported.
+
+Usage: python3 benchmarks/semi_pipeline.py [--repeat N] [directory]
+"""
+
+from argparse import ArgumentParser
+from collections import Counter
+from pathlib import Path
+from timeit import default_timer
+from typing import Any, Callable, List, Tuple
+
+from veniq.baselines.semi.create_extraction_opportunities import create_extraction_opportunities
+from veniq.baselines.semi.extract_semantic import extract_method_statements_semantic
+from veniq.baselines.semi.filter_extraction_opportunities import filter_extraction_opportunities
+from veniq.baselines.semi.method_analysis import MethodAnalysis
+from veniq.baselines.semi.rank_extraction_opportunities import rank_extraction_opportunities
+
+from semantic_extraction import collect_methods_asts, report_skipped
+
+
+def measure(stage: Callable[..., Any], arguments: List[Tuple[Any, ...]], repeat: int) -> float:
+    best_time = float("inf")
+    for _ in range(repeat):
+        start_time = default_timer()
+        for stage_arguments in arguments:
+            stage(*stage_arguments)
+        best_time = min(best_time, default_timer() - start_time)
+    return best_time
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "directory", nargs="?", default=str(Path(__file__).absolute().parent.parent / "test"),
+        help="Directory with Java files, test files are used by default",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs over all methods")
+    args = parser.parse_args()
+
+    extraction_arguments = []
+    creation_arguments = []
+    filtering_arguments = []
+    ranking_arguments = []
+    methods_errors: Counter = Counter()
+    methods_asts, skipped_files = collect_methods_asts(Path(args.directory))
+    for method_ast in methods_asts:
+        try:
+            statements_semantic = extract_method_statements_semantic(method_ast)
+            extraction_opportunities = list(create_extraction_opportunities(statements_semantic))
+            filtered_extraction_opportunities = filter_extraction_opportunities(
+                extraction_opportunities, statements_semantic, method_ast
+            )
+        except Exception as e:
+            methods_errors[f"{type(e).__name__}: {e}"] += 1
+            continue
+
+        extraction_arguments.append((method_ast,))
+        creation_arguments.append((statements_semantic,))
+        filtering_arguments.append((extraction_opportunities, statements_semantic, method_ast))
+        ranking_arguments.append((statements_semantic, filtered_extraction_opportunities))
+
+    report_skipped("files, which can not be parsed", Counter(str(filepath) for filepath in skipped_files))
+    report_skipped("methods, which are not supported", methods_errors)
+    print(f"Methods: {len(extraction_arguments)}, best of {args.repeat} runs")
+    for stage_name, stage, arguments in [
+        ("semantic extraction", extract_method_statements_semantic, extraction_arguments),
+        ("opportunities creation", lambda *args: list(create_extraction_opportunities(*args)), creation_arguments),
+        ("opportunities filtering", filter_extraction_opportunities, filtering_arguments),
+        ("opportunities ranking", rank_extraction_opportunities, ranking_arguments),
+        (
+            "whole pipeline",
+            lambda method_ast: MethodAnalysis(method_ast).find_extraction_opportunities_groups(),
+            extraction_arguments,
+        ),
+    ]:
+        print(f"{stage_name:<25} {measure(stage, arguments, args.repeat):.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -258,4 +258,19 @@ public class ScopeTest {
             }
         }
     }
+
+    /**
+     * [Local variable, Try statement]
+     * |---[Statement expression]
+     * |---[Statement expression]
+     *     |---[Statement expression]
+     */
+    void uninitialized_variable() {
+        int x;
+        try {
+            x = 1;
+        } finally {
+            run(() -> { x = 2; });
+        }
+    }
 }
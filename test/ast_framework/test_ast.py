@@ -2,8 +2,10 @@ from unittest import TestCase, skip
 from pathlib import Path
 from itertools import zip_longest
 
+from javalang.parse import parse
+
 from veniq.utils.ast_builder import build_ast
-from veniq.ast_framework import AST, ASTNodeType
+from veniq.ast_framework import AST, ASTNodeType, ASTVisitor
 from veniq.ast_framework.ast import MemberReferenceParams, MethodInvocationParams
 
 
@@ -34,6 +36,114 @@ class ASTTestSuite(TestCase):
                          [ASTNodeType.STATEMENT_EXPRESSION, ASTNodeType.STATEMENT_EXPRESSION])
         self.assertEqual(method_declaration.node_type, ASTNodeType.METHOD_DECLARATION)
 
+    def test_enum_members(self):
+        ast = self._build_ast('EnumExample.java')
+        enum_declaration = next(ast.get_proxy_nodes(ASTNodeType.ENUM_DECLARATION))
+
+        # members of an enum are declared in its body after the constants
+        self.assertEqual([field.names for field in enum_declaration.fields], [['mass'], ['radius']])
+        self.assertEqual([constructor.name for constructor in enum_declaration.constructors], ['Planet'])
+        self.assertEqual([method.name for method in enum_declaration.methods], ['surfaceGravity'])
+
+    def test_subtree_navigation(self):
+        ast = self._build_ast("SimpleClass.java")
+        method_declaration = next(ast.get_proxy_nodes(ASTNodeType.METHOD_DECLARATION))
+        method_ast = ast.get_subtree(method_declaration)
+        method_root = method_ast.get_root()
+
+        self.assertIsNone(method_root.parent)
+        self.assertEqual(method_declaration.parent.node_type, ASTNodeType.CLASS_DECLARATION)
+        self.assertEqual([node.node_index for node in method_ast],
+                         list(range(method_declaration.node_index, method_declaration.node_index + 18)))
+        for child in method_root.children:
+            self.assertEqual(child.parent, method_root)
+
+    def test_nested_subtrees(self):
+        ast = self._build_ast("SimpleClass.java")
+        class_declaration = next(ast.get_proxy_nodes(ASTNodeType.CLASS_DECLARATION))
+        class_ast = ast.get_subtree(class_declaration)
+        for statement in ast.get_proxy_nodes(ASTNodeType.STATEMENT_EXPRESSION, ASTNodeType.RETURN_STATEMENT):
+            with self.subTest():
+                nested_subtree = class_ast.get_subtree(statement)
+                subtree = ast.get_subtree(statement)
+                self.assertEqual([node.node_index for node in nested_subtree],
+                                 [node.node_index for node in subtree])
+                self.assertEqual(list(nested_subtree.get_proxy_nodes(ASTNodeType.STRING)),
+                                 [node for node in nested_subtree if node.node_type == ASTNodeType.STRING])
+
+        class_skeleton = class_ast.get_subgraph(class_declaration, ast.get_subtree(
+            next(ast.get_proxy_nodes(ASTNodeType.FIELD_DECLARATION))))
+        self.assertEqual([node.node_type for node in class_skeleton.get_root().children],
+                         [ASTNodeType.FIELD_DECLARATION])
+        self.assertEqual([node.node_index for node in class_skeleton.get_subtree(class_declaration)],
+                         [node.node_index for node in class_skeleton])
+
+    def test_proxy_nodes_selection(self):
+        ast = self._build_ast("MethodInvokeExample.java")
+        types = (ASTNodeType.METHOD_INVOCATION, ASTNodeType.MEMBER_REFERENCE, ASTNodeType.STRING)
+        for tree in [ast] + [ast.get_subtree(node) for node in ast.get_proxy_nodes(ASTNodeType.METHOD_DECLARATION)]:
+            with self.subTest():
+                self.assertEqual(list(tree.get_proxy_nodes(*types)),
+                                 [node for node in tree if node.node_type in types])
+                self.assertEqual(list(tree.get_proxy_nodes(ASTNodeType.CLASS_DECLARATION)),
+                                 [node for node in tree if node.node_type == ASTNodeType.CLASS_DECLARATION])
+
+    def test_deeply_nested_expression(self):
+        operands_qty = 5000
+        javalang_ast = parse("class A { int f(int a) { return " + " + ".join(["a"] * operands_qty) + "; } }")
+        ast = AST.build_from_javalang(javalang_ast)
+        self.assertEqual(len(list(ast.get_proxy_nodes(ASTNodeType.BINARY_OPERATION))), operands_qty - 1)
+        self.assertEqual(len(list(ast.get_proxy_nodes(ASTNodeType.MEMBER_REFERENCE))), operands_qty)
+
+    def test_lazy_methods_bodies(self):
+        javalang_ast = build_ast(str(Path(__file__).parent.absolute() / "MethodUseOtherMethodExample.java"))
+        ast = AST.build_from_javalang(javalang_ast)
+        lazy_ast = AST.build_from_javalang(javalang_ast, lazy_methods_bodies=True)
+        self.assertEqual(list(lazy_ast.get_proxy_nodes(ASTNodeType.METHOD_INVOCATION)), [])
+
+        declarations_types = (ASTNodeType.METHOD_DECLARATION, ASTNodeType.CONSTRUCTOR_DECLARATION)
+        for method_declaration, lazy_method_declaration in zip_longest(
+            ast.get_proxy_nodes(*declarations_types), lazy_ast.get_proxy_nodes(*declarations_types)
+        ):
+            with self.subTest():
+                self.assertEqual(lazy_method_declaration.name, method_declaration.name)
+                method_ast = ast.get_subtree(method_declaration)
+                lazy_method_ast = lazy_ast.get_subtree(lazy_method_declaration)
+                self.assertIs(lazy_ast.get_subtree(lazy_method_declaration), lazy_method_ast)
+                self.assertEqual([(node.node_type, node.line) for node in lazy_method_ast],
+                                 [(node.node_type, node.line) for node in method_ast])
+                self.assertEqual([statement.node_type for statement in lazy_method_declaration.body],
+                                 [statement.node_type for statement in method_declaration.body])
+
+    def test_traverse_many(self):
+        class Recorder(ASTVisitor):
+            def __init__(self, node_types=None):
+                self.node_types = node_types
+                self.events = []
+
+            def on_node_entering(self, node):
+                self.events.append((node.node_index, True))
+
+            def on_node_leaving(self, node):
+                self.events.append((node.node_index, False))
+
+        ast = self._build_ast("MethodInvokeExample.java")
+        class_declaration = next(ast.get_proxy_nodes(ASTNodeType.CLASS_DECLARATION))
+        class_skeleton = ast.get_subgraph(class_declaration, ast.get_subtree(next(class_declaration.methods)))
+        types = {ASTNodeType.METHOD_INVOCATION, ASTNodeType.MEMBER_REFERENCE}
+        for tree in (ast, ast.get_subtree(class_declaration), class_skeleton):
+            with self.subTest():
+                all_nodes_recorder, recorder = Recorder(), Recorder(types)
+                tree.traverse_many([all_nodes_recorder, recorder])
+
+                expected_events = list(tree._dfs_labeled_nodes(tree.root))
+                self.assertEqual(all_nodes_recorder.events, expected_events)
+
+                typed_nodes_indexes = {node.node_index for node in tree.get_proxy_nodes(*types)}
+                self.assertEqual(recorder.events, [(node_index, is_entering)
+                                                   for node_index, is_entering in expected_events
+                                                   if node_index in typed_nodes_indexes])
+
     @skip('Method "get_member_reference_params" is deprecated')
     def test_member_reference_params(self):
         ast = self._build_ast("MemberReferencesExample.java")
@@ -0,0 +1,100 @@
+from pathlib import Path
+from pickle import HIGHEST_PROTOCOL, dumps
+from random import Random
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from veniq.ast_framework import AST, ASTNodeType
+from veniq.ast_framework.ast_cache import ASTCache, build_ast_from_file, build_ast_from_source
+
+
+class ASTCacheTestSuite(TestCase):
+    def test_loading_cached_ast(self):
+        with TemporaryDirectory() as cache_directory:
+            ast_cache = ASTCache(cache_directory)
+            self.assertIsNone(ast_cache.load(self._source))
+
+            built_ast = build_ast_from_file(self._filepath, ast_cache)
+            loaded_ast = ast_cache.load(self._source)
+            self.assertIsNotNone(loaded_ast)
+            self._assert_same_ast(loaded_ast, built_ast)
+            self._assert_same_ast(build_ast_from_file(self._filepath, ast_cache), built_ast)
+
+            method_declaration = next(loaded_ast.get_proxy_nodes(ASTNodeType.METHOD_DECLARATION))
+            self.assertEqual(method_declaration.name, "Increment")
+            self.assertEqual(method_declaration.line, 4)
+
+    def test_corrupted_entry(self):
+        with TemporaryDirectory() as cache_directory:
+            ast_cache = ASTCache(cache_directory)
+            built_ast = build_ast_from_file(self._filepath, ast_cache)
+            for entry_path in Path(cache_directory).glob("*/*"):
+                entry_path.write_bytes(entry_path.read_bytes()[:100])
+
+            self.assertIsNone(ast_cache.load(self._source))
+            self._assert_same_ast(build_ast_from_file(self._filepath, ast_cache), built_ast)
+            self.assertIsNotNone(ast_cache.load(self._source))
+
+    def test_corrupted_attributes(self):
+        with TemporaryDirectory() as cache_directory:
+            ast_cache = ASTCache(cache_directory)
+            built_ast = build_ast_from_file(self._filepath, ast_cache)
+            entry_path, = Path(cache_directory).glob("*/*")
+            entry = entry_path.read_bytes()
+            attributes_offset = len(entry) - len(dumps(built_ast._storage._attributes, protocol=HIGHEST_PROTOCOL))
+
+            damaged_attributes = [
+                b"cveniq.ast_framework._ast_storage\nNoSuchName\n.",  # AttributeError
+                b"cno_such_module\nname\n.",  # ImportError
+                dumps({"not": "a list"}),
+                dumps([()]),
+            ]
+            random = Random(0)
+            for _ in range(200):
+                damaged_entry = bytearray(entry)
+                damaged_entry[random.randrange(attributes_offset, len(entry))] = random.randrange(256)
+                damaged_attributes.append(bytes(damaged_entry[attributes_offset:]))
+
+            for attributes in damaged_attributes:
+                with self.subTest(attributes=attributes[:50]):
+                    entry_path.write_bytes(entry[:attributes_offset] + attributes)
+                    # a damaged entry may still be loaded by chance, but it never raises
+                    ast_cache.load(self._source)
+
+            for attributes in damaged_attributes[:4]:
+                entry_path.write_bytes(entry[:attributes_offset] + attributes)
+                self.assertIsNone(ast_cache.load(self._source))
+                self._assert_same_ast(build_ast_from_file(self._filepath, ast_cache), built_ast)
+
+    def test_schema_change_invalidates_entries(self):
+        with TemporaryDirectory() as cache_directory:
+            ast_cache = ASTCache(cache_directory)
+            build_ast_from_file(self._filepath, ast_cache)
+            with patch("veniq.ast_framework.ast_cache.SERIALIZATION_SCHEMA_DIGEST", "changed schema"):
+                self.assertIsNone(ast_cache.load(self._source))
+            self.assertIsNotNone(ast_cache.load(self._source))
+
+    def test_building_from_text(self):
+        with TemporaryDirectory() as cache_directory:
+            ast_cache = ASTCache(cache_directory)
+            built_ast = build_ast_from_source(self._source.decode("utf-8"), ast_cache)
+            self._assert_same_ast(built_ast, build_ast_from_source(self._source))
+
+            # texts are cached under their UTF-8 encoding
+            loaded_ast = ast_cache.load(self._source)
+            self.assertIsNotNone(loaded_ast)
+            self._assert_same_ast(loaded_ast, built_ast)
+
+    def _assert_same_ast(self, actual_ast: AST, expected_ast: AST) -> None:
+        self.assertEqual(
+            [(node.node_type, node.node_index, node.parent and node.parent.node_index) for node in actual_ast],
+            [(node.node_type, node.node_index, node.parent and node.parent.node_index) for node in expected_ast],
+        )
+        self.assertEqual(
+            [actual_ast._storage.get_attribute_values(node.node_index) for node in actual_ast],
+            [expected_ast._storage.get_attribute_values(node.node_index) for node in expected_ast],
+        )
+
+    _filepath = Path(__file__).absolute().parent / "SimpleClass.java"
+    _source = _filepath.read_bytes()
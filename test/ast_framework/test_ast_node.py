@@ -40,6 +40,39 @@ class ASTNodeTestSuite(TestCase):
 
         self.assertEqual(set(java_class.constructors), set())
 
+    def test_nodes_identity(self):
+        ast = AST.build_from_javalang(
+            build_ast(
+                Path(__file__).absolute().parent / "MethodUseOtherMethodExample.java"
+            )
+        )
+
+        for node in ast:
+            for child in node.children:
+                self.assertIs(child.parent, node)
+
+        java_class = ast.get_root().types[0]
+        self.assertIs(next(java_class.methods), next(ast.get_proxy_nodes(ASTNodeType.METHOD_DECLARATION)))
+        self.assertFalse(hasattr(java_class, "__dict__"))
+
+    def test_lines_of_nodes_without_position(self):
+        ast = AST.build_from_javalang(
+            build_ast(
+                Path(__file__).absolute().parent / "MethodUseOtherMethodExample.java"
+            )
+        )
+
+        method_declaration = next(ast.get_proxy_nodes(ASTNodeType.METHOD_DECLARATION))
+        method_ast = ast.get_subtree(method_declaration)
+        for tree in (ast, method_ast):
+            for node in tree.get_proxy_nodes(ASTNodeType.STRING, ASTNodeType.COLLECTION):
+                with self.subTest():
+                    self.assertEqual(node.line, node.parent.line)
+
+        modifiers = next(method_ast.get_proxy_nodes(ASTNodeType.COLLECTION))
+        with self.assertRaises(RuntimeError):
+            method_ast.get_subtree(modifiers).get_root().line
+
     def test_fake_node(self):
         ast = AST.build_from_javalang(
             build_ast(
@@ -0,0 +1,52 @@
+from pathlib import Path
+from unittest import TestCase
+
+from veniq.ast_framework import AST, ASTNodeType
+from veniq.utils.ast_builder import build_ast
+
+
+class ASTQueryTestSuite(TestCase):
+    def test_child_and_descendant_combinators(self):
+        ast = self._build_ast("MethodUseOtherMethodExample.java")
+        self.assertEqual(
+            [node.name for node in ast.select("CLASS_DECLARATION[name=MethodUseOtherMethod] > METHOD_DECLARATION")],
+            ["useOnlyMethods1", "useOnlyMethods2", "getField", "setField", "standAloneMethod", "shadowing"],
+        )
+        self.assertEqual(
+            [node.member for node in ast.select("METHOD_DECLARATION RETURN_STATEMENT METHOD_INVOCATION")],
+            ["useOnlyMethods2", "useOnlyMethods1"],
+        )
+        self.assertEqual(list(ast.select("METHOD_DECLARATION > METHOD_INVOCATION")), [])
+
+    def test_attribute_filters(self):
+        ast = self._build_ast("MethodUseOtherMethodExample.java")
+        method_invocations = list(ast.get_proxy_nodes(ASTNodeType.METHOD_INVOCATION))
+        self.assertEqual(list(ast.select("METHOD_INVOCATION[qualifier=None]")),
+                         [node for node in method_invocations if node.qualifier is None])
+        self.assertEqual(list(ast.select("METHOD_INVOCATION[qualifier!=None]")),
+                         [node for node in method_invocations if node.qualifier is not None])
+        self.assertEqual([node.name for node in ast.select("METHOD_DECLARATION|FIELD_DECLARATION[name^='get']")],
+                         ["getField"])
+
+    def test_select_many(self):
+        ast = self._build_ast("MethodInvokeExample.java")
+        selectors = [
+            "METHOD_INVOCATION",
+            "METHOD_DECLARATION MEMBER_REFERENCE[qualifier=None]",
+            "*[member=println]",
+            "CLASS_DECLARATION > METHOD_DECLARATION|CONSTRUCTOR_DECLARATION",
+        ]
+        for tree in [ast] + [ast.get_subtree(node) for node in ast.get_proxy_nodes(ASTNodeType.METHOD_DECLARATION)]:
+            with self.subTest():
+                self.assertEqual(tree.select_many(selectors),
+                                 [list(tree.select(selector)) for selector in selectors])
+
+    def test_invalid_selectors(self):
+        ast = self._build_ast("SimpleClass.java")
+        for selector in ["", "> METHOD_DECLARATION", "METHOD_DECLARATION >", "UNKNOWN_TYPE",
+                         "[name=x]", "METHOD_DECLARATION[name]", "METHOD_DECLARATION > > STRING"]:
+            with self.subTest(selector=selector), self.assertRaises(ValueError):
+                list(ast.select(selector))
+
+    def _build_ast(self, filename: str) -> AST:
+        return AST.build_from_javalang(build_ast(str(Path(__file__).parent.absolute() / filename)))
@@ -289,6 +289,51 @@ class BlockStatementTestCase(TestCase):
             ],
         )
 
+    def test_navigation(self):
+        method_statement = self._get_block_statement_graph_from_method("complexExample1")
+        self.assertTrue(method_statement.has_nested_blocks)
+        method_block = next(method_statement.nested_blocks)
+        self.assertEqual(method_block.origin_statement, method_statement.node)
+        self.assertEqual(
+            [statement.node.node_type for statement in method_block.statements],
+            [
+                ASTNodeType.STATEMENT_EXPRESSION,
+                ASTNodeType.FOR_STATEMENT,
+                ASTNodeType.WHILE_STATEMENT,
+                ASTNodeType.RETURN_STATEMENT,
+            ],
+        )
+
+        for_statement = list(method_block.statements)[1]
+        self.assertTrue(for_statement.has_nested_blocks)
+        self.assertEqual(for_statement.parent_block, method_block)
+        for_block = next(for_statement.nested_blocks)
+        self.assertEqual(for_block.origin_statement, for_statement.node)
+        self.assertEqual(next(for_block.statements).parent_block, for_block)
+
+        return_statement = list(method_block.statements)[-1]
+        self.assertFalse(return_statement.has_nested_blocks)
+        self.assertEqual(list(return_statement.nested_blocks), [])
+        with self.assertRaises(ValueError):
+            method_statement.parent_block
+
+    def test_traversal_reuses_nodes(self):
+        block_statement_graph = self._get_block_statement_graph_from_method("complexExample1")
+        entered_nodes: List[Union[Block, Statement]] = []
+        left_nodes: List[Union[Block, Statement]] = []
+        block_statement_graph.traverse(entered_nodes.append, left_nodes.append)
+
+        self.assertEqual(len(entered_nodes), len(left_nodes))
+        self.assertIs(entered_nodes[0], block_statement_graph)
+        self.assertIs(left_nodes[-1], block_statement_graph)
+        self.assertEqual({id(node) for node in entered_nodes}, {id(node) for node in left_nodes})
+
+        # a nested traversal goes over a subtree only
+        for_statement = entered_nodes[3]
+        nested_nodes: List[Union[Block, Statement]] = []
+        for_statement.traverse(nested_nodes.append)
+        self.assertEqual(nested_nodes, entered_nodes[3:6])
+
     def test_simple_constructor(self):
         block_statement_graph = self._get_block_statement_graph_from_constructor(1)
         self.assertEqual(
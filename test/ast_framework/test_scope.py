@@ -49,6 +49,9 @@ class ScopeTestCase(TestCase):
     def test_deep_nesting(self) -> None:
         self._test_method("deep_nesting")
 
+    def test_uninitialized_variable(self) -> None:
+        self._test_method("uninitialized_variable")
+
     def test_lambda_parameters(self) -> None:
         scope = Scope.build_from_method_ast(self._get_method_ast("multiline_lambda"))
         lambda_scope = next(scope.nested_scopes)
@@ -223,4 +226,10 @@ class ScopeTestCase(TestCase):
             [ASTNodeType.ASSERT_STATEMENT],
             [ASTNodeType.BINARY_OPERATION],
         ],
+        "uninitialized_variable": [
+            [ASTNodeType.LOCAL_VARIABLE_DECLARATION, ASTNodeType.TRY_STATEMENT],
+            [ASTNodeType.STATEMENT_EXPRESSION],
+            [ASTNodeType.STATEMENT_EXPRESSION],
+            [ASTNodeType.STATEMENT_EXPRESSION],
+        ],
     }
@@ -0,0 +1,41 @@
+abstract class Shape {
+    abstract double area();
+
+    native void draw();
+
+    double scaledArea(double scale) {
+        double area = area();
+        area *= scale;
+        return area;
+    }
+}
+
+interface Named {
+    String name();
+
+    default String greeting() {
+        String name = name();
+        return "Hello, " + name;
+    }
+
+    static String anonymous() {
+        String name = "anonymous";
+        return name;
+    }
+}
+
+enum Color {
+    RED(1), GREEN(2);
+
+    private final int code;
+
+    Color(int code) {
+        int checked = Math.abs(code);
+        this.code = checked;
+    }
+
+    int doubledCode() {
+        int doubled = code * 2;
+        return doubled;
+    }
+}
@@ -1,4 +1,12 @@
 class SimpleMethods {
+    private int value;
+
+    SimpleMethods(int x) {
+        int y = x * 2;
+        this.value = y;
+        localMethod(value);
+    }
+
     void block(int x) {
         {
             x++;
@@ -155,4 +163,16 @@ class SimpleMethods {
     void multipleStatementsPerLine(int x, int y) {
         localMethod(x); localMethod(y);
     }
+
+    void nestedStatementsWithLambda(List<Integer> items) {
+        int total = 0;
+        for (int item : items) {
+            if (item > total) {
+                items.forEach(x -> System.out.println(x + total));
+            } else {
+                total = Math.max(total, item);
+            }
+        }
+        Runnable runnable = () -> { int y = total; log(y); };
+    }
 }
@@ -6,6 +6,7 @@ from veniq.baselines.semi.extract_semantic import extract_method_statements_sema
 from veniq.baselines.semi.create_extraction_opportunities import create_extraction_opportunities
 from veniq.baselines.semi.filter_extraction_opportunities import filter_extraction_opportunities
 from veniq.baselines.semi.rank_extraction_opportunities import rank_extraction_opportunities
+from veniq.baselines.semi.method_analysis import MethodAnalysis
 from .utils import get_method_ast, objects_semantic
 
 
@@ -74,6 +75,22 @@ class PaperExampleTestCase(TestCase):
         group_sizes = [len(list(group.opportunities)) for group in ranked_extraction_opportunities_groups]
         self.assertEqual(group_sizes, [1, 1, 1, 1, 1, 1])
 
+    def test_method_analysis(self):
+        method_analysis = MethodAnalysis(self._get_method_ast())
+        self.assertEqual(list(method_analysis.statements_semantic.values()), self._method_semantic)
+
+        filtered_extraction_opportunities = method_analysis.find_extraction_opportunities()
+        self.assertEqual(
+            [[statement.node_type for statement in opportunity] for opportunity in filtered_extraction_opportunities],
+            self._expected_filtered_extraction_opportunities,
+        )
+        self.assertIs(
+            method_analysis.statements_layout.block_statement_graph, method_analysis.block_statement_graph
+        )
+
+        benefits = [group.benefit for group in method_analysis.find_extraction_opportunities_groups()]
+        self.assertEqual(benefits, [24, 23, 21, 19, 19, 3])
+
     @staticmethod
     def _get_method_ast() -> AST:
         return get_method_ast("ExampleFromPaper.java", "ExampleFromPaper", "grabManifests")
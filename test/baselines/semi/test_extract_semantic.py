@@ -2,7 +2,8 @@ from typing import List
 from itertools import zip_longest
 from unittest import TestCase
 
-from veniq.baselines.semi.extract_semantic import extract_method_statements_semantic
+from veniq.ast_framework import AST, ASTNode, ASTNodeType
+from veniq.baselines.semi.extract_semantic import _SemanticExtractor, extract_method_statements_semantic
 from veniq.baselines.semi._common_types import StatementSemantic
 from .utils import objects_semantic, get_method_ast
 
@@ -169,6 +170,71 @@ class ExtractStatementSemanticTestCase(TestCase):
             ],
         )
 
+    def test_nested_statements_with_lambda_method(self):
+        self._test_helper(
+            "nestedStatementsWithLambda",
+            [
+                objects_semantic("total"),
+                objects_semantic("items", "item"),
+                objects_semantic("item", "total"),
+                StatementSemantic(
+                    used_objects={"items", "x", "System.out", "total"}, used_methods={"forEach", "println"}
+                ),
+                objects_semantic("item", "total"),
+                StatementSemantic(used_objects={"total", "Math", "item"}, used_methods={"max"}),
+                StatementSemantic(),
+                StatementSemantic(),
+                StatementSemantic(used_objects={"runnable", "y", "total"}, used_methods={"log"}),
+            ],
+        )
+
+    def test_constructor(self):
+        self._test_helper(
+            "SimpleMethods",
+            [
+                objects_semantic("x", "y"),
+                objects_semantic("value", "y"),
+                StatementSemantic(used_methods={"localMethod"}, used_objects={"value"}),
+            ],
+        )
+
+    def test_names_usages_of_subtrees(self):
+        method_ast = get_method_ast("SemanticExtractionTest.java", "SimpleMethods", "nestedStatementsWithLambda")
+        self._test_names_usages_of_subtrees(method_ast)
+
+    def test_names_usages_of_subgraph_with_gaps(self):
+        method_ast = get_method_ast("SemanticExtractionTest.java", "SimpleMethods", "nestedStatementsWithLambda")
+        nodes = list(method_ast)
+        for step in [2, 3]:
+            with self.subTest(step=step):
+                self._test_names_usages_of_subtrees(method_ast.get_subgraph(nodes[0], nodes[::step]))
+
+    def _test_names_usages_of_subtrees(self, method_ast: AST):
+        semantic_extractor = _SemanticExtractor(method_ast)
+        for node in method_ast:
+            with self.subTest(node_index=node.node_index):
+                self.assertEqual(
+                    semantic_extractor._extract_semantic_from_ast(node),
+                    self._scan_subtree_semantic(method_ast, node),
+                )
+
+    @staticmethod
+    def _scan_subtree_semantic(method_ast: AST, node: ASTNode) -> StatementSemantic:
+        statement_semantic = StatementSemantic()
+        for used_node in method_ast.get_subtree(node).get_proxy_nodes(
+            ASTNodeType.MEMBER_REFERENCE, ASTNodeType.METHOD_INVOCATION, ASTNodeType.VARIABLE_DECLARATOR
+        ):
+            if used_node.node_type == ASTNodeType.MEMBER_REFERENCE:
+                qualifier = used_node.qualifier + "." if used_node.qualifier is not None else ""
+                statement_semantic.used_objects.add(qualifier + used_node.member)
+            elif used_node.node_type == ASTNodeType.METHOD_INVOCATION:
+                statement_semantic.used_methods.add(used_node.member)
+                if used_node.qualifier is not None:
+                    statement_semantic.used_objects.add(used_node.qualifier)
+            else:
+                statement_semantic.used_objects.add(used_node.name)
+        return statement_semantic
+
     def _test_helper(self, method_name: str, expected_statements_semantics: List[StatementSemantic]):
         method_ast = get_method_ast("SemanticExtractionTest.java", "SimpleMethods", method_name)
         method_semantic = extract_method_statements_semantic(method_ast)
@@ -1,12 +1,19 @@
+from random import Random
 from typing import Dict, Tuple
 from unittest import TestCase
 
 from networkx import DiGraph
 
-from veniq.baselines.semi._common_types import Statement, StatementSemantic, ExtractionOpportunity
+from veniq.baselines.semi._common_types import (
+    Statement,
+    StatementSemantic,
+    ExtractionOpportunity,
+    MethodStatements,
+)
 from veniq.baselines.semi.rank_extraction_opportunities import (
     ExtractionOpportunityGroupSettings,
     ExtractionOpportunityGroup,
+    rank_extraction_opportunities,
 )
 from veniq.ast_framework import ASTNode
 
@@ -51,6 +58,31 @@ class ExtractionOpportunitiesGroupingTestCase(TestCase):
 
         self.assertFalse(extraction_opportunity_group.is_allowed_to_add_opportunity(extraction_opportunity2))
 
+    def test_extraction_opportunities_ranges_grouping(self):
+        random = Random(42)
+        for statements_qty in (5, 10, 20):
+            statements_semantic = {
+                ASTNode(DiGraph(), id): StatementSemantic(used_objects={random.choice("xyz")})
+                for id in range(statements_qty)
+            }
+            method_statements = MethodStatements(statements_semantic.keys())
+            ranges = random.sample(
+                [(begin, end) for begin in range(statements_qty) for end in range(begin + 1, statements_qty + 1)],
+                2 * statements_qty,
+            )
+            with self.subTest(statements_qty=statements_qty):
+                ranges_groups = rank_extraction_opportunities(
+                    statements_semantic,
+                    [ExtractionOpportunity(method_statements, begin, end) for begin, end in ranges],
+                )
+                tuples_groups = rank_extraction_opportunities(
+                    statements_semantic, [tuple(method_statements.statements[begin:end]) for begin, end in ranges]
+                )
+                self.assertEqual(
+                    [[tuple(opportunity) for opportunity, _ in group.opportunities] for group in ranges_groups],
+                    [[opportunity for opportunity, _ in group.opportunities] for group in tuples_groups],
+                )
+
     @staticmethod
     def _create_extraction_opportunities_stubs(
         first_opportunity_size: int, second_opportunity_size: int, total_statements_size: int
@@ -58,9 +90,11 @@ class ExtractionOpportunitiesGroupingTestCase(TestCase):
         statements_semantic = ExtractionOpportunitiesGroupingTestCase._create_statement_semantic_stub(
             total_statements_size
         )
-        statements = list(statements_semantic.keys())
-        extraction_opportunity1 = tuple(statements[:first_opportunity_size])
-        extraction_opportunity2 = tuple(statements[-second_opportunity_size:])
+        method_statements = MethodStatements(statements_semantic.keys())
+        extraction_opportunity1 = ExtractionOpportunity(method_statements, 0, first_opportunity_size)
+        extraction_opportunity2 = ExtractionOpportunity(
+            method_statements, total_statements_size - second_opportunity_size, total_statements_size
+        )
         return extraction_opportunity1, extraction_opportunity2, statements_semantic
 
     @staticmethod
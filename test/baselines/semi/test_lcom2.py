@@ -1,10 +1,11 @@
 from typing import Dict, Union, Set
 from unittest import TestCase
+from unittest.mock import patch
 
 from networkx import DiGraph
 
 from veniq.baselines.semi._common_types import Statement, StatementSemantic
-from veniq.baselines.semi._lcom2 import LCOM2
+from veniq.baselines.semi._lcom2 import LCOM2, StatementsSimilarity
 
 from veniq.ast_framework import ASTNode
 
@@ -22,6 +23,47 @@ class LCOM2TestCase(TestCase):
         statements_semantic = self._create_statements_semantic("x", {"x", "y"}, {"x", "z"}, {"x", "a"})
         self.assertEqual(LCOM2(statements_semantic), 0)
 
+    def test_statements_subsets(self):
+        statements_semantic = self._create_statements_semantic("x", "y", {"x", "y"}, "z", "a.b", "a", set())
+        statements = list(statements_semantic.keys())
+        statements_similarity = StatementsSimilarity(statements_semantic)
+        for subset in [statements[:3], statements[1:5], statements[3:], statements[::2], [statements[6]], []]:
+            with self.subTest():
+                statements_mask = statements_similarity.get_statements_mask(subset)
+                self.assertEqual(statements_similarity.lcom2(statements_mask),
+                                 LCOM2({statement: statements_semantic[statement] for statement in subset}))
+                self.assertEqual(
+                    statements_similarity.lcom2(~statements_mask),
+                    LCOM2({statement: statements_semantic[statement]
+                           for statement in statements if statement not in subset}),
+                )
+
+    def test_statements_ranges(self):
+        graph = DiGraph()
+        statements_semantic = {
+            ASTNode(graph, id): StatementSemantic(used_objects=used_objects)
+            for id, used_objects in [(0, {"x"}), (1, {"y"}), (-1, {"x"}), (2, {"x", "z"}), (3, {"z"}), (-2, set())]
+        }
+        statements = list(statements_semantic.keys())
+        statements_similarity = StatementsSimilarity(statements_semantic)
+        for begin in range(len(statements)):
+            for end in range(begin + 1, len(statements) + 1):
+                opportunity = [statement for statement in statements[begin:end] if not statement.is_fake]
+                rest_statements = [statement for statement in statements if statement not in opportunity]
+                with self.subTest(begin=begin, end=end):
+                    self.assertEqual(
+                        statements_similarity.split_lcom2(opportunity),
+                        (
+                            LCOM2({statement: statements_semantic[statement] for statement in opportunity}),
+                            LCOM2({statement: statements_semantic[statement] for statement in rest_statements}),
+                        ),
+                    )
+
+    def test_statements_ranges_without_prefix_sums(self):
+        # long methods are split over masks, which must give the same results
+        with patch("veniq.baselines.semi._lcom2._MAX_STATEMENTS_FOR_PAIRS_PREFIX_SUMS", 0):
+            self.test_statements_ranges()
+
     @staticmethod
     def _create_statements_semantic(
         *used_object_name: Union[str, Set[str]]
@@ -1,14 +1,18 @@
 from unittest import TestCase
-from tempfile import NamedTemporaryFile
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+from io import StringIO
+from pathlib import Path
+import json
 import os
 
 from javalang.parser import JavaSyntaxError
 
 from veniq.utils.ast_builder import build_ast
 from veniq.ast_framework import AST
+from veniq.ast_framework.ast_cache import ASTCache
 from veniq.baselines.semi.recommend import _add_class_decl_wrap,\
     _convert_ExtractionOpportunity_to_EMO, _get_method_subtree,\
-    recommend_for_method
+    recommend_for_method, recommend_for_file, recommend_for_corpus, write_recommendations
 from test.baselines.semi.utils import create_extraction_opportunity
 
 
@@ -131,3 +135,71 @@ class TestRecommend(TestCase):
 
         with self.assertRaises(JavaSyntaxError):
             recommend_for_method('\n'.join(self._method[:-1]))
+
+    def test_recommend_for_file(self):
+        filepath = Path(__file__).parent / 'ExampleFromPaper.java'
+        recommendations = recommend_for_file(filepath)
+        self.assertEqual(len(recommendations), 1)
+        recommendation = recommendations[0]
+        self.assertEqual((recommendation.class_name, recommendation.method_name, recommendation.method_line),
+                         ('ExampleFromPaper', 'grabManifests', 6))
+        self.assertIsNone(recommendation.error)
+
+        # lines of method are taken without class declaration around it
+        method_decl = '\n'.join(filepath.read_text().splitlines()[5:-1])
+        expected_emos = [(start + 6, end + 6) for start, end in recommend_for_method(method_decl)]
+        self.assertEqual(recommendation.emo_ranges, expected_emos)
+
+    def test_recommend_for_corpus(self):
+        filepaths = [Path(__file__).parent / filename
+                     for filename in ['ExampleFromPaper.java', 'SemanticFilterTest.java', 'test_recommend.py']]
+        recommendations = list(recommend_for_corpus(filepaths))
+        self.assertEqual(recommendations, [recommendation
+                                           for filepath in filepaths
+                                           for recommendation in recommend_for_file(filepath)])
+        self.assertEqual(sorted(recommend_for_corpus(filepaths, jobs=2)), sorted(recommendations))
+
+        # file, which can not be parsed, is reported with a single error
+        not_parsed = [recommendation for recommendation in recommendations if recommendation.class_name is None]
+        self.assertEqual(len(not_parsed), 1)
+        self.assertEqual(not_parsed[0].filepath, str(filepaths[-1]))
+        self.assertIsNotNone(not_parsed[0].error)
+
+        output = StringIO()
+        write_recommendations(recommendations, output)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), len(recommendations))
+        self.assertEqual(json.loads(lines[0])['emo_ranges'], [list(emo) for emo in recommendations[0].emo_ranges])
+
+    def test_recommend_for_declarations_kinds(self):
+        recommendations = recommend_for_file(Path(__file__).parent / 'DeclarationsKinds.java')
+        # abstract and native methods, as well as methods of interfaces without bodies, are not emitted
+        self.assertEqual([(recommendation.class_name, recommendation.method_name)
+                          for recommendation in recommendations],
+                         [('Shape', 'scaledArea'), ('Named', 'greeting'), ('Named', 'anonymous'),
+                          ('Color', 'doubledCode'), ('Color', 'Color')])
+        self.assertTrue(all(recommendation.error is None for recommendation in recommendations))
+
+    def test_recommend_for_file_with_ast_cache(self):
+        with TemporaryDirectory() as directory:
+            filepath = Path(directory, 'NestedTypes.java')
+            filepath.write_text('\n'.join([
+                "class Outer {",
+                "    int f() {",
+                "        class Local { int g() { return 1; } }",
+                "        int x = new Local().g();",
+                "        return x;",
+                "    }",
+                "    static class Member { int h() { int y = 2; return y; } }",
+                "}",
+            ]))
+            recommendations = recommend_for_file(filepath)
+            # local classes are found only in methods bodies, which are not built before analysis
+            self.assertEqual([(recommendation.class_name, recommendation.method_name)
+                              for recommendation in recommendations],
+                             [('Outer', 'f'), ('Member', 'h')])
+
+            ast_cache = ASTCache(Path(directory, 'cache'))
+            # the first run fills the cache, the second one reads from it
+            self.assertEqual(recommend_for_file(filepath, ast_cache), recommendations)
+            self.assertEqual(recommend_for_file(filepath, ast_cache), recommendations)
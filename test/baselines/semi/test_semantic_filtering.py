@@ -1,7 +1,10 @@
 from typing import List
 from unittest import TestCase
 
-from veniq.baselines.semi._semantic_filter import semantic_filter
+from veniq.ast_framework.block_statement_graph import build_block_statement_graph
+from veniq.baselines.semi._common_types import ExtractionOpportunity, MethodStatements
+from veniq.baselines.semi._semantic_filter import SemanticFilter, semantic_filter
+from veniq.baselines.semi._statements_layout import StatementsLayout
 from veniq.baselines.semi.extract_semantic import extract_method_statements_semantic
 from .utils import get_method_ast, create_extraction_opportunity
 
@@ -31,6 +34,22 @@ class SemanticFilterTestCase(TestCase):
     def test_try_statement(self):
         self._opportunity_test_helper("tryStatement", [44], True)
 
+    def test_statements_ranges(self):
+        for method_name in ["twoUsedVariables", "extractBreak", "deepNestedBreak", "tryStatement"]:
+            method_ast = get_method_ast("SemanticFilterTest.java", "Test", method_name)
+            statements_semantic = extract_method_statements_semantic(method_ast)
+            block_statement_graph = build_block_statement_graph(method_ast)
+            method_semantic_filter = SemanticFilter(statements_semantic, StatementsLayout(block_statement_graph))
+            method_statements = MethodStatements(statements_semantic.keys())
+            for begin in range(len(method_statements)):
+                for end in range(begin + 1, len(method_statements) + 1):
+                    extraction_opportunity = ExtractionOpportunity(method_statements, begin, end)
+                    with self.subTest(method_name=method_name, begin=begin, end=end):
+                        self.assertEqual(
+                            method_semantic_filter.is_extractable(extraction_opportunity),
+                            semantic_filter(tuple(extraction_opportunity), statements_semantic, block_statement_graph),
+                        )
+
     def _opportunity_test_helper(
         self,
         method_name: str,
@@ -0,0 +1,71 @@
+from itertools import product
+from unittest import TestCase
+
+from veniq.baselines.semi._common_types import SemanticVocabulary, StatementSemantic, intern_statements_semantic
+
+
+class SemanticVocabularyTestCase(TestCase):
+    _semantics = [
+        StatementSemantic(used_objects={"x"}),
+        StatementSemantic(used_objects={"a.b.c"}, used_methods={"run"}),
+        StatementSemantic(used_objects={"a"}),
+        StatementSemantic(used_objects={"b"}, used_methods={"x"}),
+        StatementSemantic(used_methods={"run", "stop"}),
+        StatementSemantic(),
+    ]
+
+    def test_names_round_trip(self):
+        vocabulary = SemanticVocabulary()
+        masks = [vocabulary.get_mask(semantic) for semantic in self._semantics]
+        for semantic, mask in zip(self._semantics, masks):
+            with self.subTest(semantic=semantic):
+                self.assertEqual(vocabulary.get_names(mask), (semantic.used_objects_unwrapped, semantic.used_methods))
+
+    def test_union(self):
+        vocabulary = SemanticVocabulary()
+        for first, second in product(self._semantics, repeat=2):
+            with self.subTest(first=first, second=second):
+                union = StatementSemantic(
+                    used_objects=first.used_objects | second.used_objects,
+                    used_methods=first.used_methods | second.used_methods,
+                )
+                self.assertEqual(
+                    vocabulary.get_mask(first) | vocabulary.get_mask(second), vocabulary.get_mask(union)
+                )
+
+    def test_objects_and_methods_bits_differ(self):
+        vocabulary = SemanticVocabulary()
+        self.assertEqual(
+            vocabulary.get_mask(StatementSemantic(used_objects={"x"}))
+            & vocabulary.get_mask(StatementSemantic(used_methods={"x"})),
+            0,
+        )
+
+    def test_name_seen_after_masks_built(self):
+        vocabulary = SemanticVocabulary()
+        masks = [vocabulary.get_mask(semantic) for semantic in self._semantics]
+
+        late_semantic = StatementSemantic(used_objects={"a.b.d", "y"}, used_methods={"stop"})
+        late_mask = vocabulary.get_mask(late_semantic)
+        # new names get new bits and do not change already built masks
+        self.assertEqual([vocabulary.get_mask(semantic) for semantic in self._semantics], masks)
+        self.assertEqual(vocabulary.get_names(late_mask), ({"a", "a.b", "a.b.d", "y"}, {"stop"}))
+        for semantic, mask in zip(self._semantics, masks):
+            with self.subTest(semantic=semantic):
+                self.assertEqual(mask & late_mask != 0, semantic.is_similar(late_semantic))
+
+    def test_is_similar(self):
+        # semantics are copied, so interning does not change the class attribute
+        interned_semantics = [
+            StatementSemantic(set(semantic.used_objects), set(semantic.used_methods)) for semantic in self._semantics
+        ]
+        intern_statements_semantic(interned_semantics)
+        for (first, second), (interned_first, interned_second) in zip(
+            product(self._semantics, repeat=2), product(interned_semantics, repeat=2)
+        ):
+            with self.subTest(first=first, second=second):
+                self.assertEqual(interned_first.is_similar(interned_second), first.is_similar(second))
+
+        self.assertTrue(interned_semantics[1].is_similar(interned_semantics[2]))
+        self.assertFalse(interned_semantics[0].is_similar(interned_semantics[3]))
+        self.assertFalse(interned_semantics[5].is_similar(interned_semantics[5]))
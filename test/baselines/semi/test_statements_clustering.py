@@ -4,7 +4,11 @@ from unittest import TestCase
 from networkx import DiGraph
 
 from veniq.baselines.semi.extract_semantic import StatementSemantic
-from veniq.baselines.semi.create_extraction_opportunities import create_extraction_opportunities
+from veniq.baselines.semi._common_types import ExtractionOpportunity, MethodStatements
+from veniq.baselines.semi.create_extraction_opportunities import (
+    create_extraction_opportunities,
+    create_extraction_opportunities_ranges,
+)
 from veniq.ast_framework import ASTNode
 
 
@@ -42,6 +46,37 @@ class ExtractionOpportunitiesCreationTestCase(TestCase):
         expected_statement_indexes = [[0], [1], [2]]
         self.assertEqual(expected_statement_indexes, actual_statements_indexes)
 
+    def test_fake_statements_on_borders(self):
+        stub_graph = DiGraph()
+        statements_semantic = {
+            ASTNode(stub_graph, index): semantic
+            for index, semantic in [
+                (-1, StatementSemantic()),
+                (0, StatementSemantic(used_objects={"x"})),
+                (-2, StatementSemantic(used_objects={"x"})),
+                (1, StatementSemantic(used_objects={"y"})),
+                (-3, StatementSemantic(used_objects={"y"})),
+            ]
+        }
+
+        self.assertEqual(list(create_extraction_opportunities_ranges(statements_semantic)), [(1, 1), (3, 3)])
+        self.assertEqual(self._get_opportunity_nodes_indexes(statements_semantic), [[0], [1]])
+
+    def test_extraction_opportunity_statements(self):
+        stub_graph = DiGraph()
+        statements = [ASTNode(stub_graph, index) for index in [0, -1, 1, -2, 2]]
+        extraction_opportunity = ExtractionOpportunity(MethodStatements(statements), 0, 4)
+
+        self.assertEqual(len(extraction_opportunity), 2)
+        self.assertEqual(list(extraction_opportunity), [statements[0], statements[2]])
+        self.assertEqual(extraction_opportunity[-1], statements[2])
+        self.assertEqual(extraction_opportunity[:], (statements[0], statements[2]))
+        self.assertIn(statements[2], extraction_opportunity)
+        self.assertNotIn(statements[1], extraction_opportunity)
+        self.assertNotIn(statements[4], extraction_opportunity)
+        with self.assertRaises(IndexError):
+            extraction_opportunity[2]
+
     @staticmethod
     def _get_opportunity_nodes_indexes(
         statements_semantic: Dict[ASTNode, StatementSemantic]
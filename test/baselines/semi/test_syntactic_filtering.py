@@ -1,7 +1,11 @@
 from typing import List
 from unittest import TestCase
 
-from veniq.baselines.semi._syntactic_filter import syntactic_filter
+from veniq.ast_framework.block_statement_graph import build_block_statement_graph
+from veniq.baselines.semi._common_types import ExtractionOpportunity, MethodStatements
+from veniq.baselines.semi._statements_layout import StatementsLayout
+from veniq.baselines.semi._syntactic_filter import SyntacticFilter, syntactic_filter
+from veniq.baselines.semi.extract_semantic import extract_method_statements_semantic
 from .utils import get_method_ast, create_extraction_opportunity
 
 
@@ -24,6 +28,20 @@ class SyntacticFilteringTestCase(TestCase):
     def test_correct_large_opportunity(self):
         self._opportunity_test_helper([5, 6, 7, 8, 9, 11, 12, 15, 19, 20, 21, 22], True)
 
+    def test_statements_ranges(self):
+        method_ast = get_method_ast("SyntacticFilterTest.java", "Test", "testMethod")
+        block_statement_graph = build_block_statement_graph(method_ast)
+        method_statements = MethodStatements(extract_method_statements_semantic(method_ast).keys())
+        method_syntactic_filter = SyntacticFilter(StatementsLayout(block_statement_graph))
+        for begin in range(len(method_statements)):
+            for end in range(begin + 1, len(method_statements) + 1):
+                extraction_opportunity = ExtractionOpportunity(method_statements, begin, end)
+                with self.subTest(begin=begin, end=end):
+                    self.assertEqual(
+                        method_syntactic_filter.is_extractable(extraction_opportunity),
+                        syntactic_filter(tuple(extraction_opportunity), block_statement_graph),
+                    )
+
     def _opportunity_test_helper(
         self, extraction_opportunity_statements_lines: List[int], is_opportunity_correct: bool
     ):
@@ -3,11 +3,7 @@ from typing import List, Tuple, Union
 
 from veniq.ast_framework import AST, ASTNodeType
 from veniq.ast_framework.block_statement_graph import Block, Statement, build_block_statement_graph
-from veniq.baselines.semi._common_types import (
-    ExtractionOpportunity,
-    Statement as ExtractionStatement,
-    StatementSemantic,
-)
+from veniq.baselines.semi._common_types import Statement as ExtractionStatement, StatementSemantic
 from veniq.utils.ast_builder import build_ast
 
 
@@ -17,7 +13,7 @@ def objects_semantic(*objects_names: str) -> StatementSemantic:
 
 def create_extraction_opportunity(
     method_ast: AST, statements_lines: List[int]
-) -> Tuple[ExtractionOpportunity, Statement]:
+) -> Tuple[Tuple[ExtractionStatement, ...], Statement]:
     extraction_opportunity_list: List[ExtractionStatement] = []
     block_statement_graph = build_block_statement_graph(method_ast)
 
@@ -42,7 +38,12 @@ def get_method_ast(filename: str, class_name: str, method_name: str) -> AST:
             if node.node_type == ASTNodeType.CLASS_DECLARATION and node.name == class_name
         )
 
-        method_declaration = next(node for node in class_declaration.methods if node.name == method_name)
+        # constructors are found by the class name
+        method_declaration = next(
+            node
+            for node in [*class_declaration.methods, *class_declaration.constructors]
+            if node.name == method_name
+        )
     except StopIteration:
         raise RuntimeError(f"Failed to find method {method_name} in class {class_name} in file {filepath}")
 
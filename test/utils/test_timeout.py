@@ -0,0 +1,21 @@
+from time import sleep
+from unittest import TestCase
+
+from veniq.utils.timeout import TerminateExecution, deadline
+
+
+class DeadlineTestCase(TestCase):
+    def test_exceeded_deadline(self):
+        with self.assertRaises(TerminateExecution):
+            with deadline(0.01):
+                sleep(1)
+
+    def test_met_deadline(self):
+        with deadline(0.05):
+            sleep(0.01)
+        # timer is cancelled after the block
+        sleep(0.1)
+
+    def test_no_deadline(self):
+        with deadline(None):
+            sleep(0.01)
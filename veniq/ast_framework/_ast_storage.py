@@ -0,0 +1,273 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from hashlib import sha256
+from pickle import dumps, loads, HIGHEST_PROTOCOL
+from struct import Struct
+from sys import intern
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from veniq.ast_framework import ASTNodeType
+from veniq.ast_framework._auxiliary_data import attributes_by_node_type
+
+
+class ASTStorage:
+    """
+    Struct-of-arrays storage of an AST.
+    Every node is identified by its index, which starts from 1.
+    Index 0 is reserved and stands for "no node" in parent, first child and next sibling arrays.
+    Node attributes are kept in a tuple per node, ordered by the node type attributes schema,
+    so no dictionary is allocated per node.
+    For each node type a sorted list of indexes of nodes with that type is maintained,
+    so nodes of particular types are found without scanning the whole storage.
+    """
+
+    def __init__(self) -> None:
+        self._node_types = array('B', [0])
+        self._parents = array('i', [0])
+        self._first_children = array('i', [0])
+        self._next_siblings = array('i', [0])
+        self._lines = array('i', [0])
+        self._subtrees_ends = array('i', [0])
+        self._subtrees_min_lines = array('i', [0])
+        self._closest_ancestors_with_line = array('i', [0])
+        self._attributes: List[Tuple[Any, ...]] = [()]
+        self._nodes_by_type: Dict[int, array] = {}
+
+        # used only during construction to append children in constant time
+        self._last_children = array('i', [0])
+
+        # interned attributes of STRING nodes, as there are lots of repeating identifiers
+        self._string_attributes: Dict[str, Tuple[str]] = {}
+
+        self.fake_nodes_qty = 0
+
+        # javalang nodes, which subtrees are built only on demand, replaced with built ASTs on first access
+        self.lazy_subtrees: Dict[int, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._node_types) - 1
+
+    def add_node(self, node_type: ASTNodeType, line: Optional[int], attributes: Dict[str, Any]) -> int:
+        node_index = len(self._node_types)
+        self._node_types.append(node_type.value)
+        self._parents.append(0)
+        self._first_children.append(0)
+        self._next_siblings.append(0)
+        self._last_children.append(0)
+        self._lines.append(line or 0)
+        self._attributes.append(self._pack_attributes(node_type, attributes))
+
+        # indexes grow monotonically, so every list stays sorted
+        nodes_with_same_type = self._nodes_by_type.get(node_type.value)
+        if nodes_with_same_type is None:
+            nodes_with_same_type = self._nodes_by_type[node_type.value] = array('i')
+        nodes_with_same_type.append(node_index)
+        return node_index
+
+    def add_edge(self, parent_index: int, child_index: int) -> None:
+        self._parents[child_index] = parent_index
+        last_child_index = self._last_children[parent_index]
+        if last_child_index == 0:
+            self._first_children[parent_index] = child_index
+        else:
+            self._next_siblings[last_child_index] = child_index
+        self._last_children[parent_index] = child_index
+
+    def get_type(self, node_index: int) -> ASTNodeType:
+        return _node_type_by_code[self._node_types[node_index]]
+
+    def get_line(self, node_index: int) -> Optional[int]:
+        return self._lines[node_index] or None
+
+    def get_parent(self, node_index: int) -> Optional[int]:
+        return self._parents[node_index] or None
+
+    def get_subtree_end(self, node_index: int) -> int:
+        """
+        Nodes are numbered in pre-order, so subtree of a node occupies range [node_index, subtree_end).
+        """
+        return self._subtrees_ends[node_index]
+
+    def get_subtree_min_line(self, node_index: int) -> Optional[int]:
+        """
+        Returns the smallest line among all nodes in a subtree of a given node.
+        """
+        return self._subtrees_min_lines[node_index] or None
+
+    def get_closest_ancestor_with_line(self, node_index: int) -> Optional[int]:
+        return self._closest_ancestors_with_line[node_index] or None
+
+    def complete_construction(self) -> None:
+        """
+        Must be called after all nodes and edges were added.
+        Calculates subtrees ranges and lines information with one backward and one forward pass.
+        Children always have bigger indexes than their parent,
+        so going backward all children are processed before their parent
+        and going forward a parent is processed before its children.
+        """
+        nodes_qty = len(self._node_types)
+        self._subtrees_ends = array('i', range(1, nodes_qty + 1))
+        self._subtrees_min_lines = array('i', self._lines)
+        for node_index in range(nodes_qty - 1, 0, -1):
+            last_child_index = self._last_children[node_index]
+            if last_child_index != 0:
+                self._subtrees_ends[node_index] = self._subtrees_ends[last_child_index]
+
+            parent_index = self._parents[node_index]
+            min_line = self._subtrees_min_lines[node_index]
+            parent_min_line = self._subtrees_min_lines[parent_index]
+            if parent_index != 0 and min_line != 0 and (parent_min_line == 0 or min_line < parent_min_line):
+                self._subtrees_min_lines[parent_index] = min_line
+
+        self._closest_ancestors_with_line = array('i', bytes(4 * nodes_qty))
+        for node_index in range(1, nodes_qty):
+            parent_index = self._parents[node_index]
+            self._closest_ancestors_with_line[node_index] = \
+                parent_index if self._lines[parent_index] != 0 else self._closest_ancestors_with_line[parent_index]
+
+        self._last_children = array('i')
+
+    def get_children(self, node_index: int) -> Iterator[int]:
+        child_index = self._first_children[node_index]
+        while child_index != 0:
+            yield child_index
+            child_index = self._next_siblings[child_index]
+
+    def get_nodes_with_type(
+        self, node_type: ASTNodeType, first_index: int = 1, last_index: Optional[int] = None
+    ) -> Sequence[int]:
+        """
+        Returns sorted indexes of nodes with given type lying in [first_index, last_index] range.
+        """
+        nodes_with_type = self._nodes_by_type.get(node_type.value)
+        if nodes_with_type is None:
+            return ()
+
+        start = bisect_left(nodes_with_type, first_index)
+        stop = len(nodes_with_type) if last_index is None else bisect_right(nodes_with_type, last_index)
+        return nodes_with_type[start:stop]
+
+    def has_attribute(self, node_index: int, attribute_name: str) -> bool:
+        return attribute_name in attribute_slots_by_node_type[self.get_type(node_index)]
+
+    def get_attribute(self, node_index: int, attribute_name: str) -> Any:
+        slots = attribute_slots_by_node_type[self.get_type(node_index)]
+        return self._attributes[node_index][slots[attribute_name]]
+
+    def get_attribute_values(self, node_index: int) -> Tuple[Any, ...]:
+        """
+        Returns all attributes of a node ordered according to attribute_slots_by_node_type.
+        """
+        return self._attributes[node_index]
+
+    def set_attribute_values(self, node_index: int, values: Tuple[Any, ...]) -> None:
+        self._attributes[node_index] = values
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes a completely constructed storage.
+        All arrays are dumped as is, so loading them back is a plain memory copy.
+        Only attributes tuples are pickled.
+        """
+        if self.lazy_subtrees:
+            raise ValueError("Storage with lazily built subtrees cannot be serialized.")
+
+        node_types_codes = sorted(self._nodes_by_type)
+        parts = [
+            _serialization_header.pack(
+                _SERIALIZATION_MAGIC, len(self._node_types), self.fake_nodes_qty, len(node_types_codes)
+            ),
+            array('i', node_types_codes).tobytes(),
+            array('i', (len(self._nodes_by_type[code]) for code in node_types_codes)).tobytes(),
+        ]
+        parts.extend(self._nodes_by_type[code].tobytes() for code in node_types_codes)
+        parts.extend(getattr(self, name).tobytes() for name in _serialized_arrays_names)
+        parts.append(self._node_types.tobytes())
+        parts.append(dumps(self._attributes, protocol=HIGHEST_PROTOCOL))
+        return b''.join(parts)
+
+    @staticmethod
+    def from_bytes(buffer: memoryview) -> 'ASTStorage':
+        """
+        Restores a storage serialized by 'to_bytes'.
+        Raises ValueError if the buffer does not contain a serialized storage.
+        The buffer must come from a trusted source, as attributes are unpickled from it.
+        """
+        magic, nodes_qty, fake_nodes_qty, node_types_qty = _serialization_header.unpack_from(buffer)
+        if magic != _SERIALIZATION_MAGIC:
+            raise ValueError("Buffer does not contain serialized AST storage.")
+
+        offset = _serialization_header.size
+        node_types_codes, offset = _read_array(buffer, offset, 'i', node_types_qty)
+        nodes_with_type_qtys, offset = _read_array(buffer, offset, 'i', node_types_qty)
+
+        storage = ASTStorage()
+        for code, nodes_with_type_qty in zip(node_types_codes, nodes_with_type_qtys):
+            storage._nodes_by_type[code], offset = _read_array(buffer, offset, 'i', nodes_with_type_qty)
+        for name in _serialized_arrays_names:
+            values, offset = _read_array(buffer, offset, 'i', nodes_qty)
+            setattr(storage, name, values)
+        storage._node_types, offset = _read_array(buffer, offset, 'B', nodes_qty)
+        storage._attributes = loads(buffer[offset:])
+        if not isinstance(storage._attributes, list) or len(storage._attributes) != nodes_qty:
+            raise ValueError("Serialized AST storage has inconsistent attributes.")
+        storage._last_children = array('i')
+        storage.fake_nodes_qty = fake_nodes_qty
+        return storage
+
+    def _pack_attributes(self, node_type: ASTNodeType, attributes: Dict[str, Any]) -> Tuple[Any, ...]:
+        if node_type == ASTNodeType.STRING:
+            string = intern(attributes['string'])
+            return self._string_attributes.setdefault(string, (string,))
+
+        return tuple(
+            intern(attributes[name]) if isinstance(attributes[name], str) else attributes[name]
+            for name in _attribute_names_by_node_type[node_type]
+        )
+
+
+def _read_array(buffer: memoryview, offset: int, typecode: str, size: int) -> Tuple[array, int]:
+    values = array(typecode)
+    end = offset + size * values.itemsize
+    if end > len(buffer):
+        raise ValueError("Serialized AST storage is truncated.")
+    values.frombytes(buffer[offset:end])
+    return values, end
+
+
+_SERIALIZATION_MAGIC = b'VAST'
+
+# magic, nodes qty (including reserved 0 index), fake nodes qty, qty of node types present
+_serialization_header = Struct('<4sIiI')
+
+_serialized_arrays_names = (
+    '_parents',
+    '_first_children',
+    '_next_siblings',
+    '_lines',
+    '_subtrees_ends',
+    '_subtrees_min_lines',
+    '_closest_ancestors_with_line',
+)
+
+_node_type_by_code: List[ASTNodeType] = [ASTNodeType.UNKNOWN] * (max(t.value for t in ASTNodeType) + 1)
+for _node_type in ASTNodeType:
+    _node_type_by_code[_node_type.value] = _node_type
+
+_attribute_names_by_node_type: Dict[ASTNodeType, Tuple[str, ...]] = {
+    node_type: tuple(sorted(attribute_names)) for node_type, attribute_names in attributes_by_node_type.items()
+}
+
+attribute_slots_by_node_type: Dict[ASTNodeType, Dict[str, int]] = {
+    node_type: {name: slot for slot, name in enumerate(attribute_names)}
+    for node_type, attribute_names in _attribute_names_by_node_type.items()
+}
+
+# Node types codes, serialized arrays and attributes schema are not stored along with a storage,
+# so anything persisting serialized storages must be keyed by this digest to never load stale ones.
+SERIALIZATION_SCHEMA_DIGEST = sha256(repr((
+    _SERIALIZATION_MAGIC,
+    _serialization_header.format,
+    _serialized_arrays_names,
+    [(node_type.value, node_type.name, _attribute_names_by_node_type.get(node_type, ())) for node_type in ASTNodeType],
+)).encode()).hexdigest()
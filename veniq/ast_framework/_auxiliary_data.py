@@ -1,4 +1,4 @@
-from typing import Dict, Set, Type, NamedTuple
+from typing import Dict, Set, Tuple, Type, NamedTuple
 
 from javalang import tree
 from javalang.ast import Node
@@ -10,6 +10,24 @@ class ASTNodeReference(NamedTuple):
     node_index: int
 
 
+class ASTNodeReferences(Tuple[int, ...]):
+    """
+    List of references to AST nodes, which is stored as a tuple of their indexes.
+    """
+
+
+class LazySubtreeReference:
+    """
+    Value of an attribute, which nodes are not built yet.
+    They are built together with the whole subtree of a node on first access.
+    """
+
+    __slots__ = ()
+
+
+lazy_subtree_reference = LazySubtreeReference()
+
+
 javalang_to_ast_node_type: Dict[Type[Node], ASTNodeType] = {
     tree.Annotation: ASTNodeType.ANNOTATION,
     tree.AnnotationDeclaration: ASTNodeType.ANNOTATION_DECLARATION,
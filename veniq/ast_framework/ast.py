@@ -1,14 +1,24 @@
-from collections import namedtuple, defaultdict
+from bisect import bisect_right
+from collections import namedtuple
+from heapq import merge
 from itertools import islice, repeat, chain
 
 from deprecated import deprecated  # type: ignore
 from javalang.tree import Node
-from networkx import DiGraph, dfs_labeled_edges, dfs_preorder_nodes  # type: ignore
-from typing import Union, Any, Callable, Set, List, Iterator, Tuple, Dict, cast, Optional
+from typing import Union, Any, Callable, Set, List, Iterator, Iterable, Sequence, Tuple, Dict, Optional
 
 from veniq.ast_framework.ast_node_type import ASTNodeType
-from veniq.ast_framework._auxiliary_data import javalang_to_ast_node_type, attributes_by_node_type, ASTNodeReference
+from veniq.ast_framework._auxiliary_data import (
+    javalang_to_ast_node_type,
+    attributes_by_node_type,
+    ASTNodeReference,
+    ASTNodeReferences,
+    lazy_subtree_reference,
+)
 from veniq.ast_framework.ast_node import ASTNode
+from veniq.ast_framework.ast_visitor import ASTVisitor, create_dispatch_tables
+from veniq.ast_framework.ast_query import ASTQuery, compile_query, run_queries
+from veniq.ast_framework._ast_storage import ASTStorage, attribute_slots_by_node_type
 
 MethodInvocationParams = namedtuple('MethodInvocationParams', ['object_name', 'method_name'])
 
@@ -18,47 +28,67 @@ BinaryOperationParams = namedtuple('BinaryOperationParams', ('operation', 'left_
 
 TraverseCallback = Callable[[ASTNode], None]
 
+# Sorted disjoint half-open ranges [start, end) of node indexes
+NodesIntervals = Tuple[Tuple[int, int], ...]
+
 
 class AST:
-    def __init__(self, networkx_tree: DiGraph, root: int):
-        self.tree = networkx_tree
+    def __init__(self, storage: ASTStorage, root: int, intervals: Optional[NodesIntervals] = None):
+        '''
+        storage: all nodes of the original AST
+        root: index of a root node
+        intervals: ranges of indexes of nodes forming this AST, if None all nodes from the storage are used.
+        Nodes are numbered in pre-order, so any subtree occupies a single range of indexes.
+        '''
         self.root = root
+        self._storage = storage
+        self._intervals = intervals
+        self._intervals_starts = [start for start, _ in intervals] if intervals is not None else []
+
+        # each node is represented by a single ASTNode object
+        self._nodes_cache: Dict[int, ASTNode] = {}
 
     @staticmethod
-    def build_from_javalang(javalang_ast_root: Node) -> 'AST':
-        tree = DiGraph()
-        javalang_node_to_index_map: Dict[Node, int] = {}
-        root = AST._add_subtree_from_javalang_node(tree, javalang_ast_root,
-                                                   javalang_node_to_index_map)
-        AST._replace_javalang_nodes_in_attributes(tree, javalang_node_to_index_map)
-        return AST(tree, root)
+    def build_from_javalang(javalang_ast_root: Node, lazy_methods_bodies: bool = False) -> 'AST':
+        '''
+        If lazy_methods_bodies is True, bodies of methods and constructors are not built upfront.
+        Such AST contains only skeletons of declarations, so searching and traversing it
+        does not reach statements of methods.
+        Whole subtree of a method or a constructor is built on the first call of 'get_subtree'
+        or 'get_subtrees' for it, or on the first access to its 'body'.
+        Such subtree is a separate AST, so its root has no parent.
+        '''
+        storage = ASTStorage()
+        root = AST._add_tree_from_javalang(storage, javalang_ast_root, lazy_methods_bodies)
+        storage.complete_construction()
+        return AST(storage, root)
 
     def __str__(self) -> str:
         printed_graph = ''
         depth = 0
-        for _, destination, edge_type in dfs_labeled_edges(self.tree, self.root):
-            if edge_type == 'forward':
+        for node_index, is_entering in self._traverse_labeled_nodes(self.root):
+            if is_entering:
                 printed_graph += '|   ' * depth
-                node_type = self.tree.nodes[destination]['node_type']
+                node_type = self._storage.get_type(node_index)
                 printed_graph += str(node_type) + ': '
                 if node_type == ASTNodeType.STRING:
-                    printed_graph += self.tree.nodes[destination]['string'] + ', '
-                printed_graph += f'node index = {destination}'
-                node_line = self.tree.nodes[destination]['line']
+                    printed_graph += self._storage.get_attribute(node_index, 'string') + ', '
+                printed_graph += f'node index = {node_index}'
+                node_line = self._storage.get_line(node_index)
                 if node_line is not None:
                     printed_graph += f', line = {node_line}'
                 printed_graph += '\n'
                 depth += 1
-            elif edge_type == 'reverse':
+            else:
                 depth -= 1
         return printed_graph
 
     def get_root(self) -> ASTNode:
-        return ASTNode(self.tree, self.root)
+        return self._get_node(self.root)
 
     def __iter__(self) -> Iterator[ASTNode]:
-        for node_index in self.tree.nodes:
-            yield ASTNode(self.tree, node_index)
+        for node_index in self._get_nodes_indexes():
+            yield self._get_node(node_index)
 
     def get_subtrees(self, *root_type: ASTNodeType) -> Iterator['AST']:
         '''
@@ -66,27 +96,37 @@ class AST:
         If such subtrees are one including the other, only the larger one is
         going to be in resulted sequence.
         '''
-        is_inside_subtree = False
-        current_subtree_root = -1  # all node indexes are positive
-        subtree: List[int] = []
-        for _, destination, edge_type in dfs_labeled_edges(self.tree, self.root):
-            if edge_type == 'forward':
-                if is_inside_subtree:
-                    subtree.append(destination)
-                elif self.tree.nodes[destination]['node_type'] in root_type:
-                    subtree.append(destination)
-                    is_inside_subtree = True
-                    current_subtree_root = destination
-            elif edge_type == 'reverse' and destination == current_subtree_root:
-                is_inside_subtree = False
-                yield AST(self.tree.subgraph(subtree), current_subtree_root)
-                subtree = []
-                current_subtree_root = -1
+        current_subtree_end = 0
+        for node_index in self._get_nodes_indexes_with_types(*root_type):
+            if node_index >= current_subtree_end:
+                current_subtree_end = self._storage.get_subtree_end(node_index)
+                if node_index in self._storage.lazy_subtrees:
+                    yield self._get_lazy_subtree(node_index)
+                else:
+                    yield AST(self._storage, node_index, self._intersect_intervals(node_index, current_subtree_end))
 
     def get_subtree(self, node: ASTNode) -> 'AST':
-        subtree_nodes_indexes = dfs_preorder_nodes(self.tree, node.node_index)
-        subtree = self.tree.subgraph(subtree_nodes_indexes)
-        return AST(subtree, node.node_index)
+        if node.node_index in self._storage.lazy_subtrees:
+            return self._get_lazy_subtree(node.node_index)
+
+        subtree_end = self._storage.get_subtree_end(node.node_index)
+        return AST(self._storage, node.node_index, self._intersect_intervals(node.node_index, subtree_end))
+
+    def get_subgraph(self, root: ASTNode, nodes: Iterable[ASTNode]) -> 'AST':
+        '''
+        Creates AST consisting only of given nodes and a root.
+        Nodes, which are not in the current AST, are ignored.
+        '''
+        nodes_indexes = {node.node_index for node in nodes if self._contains(node.node_index)}
+        nodes_indexes.add(root.node_index)
+
+        intervals: List[Tuple[int, int]] = []
+        for node_index in sorted(nodes_indexes):
+            if intervals and intervals[-1][1] == node_index:
+                intervals[-1] = (intervals[-1][0], node_index + 1)
+            else:
+                intervals.append((node_index, node_index + 1))
+        return AST(self._storage, root.node_index, tuple(intervals))
 
     def traverse(
         self,
@@ -95,37 +135,66 @@ class AST:
         source_node: Optional[ASTNode] = None,
         undirected=False
     ):
-        traverse_graph = self.tree.to_undirected(as_view=True) if undirected else self.tree
         if source_node is None:
             source_node = self.get_root()
 
-        for _, destination, edge_type in dfs_labeled_edges(traverse_graph, source_node.node_index):
-            if edge_type == "forward":
-                on_node_entering(ASTNode(self.tree, destination))
-            elif edge_type == "reverse":
-                on_node_leaving(ASTNode(self.tree, destination))
+        for node_index, is_entering in self._traverse_labeled_nodes(source_node.node_index, undirected):
+            if is_entering:
+                on_node_entering(self._get_node(node_index))
+            else:
+                on_node_leaving(self._get_node(node_index))
+
+    def traverse_many(self, visitors: Iterable[ASTVisitor], source_node: Optional[ASTNode] = None) -> None:
+        '''
+        Traverses AST once passing each node to all visitors interested in its type.
+        For every node visitors are called in the order they are given.
+        '''
+        if source_node is None:
+            source_node = self.get_root()
+
+        on_entering, on_leaving = create_dispatch_tables(visitors)
+        get_type = self._storage.get_type
+        for node_index, is_entering in self._traverse_labeled_nodes(source_node.node_index):
+            callbacks = (on_entering if is_entering else on_leaving).get(get_type(node_index))
+            if callbacks:
+                node = self._get_node(node_index)
+                for callback in callbacks:
+                    callback(node)
+
+    def select(self, selector: Union[str, ASTQuery]) -> Iterator[ASTNode]:
+        '''
+        Yields nodes matching a selector in pre-order.
+        See veniq.ast_framework.ast_query for the selectors syntax.
+        '''
+        query = compile_query(selector) if isinstance(selector, str) else selector
+        return query.select(self)
+
+    def select_many(self, selectors: Sequence[Union[str, ASTQuery]]) -> List[List[ASTNode]]:
+        '''
+        Runs several selectors in a single pass over the AST.
+        Returns lists of matching nodes in the same order as selectors.
+        '''
+        return run_queries(self, selectors)
 
     def create_fake_node(self) -> ASTNode:
-        fake_nodes_qty = self._fake_nodes_qty_per_graph[self.tree]
-        self._fake_nodes_qty_per_graph[self.tree] += 1
-        new_fake_node_id = -(fake_nodes_qty + 1)
-        return ASTNode(self.tree, new_fake_node_id)
+        self._storage.fake_nodes_qty += 1
+        return self._get_node(-self._storage.fake_nodes_qty)
 
     @deprecated(reason='Use ASTNode functionality instead.')
     def children_with_type(self, node: int, child_type: ASTNodeType) -> Iterator[int]:
         '''
         Yields children of node with given type.
         '''
-        for child in self.tree.succ[node]:
-            if self.tree.nodes[child]['node_type'] == child_type:
+        for child in self._get_children_indexes(node):
+            if self._storage.get_type(child) == child_type:
                 yield child
 
     @deprecated(reason='Use ASTNode functionality instead.')
     def list_all_children_with_type(self, node: int, child_type: ASTNodeType) -> List[int]:
         list_node: List[int] = []
-        for child in self.tree.succ[node]:
+        for child in self._get_children_indexes(node):
             list_node = list_node + self.list_all_children_with_type(child, child_type)
-            if self.tree.nodes[child]['node_type'] == child_type:
+            if self._storage.get_type(child) == child_type:
                 list_node.append(child)
         return sorted(list_node)
 
@@ -138,12 +207,15 @@ class AST:
             yield child
 
     @deprecated(reason='Use ASTNode functionality instead.')
-    def get_first_n_children_with_type(self, node: int, child_type: ASTNodeType, quantity: int) -> List[int]:
+    def get_first_n_children_with_type(self, node: int, child_type: ASTNodeType,
+                                       quantity: int) -> List[Optional[int]]:
         '''
         Returns first quantity of children of node with type child_type.
         Resulted list is padded with None to length quantity.
         '''
-        children_with_type = (child for child in self.tree.succ[node] if self.get_type(child) == child_type)
+        children_with_type: Iterator[Optional[int]] = (
+            child for child in self._get_children_indexes(node) if self.get_type(child) == child_type
+        )
         children_with_type_padded = chain(children_with_type, repeat(None))
         return list(islice(children_with_type_padded, 0, quantity))
 
@@ -155,7 +227,7 @@ class AST:
 
     @deprecated(reason='Use ASTNode functionality instead.')
     def get_line_number_from_children(self, node: int) -> int:
-        for child in self.tree.succ[node]:
+        for child in self._get_children_indexes(node):
             cur_line = self.get_attr(child, 'line')
             if cur_line is not None:
                 return cur_line
@@ -163,18 +235,21 @@ class AST:
 
     @deprecated(reason='Use get_proxy_nodes instead.')
     def get_nodes(self, type: Union[ASTNodeType, None] = None) -> Iterator[int]:
-        for node in self.tree.nodes:
-            if type is None or self.tree.nodes[node]['node_type'] == type:
-                yield node
+        if type is None:
+            yield from self._get_nodes_indexes()
+        else:
+            yield from self._get_nodes_indexes_with_types(type)
 
     def get_proxy_nodes(self, *types: ASTNodeType) -> Iterator[ASTNode]:
-        for node in self.tree.nodes:
-            if len(types) == 0 or self.tree.nodes[node]['node_type'] in types:
-                yield ASTNode(self.tree, node)
+        nodes_indexes = self._get_nodes_indexes_with_types(*types) if types else self._get_nodes_indexes()
+        for node in nodes_indexes:
+            yield self._get_node(node)
 
     @deprecated(reason='Use ASTNode functionality instead.')
     def get_attr(self, node: int, attr_name: str, default_value: Any = None) -> Any:
-        return self.tree.nodes[node].get(attr_name, default_value)
+        if attr_name in ('node_type', 'line') or self._storage.has_attribute(node, attr_name):
+            return self._get_attribute(node, attr_name)
+        return default_value
 
     @deprecated(reason='Use ASTNode functionality instead.')
     def get_type(self, node: int) -> ASTNodeType:
@@ -215,65 +290,289 @@ class AST:
     @deprecated(reason='Use ASTNode functionality instead.')
     def get_binary_operation_params(self, binary_operation_node: int) -> BinaryOperationParams:
         assert(self.get_type(binary_operation_node) == ASTNodeType.BINARY_OPERATION)
-        operation_node, left_side_node, right_side_node = self.tree.succ[binary_operation_node]
+        operation_node, left_side_node, right_side_node = self._get_children_indexes(binary_operation_node)
         return BinaryOperationParams(self.get_attr(operation_node, 'string'), left_side_node, right_side_node)
 
+    def _get_node(self, node_index: int) -> ASTNode:
+        node = self._nodes_cache.get(node_index)
+        if node is None:
+            node = self._nodes_cache[node_index] = ASTNode(self, node_index)
+        return node
+
+    def _get_lazy_subtree(self, node_index: int) -> 'AST':
+        '''
+        Builds subtree of a node, which was postponed in lazy mode.
+        Built subtree is kept in the storage, so it is built only once for all views of the AST.
+        '''
+        subtree = self._storage.lazy_subtrees[node_index]
+        if not isinstance(subtree, AST):
+            subtree = self._storage.lazy_subtrees[node_index] = AST.build_from_javalang(subtree)
+        return subtree
+
+    def _get_intervals(self) -> NodesIntervals:
+        if self._intervals is None:
+            return ((1, len(self._storage) + 1),)
+        return self._intervals
+
+    def _get_nodes_indexes(self) -> Iterator[int]:
+        return chain.from_iterable(range(start, end) for start, end in self._get_intervals())
+
+    def _get_subtree_indexes(self, node_index: int) -> Iterator[int]:
+        subtree_end = self._storage.get_subtree_end(node_index)
+        return chain.from_iterable(
+            range(start, end) for start, end in self._intersect_intervals(node_index, subtree_end)
+        )
+
+    def _get_nodes_indexes_with_types(self, *types: ASTNodeType) -> Iterator[int]:
+        if not types:
+            return iter(())
+        nodes_with_types = [self._get_nodes_indexes_with_type(node_type) for node_type in set(types)]
+        return nodes_with_types[0] if len(nodes_with_types) == 1 else merge(*nodes_with_types)
+
+    def _get_nodes_indexes_with_type(self, node_type: ASTNodeType) -> Iterator[int]:
+        for start, end in self._get_intervals():
+            yield from self._storage.get_nodes_with_type(node_type, start, end - 1)
+
+    def _intersect_intervals(self, start: int, end: int) -> NodesIntervals:
+        '''
+        Intersects range [start, end) with nodes of the current AST.
+        '''
+        if self._intervals is None:
+            return ((start, end),)
+
+        intervals: List[Tuple[int, int]] = []
+        first_interval = max(bisect_right(self._intervals_starts, start) - 1, 0)
+        for interval_start, interval_end in self._intervals[first_interval:]:
+            if interval_start >= end:
+                break
+            if max(start, interval_start) < min(end, interval_end):
+                intervals.append((max(start, interval_start), min(end, interval_end)))
+        return tuple(intervals)
+
+    def _contains(self, node_index: int) -> bool:
+        if self._intervals is None:
+            return True
+
+        interval_index = bisect_right(self._intervals_starts, node_index) - 1
+        return interval_index >= 0 and node_index < self._intervals[interval_index][1]
+
+    def _get_children_indexes(self, node_index: int) -> Iterator[int]:
+        for child_index in self._storage.get_children(node_index):
+            if self._contains(child_index):
+                yield child_index
+
+    def _get_parent_index(self, node_index: int) -> Optional[int]:
+        parent_index = self._storage.get_parent(node_index)
+        if parent_index is not None and self._contains(parent_index):
+            return parent_index
+        return None
+
+    def _get_line(self, node_index: int) -> Optional[int]:
+        '''
+        Line of a node, if node has no such information
+        the smallest line of nodes reachable from it is used,
+        otherwise line of the closest ancestor.
+        '''
+        line = self._storage.get_line(node_index)
+        if line is not None:
+            return line
+
+        if self._contains_subtree(node_index):
+            line = self._storage.get_subtree_min_line(node_index)
+        else:
+            line = min(
+                filter(None, map(self._storage.get_line, self._get_subtree_indexes(node_index))),
+                default=None,
+            )
+        if line is not None:
+            return line
+
+        ancestor_index = self._storage.get_closest_ancestor_with_line(node_index)
+        if ancestor_index is None:
+            return None
+        if self._contains_path_to_ancestor(node_index, ancestor_index):
+            return self._storage.get_line(ancestor_index)
+        return None
+
+    def _contains_subtree(self, node_index: int) -> bool:
+        if self._intervals is None:
+            return True
+
+        interval_index = bisect_right(self._intervals_starts, node_index) - 1
+        return interval_index >= 0 and self._storage.get_subtree_end(node_index) <= self._intervals[interval_index][1]
+
+    def _contains_path_to_ancestor(self, node_index: int, ancestor_index: int) -> bool:
+        if self._intervals is None:
+            return True
+
+        # all nodes on a path have indexes between ancestor and node indexes
+        interval_index = bisect_right(self._intervals_starts, node_index) - 1
+        if interval_index >= 0 and ancestor_index >= self._intervals[interval_index][0]:
+            return True
+
+        parent_index = self._get_parent_index(node_index)
+        while parent_index is not None and parent_index != ancestor_index:
+            parent_index = self._get_parent_index(parent_index)
+        return parent_index == ancestor_index
+
+    def _get_attribute(self, node_index: int, attribute_name: str) -> Any:
+        if attribute_name == 'node_type':
+            return self._storage.get_type(node_index)
+        elif attribute_name == 'line':
+            return self._storage.get_line(node_index)
+        return self._storage.get_attribute(node_index, attribute_name)
+
+    def _traverse_labeled_nodes(self, source: int, undirected: bool = False) -> Iterator[Tuple[int, bool]]:
+        if not undirected and self._contains_subtree(source):
+            return self._preorder_labeled_nodes(source)
+        return self._dfs_labeled_nodes(source, undirected)
+
+    def _preorder_labeled_nodes(self, source: int) -> Iterator[Tuple[int, bool]]:
+        '''
+        Same as '_dfs_labeled_nodes', but for a subtree fully present in the AST.
+        Nodes are numbered in pre-order, so entering them one by one by index is a depth first search,
+        and a node is left, when the search goes beyond its subtree range.
+        '''
+        get_subtree_end = self._storage.get_subtree_end
+        entered_nodes_ends: List[Tuple[int, int]] = []
+        for node_index in range(source, get_subtree_end(source)):
+            while entered_nodes_ends and entered_nodes_ends[-1][1] <= node_index:
+                yield entered_nodes_ends.pop()[0], False
+            yield node_index, True
+            entered_nodes_ends.append((node_index, get_subtree_end(node_index)))
+
+        while entered_nodes_ends:
+            yield entered_nodes_ends.pop()[0], False
+
+    def _dfs_labeled_nodes(self, source: int, undirected: bool = False) -> Iterator[Tuple[int, bool]]:
+        '''
+        Depth first search from source node.
+        Yields pairs of a node index and a flag, which is True on entering a node and False on leaving it.
+        If undirected is True parents are visited as well as children.
+        '''
+        visited = {source}
+        yield source, True
+        stack = [(source, self._get_neighbours_indexes(source, undirected))]
+        while stack:
+            node_index, neighbours = stack[-1]
+            for neighbour_index in neighbours:
+                if neighbour_index not in visited:
+                    visited.add(neighbour_index)
+                    yield neighbour_index, True
+                    stack.append((neighbour_index, self._get_neighbours_indexes(neighbour_index, undirected)))
+                    break
+            else:
+                stack.pop()
+                yield node_index, False
+
+    def _get_neighbours_indexes(self, node_index: int, undirected: bool) -> Iterator[int]:
+        yield from self._get_children_indexes(node_index)
+        if undirected:
+            parent_index = self._get_parent_index(node_index)
+            if parent_index is not None:
+                yield parent_index
+
     @staticmethod
-    def _add_subtree_from_javalang_node(tree: DiGraph, javalang_node: Union[Node, Set[Any], str],
-                                        javalang_node_to_index_map: Dict[Node, int]) -> int:
-        node_index, node_type = AST._add_javalang_node(tree, javalang_node)
-        if node_index != AST._UNKNOWN_NODE_TYPE and \
-           node_type not in {ASTNodeType.COLLECTION, ASTNodeType.STRING}:
-            javalang_standard_node = cast(Node, javalang_node)
-            javalang_node_to_index_map[javalang_standard_node] = node_index
-            AST._add_javalang_children(tree, javalang_standard_node.children, node_index,
-                                       javalang_node_to_index_map)
-        return node_index
+    def _add_tree_from_javalang(storage: ASTStorage, javalang_ast_root: Node, lazy_methods_bodies: bool) -> int:
+        '''
+        Adds nodes in pre-order using an explicit stack, so depth of a tree is not limited by recursion.
+        References to other nodes in attributes of a node are resolved, when the node is left,
+        as at that moment all its descendants already have indexes.
+        '''
+        javalang_node_to_index_map: Dict[Node, int] = {}
+        root_index, root_type = AST._add_javalang_node(storage, javalang_ast_root)
+        javalang_node_to_index_map[javalang_ast_root] = root_index
+
+        # each stack item is an index of a node and an iterator over its children, which are not yet added
+        stack: List[Tuple[int, Iterator[Any]]] = [(
+            root_index,
+            AST._flatten(AST._get_javalang_children(storage, root_index, root_type, javalang_ast_root,
+                                                    lazy_methods_bodies)),
+        )]
+        while stack:
+            parent_index, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                AST._replace_javalang_nodes_in_attributes(storage, parent_index, javalang_node_to_index_map)
+                continue
+
+            child_index, child_type = AST._add_javalang_node(storage, child)
+            if child_index == AST._UNKNOWN_NODE_TYPE:
+                continue
+
+            storage.add_edge(parent_index, child_index)
+            if child_type not in {ASTNodeType.COLLECTION, ASTNodeType.STRING}:
+                javalang_node_to_index_map[child] = child_index
+                stack.append((
+                    child_index,
+                    AST._flatten(AST._get_javalang_children(storage, child_index, child_type, child,
+                                                            lazy_methods_bodies)),
+                ))
+
+        return root_index
+
+    @staticmethod
+    def _get_javalang_children(storage: ASTStorage, node_index: int, node_type: ASTNodeType,
+                               javalang_node: Node, lazy_methods_bodies: bool) -> List[Any]:
+        '''
+        In lazy mode a body of a method or a constructor is not added.
+        Instead the declaration is remembered to build its whole subtree on demand.
+        '''
+        if not lazy_methods_bodies or node_type not in AST._LAZY_BODY_NODE_TYPES or \
+                not getattr(javalang_node, 'body'):
+            return javalang_node.children
+
+        storage.lazy_subtrees[node_index] = javalang_node
+        attribute_values = list(storage.get_attribute_values(node_index))
+        attribute_values[attribute_slots_by_node_type[node_type]['body']] = lazy_subtree_reference
+        storage.set_attribute_values(node_index, tuple(attribute_values))
+        return [getattr(javalang_node, attribute_name)
+                for attribute_name in javalang_node.attrs if attribute_name != 'body']
 
     @staticmethod
-    def _add_javalang_children(tree: DiGraph, children: List[Any], parent_index: int,
-                               javalang_node_to_index_map: Dict[Node, int]) -> None:
+    def _flatten(children: List[Any]) -> Iterator[Any]:
+        '''
+        Yields javalang children, which are not None, unwrapping nested lists.
+        '''
         for child in children:
             if isinstance(child, list):
-                AST._add_javalang_children(tree, child, parent_index, javalang_node_to_index_map)
-            else:
-                child_index = AST._add_subtree_from_javalang_node(tree, child, javalang_node_to_index_map)
-                if child_index != AST._UNKNOWN_NODE_TYPE:
-                    tree.add_edge(parent_index, child_index)
+                yield from AST._flatten(child)
+            elif child is not None:
+                yield child
 
     @staticmethod
-    def _add_javalang_node(tree: DiGraph, javalang_node: Union[Node, Set[Any], str]) -> Tuple[int, ASTNodeType]:
+    def _add_javalang_node(storage: ASTStorage,
+                           javalang_node: Union[Node, Set[Any], str]) -> Tuple[int, ASTNodeType]:
         node_index = AST._UNKNOWN_NODE_TYPE
         node_type = ASTNodeType.UNKNOWN
         if isinstance(javalang_node, Node):
-            node_index, node_type = AST._add_javalang_standard_node(tree, javalang_node)
+            node_index, node_type = AST._add_javalang_standard_node(storage, javalang_node)
         elif isinstance(javalang_node, set):
-            node_index = AST._add_javalang_collection_node(tree, javalang_node)
+            node_index = AST._add_javalang_collection_node(storage, javalang_node)
             node_type = ASTNodeType.COLLECTION
         elif isinstance(javalang_node, str):
-            node_index = AST._add_javalang_string_node(tree, javalang_node)
+            node_index = AST._add_javalang_string_node(storage, javalang_node)
             node_type = ASTNodeType.STRING
 
         return node_index, node_type
 
     @staticmethod
-    def _add_javalang_standard_node(tree: DiGraph, javalang_node: Node) -> Tuple[int, ASTNodeType]:
-        node_index = len(tree) + 1
+    def _add_javalang_standard_node(storage: ASTStorage, javalang_node: Node) -> Tuple[int, ASTNodeType]:
         node_type = javalang_to_ast_node_type[type(javalang_node)]
 
         attr_names = attributes_by_node_type[node_type]
         attributes = {attr_name: getattr(javalang_node, attr_name) for attr_name in attr_names}
 
-        attributes['node_type'] = node_type
-        attributes['line'] = javalang_node.position.line if javalang_node.position is not None else None
+        line = javalang_node.position.line if javalang_node.position is not None else None
 
-        AST._post_process_javalang_attributes(tree, node_type, attributes)
+        AST._post_process_javalang_attributes(node_type, attributes)
 
-        tree.add_node(node_index, **attributes)
+        node_index = storage.add_node(node_type, line, attributes)
         return node_index, node_type
 
     @staticmethod
-    def _post_process_javalang_attributes(tree: DiGraph, node_type: ASTNodeType, attributes: Dict[str, Any]) -> None:
+    def _post_process_javalang_attributes(node_type: ASTNodeType, attributes: Dict[str, Any]) -> None:
         """
         Replace some attributes with more appropriate values for convenient work
         """
@@ -289,48 +588,53 @@ class AST:
             attributes["qualifier"] = None
 
     @staticmethod
-    def _add_javalang_collection_node(tree: DiGraph, collection_node: Set[Any]) -> int:
-        node_index = len(tree) + 1
-        tree.add_node(node_index, node_type=ASTNodeType.COLLECTION, line=None)
+    def _add_javalang_collection_node(storage: ASTStorage, collection_node: Set[Any]) -> int:
+        node_index = storage.add_node(ASTNodeType.COLLECTION, None, {})
         # we expect only strings in collection
         # we add them here as children
         for item in collection_node:
             if type(item) == str:
-                string_node_index = AST._add_javalang_string_node(tree, item)
-                tree.add_edge(node_index, string_node_index)
+                string_node_index = AST._add_javalang_string_node(storage, item)
+                storage.add_edge(node_index, string_node_index)
             elif item is not None:
                 raise ValueError('Unexpected javalang AST node type {} inside \
                                  "COLLECTION" node'.format(type(item)))
         return node_index
 
     @staticmethod
-    def _add_javalang_string_node(tree: DiGraph, string_node: str) -> int:
-        node_index = len(tree) + 1
-        tree.add_node(node_index, node_type=ASTNodeType.STRING, string=string_node, line=None)
-        return node_index
+    def _add_javalang_string_node(storage: ASTStorage, string_node: str) -> int:
+        return storage.add_node(ASTNodeType.STRING, None, {'string': string_node})
 
     @staticmethod
-    def _replace_javalang_nodes_in_attributes(tree: DiGraph,
+    def _replace_javalang_nodes_in_attributes(storage: ASTStorage, node_index: int,
                                               javalang_node_to_index_map: Dict[Node, int]) -> None:
         '''
-        All javalang nodes found in networkx nodes attributes are replaced
-        with references to according networkx nodes.
+        All javalang nodes found in attributes of a node are replaced
+        with references to according AST nodes.
         Supported attributes types:
          - just javalang Node
          - list of javalang Nodes and other such lists (with any depth)
+        Flat lists of javalang Nodes are replaced with ASTNodeReferences,
+        so they can be resolved without inspecting every item.
         '''
-        for node, attributes in tree.nodes.items():
-            for attribute_name in attributes:
-                attribute_value = attributes[attribute_name]
-                if isinstance(attribute_value, Node):
-                    node_reference = AST._create_reference_to_node(attribute_value,
-                                                                   javalang_node_to_index_map)
-                    tree.add_node(node, **{attribute_name: node_reference})
-                elif isinstance(attribute_value, list):
-                    node_references = \
-                        AST._replace_javalang_nodes_in_list(attribute_value,
-                                                            javalang_node_to_index_map)
-                    tree.add_node(node, **{attribute_name: node_references})
+        attribute_values = storage.get_attribute_values(node_index)
+        if not any(isinstance(value, (Node, list)) for value in attribute_values):
+            return
+
+        new_attribute_values: List[Any] = []
+        for attribute_value in attribute_values:
+            if isinstance(attribute_value, Node):
+                attribute_value = AST._create_reference_to_node(attribute_value, javalang_node_to_index_map)
+            elif isinstance(attribute_value, list) and \
+                    all(isinstance(item, Node) for item in attribute_value):
+                attribute_value = ASTNodeReferences(
+                    javalang_node_to_index_map[item] for item in attribute_value
+                )
+            elif isinstance(attribute_value, list):
+                attribute_value = AST._replace_javalang_nodes_in_list(attribute_value,
+                                                                      javalang_node_to_index_map)
+            new_attribute_values.append(attribute_value)
+        storage.set_attribute_values(node_index, tuple(new_attribute_values))
 
     @staticmethod
     def _replace_javalang_nodes_in_list(javalang_nodes_list: List[Any],
@@ -364,4 +668,4 @@ class AST:
 
     _UNKNOWN_NODE_TYPE = -1
 
-    _fake_nodes_qty_per_graph: Dict[DiGraph, int] = defaultdict(lambda: 0)
+    _LAZY_BODY_NODE_TYPES = {ASTNodeType.METHOD_DECLARATION, ASTNodeType.CONSTRUCTOR_DECLARATION}
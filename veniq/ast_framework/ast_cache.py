@@ -0,0 +1,109 @@
+from hashlib import sha256
+from mmap import mmap, ACCESS_READ
+from os import replace
+from pathlib import Path
+from struct import Struct
+from tempfile import NamedTemporaryFile
+from typing import Optional, Union
+
+from veniq import __version__
+from veniq.ast_framework.ast import AST
+from veniq.ast_framework._ast_storage import ASTStorage, SERIALIZATION_SCHEMA_DIGEST
+from veniq.utils import ast_builder
+
+
+class ASTCache:
+    """
+    Persistent on-disk cache of ASTs built from Java sources.
+    Entries are addressed by a hash of a source content together with veniq version
+    and layout of AST storage, so neither changed sources nor new versions of veniq ever get a stale AST.
+    Each entry holds a binary dump of an AST storage. On load the entry file is memory-mapped,
+    its arrays are copied out of the mapping and nodes attributes are unpickled,
+    so sources found in the cache are not decoded, tokenized and parsed again.
+    Entries are written atomically, so a cache directory can be shared by several processes.
+    Unpickling can execute arbitrary code, so a cache directory must be trusted
+    as much as the code of veniq itself, i.e. writable only by its users.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self._directory = Path(directory)
+
+    def load(self, source: bytes) -> Optional[AST]:
+        """
+        Returns AST of a given source, if it is present in the cache, and None otherwise.
+        Corrupted entries are treated as absent.
+        """
+        try:
+            with open(self._get_entry_path(source), 'rb') as entry_file, \
+                    mmap(entry_file.fileno(), 0, access=ACCESS_READ) as entry, \
+                    memoryview(entry) as buffer:
+                return _read_entry(buffer)
+        except (FileNotFoundError, ValueError):  # entry is absent or empty
+            return None
+
+    def save(self, source: bytes, ast: AST) -> None:
+        """
+        Stores AST built from a whole given source.
+        """
+        entry_path = self._get_entry_path(source)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        with NamedTemporaryFile(dir=entry_path.parent, delete=False) as entry_file:
+            entry_file.write(_entry_header.pack(ast.root))
+            entry_file.write(ast._storage.to_bytes())
+        replace(entry_file.name, entry_path)
+
+    def _get_entry_path(self, source: bytes) -> Path:
+        key = sha256(f'{__version__}:{_CACHE_FORMAT_VERSION}:{SERIALIZATION_SCHEMA_DIGEST}:'.encode())
+        key.update(source)
+        digest = key.hexdigest()
+        # entries are spread among subdirectories to keep directories small on large corpora
+        return self._directory / digest[:2] / digest[2:]
+
+
+def _read_entry(buffer: memoryview) -> Optional[AST]:
+    # errors are handled here, so no views of the mapped memory are kept alive by a traceback
+    try:
+        root, = _entry_header.unpack_from(buffer)
+        storage = ASTStorage.from_bytes(buffer[_entry_header.size:])
+    except Exception:  # unpickling of a damaged entry may raise almost anything
+        return None
+    return AST(storage, root)
+
+
+def build_ast_from_source(
+    source: Union[str, bytes], ast_cache: Optional[ASTCache] = None, lazy_methods_bodies: bool = False
+) -> AST:
+    """
+    Builds AST of a Java source given as a text or as bytes with autodetected encoding.
+    If a cache is given, AST is looked up there first and saved there after building.
+    Texts are cached under their UTF-8 encoding.
+    Only complete ASTs are cached, so methods bodies are built lazily only without a cache.
+    See AST.build_from_javalang for details on lazy building.
+    """
+    source_bytes = source.encode('utf-8') if isinstance(source, str) else source
+    if ast_cache is not None:
+        ast = ast_cache.load(source_bytes)
+        if ast is not None:
+            return ast
+
+    javalang_ast = ast_builder.build_ast_from_source(source)
+    if ast_cache is None:
+        return AST.build_from_javalang(javalang_ast, lazy_methods_bodies)
+
+    ast = AST.build_from_javalang(javalang_ast)
+    ast_cache.save(source_bytes, ast)
+    return ast
+
+
+def build_ast_from_file(
+    filename: Union[str, Path], ast_cache: Optional[ASTCache] = None, lazy_methods_bodies: bool = False
+) -> AST:
+    with open(filename, 'rb') as source_file:
+        return build_ast_from_source(source_file.read(), ast_cache, lazy_methods_bodies)
+
+
+# must be increased whenever layout of AST storage is changed,
+# changes of attributes schema and node types are tracked by SERIALIZATION_SCHEMA_DIGEST
+_CACHE_FORMAT_VERSION = 2
+
+_entry_header = Struct('<i')
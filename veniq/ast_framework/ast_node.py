@@ -1,21 +1,31 @@
 from inspect import getmembers
-from typing import Any, List, Iterator, Optional
-
-from networkx import DiGraph, dfs_preorder_nodes  # type: ignore
-from cached_property import cached_property  # type: ignore
+from typing import Any, Callable, Dict, List, Iterator, Optional, TYPE_CHECKING
 
 from veniq.ast_framework._auxiliary_data import (
     common_attributes,
     attributes_by_node_type,
     ASTNodeReference,
+    ASTNodeReferences,
+    LazySubtreeReference,
 )
 from veniq.ast_framework import ASTNodeType
+from veniq.ast_framework._ast_storage import attribute_slots_by_node_type
 from veniq.ast_framework.computed_fields_registry import computed_fields_registry
 
+if TYPE_CHECKING:
+    from veniq.ast_framework import AST
+
 
 class ASTNode:
-    def __init__(self, graph: DiGraph, node_index: int):
-        self._graph = graph
+    """
+    Lightweight proxy to a node stored in an AST.
+    Use AST methods to get nodes, as AST caches them, so each node is represented by a single object.
+    """
+
+    __slots__ = ("_ast", "_node_index")
+
+    def __init__(self, ast: "AST", node_index: int):
+        self._ast = ast
         self._node_index = node_index
 
     @property
@@ -23,19 +33,18 @@ class ASTNode:
         if self.is_fake:
             return iter(())
 
-        for child_index in self._graph.succ[self._node_index]:
-            yield ASTNode(self._graph, child_index)
+        for child_index in self._ast._get_children_indexes(self._node_index):
+            yield self._ast._get_node(child_index)
 
     @property
     def parent(self) -> Optional["ASTNode"]:
         if self.is_fake:
             return None
 
-        try:
-            parent_index = next(self._graph.predecessors(self._node_index))
-            return ASTNode(self._graph, parent_index)
-        except StopIteration:
+        parent_index = self._ast._get_parent_index(self._node_index)
+        if parent_index is None:
             return None
+        return self._ast._get_node(parent_index)
 
     @property
     def node_index(self) -> int:
@@ -45,31 +54,13 @@ class ASTNode:
     def is_fake(self) -> bool:
         return self._node_index < 0
 
-    @cached_property
+    @property
     def line(self) -> int:
         if self.is_fake:
             return -1
 
-        line = self._get_line(self._node_index)
-        if line is not None:
-            return line
-
-        children_lines: List[int] = [
-            self._get_line(child_index)  # type: ignore # all Nones filtered out in list comprehension
-            for child_index in dfs_preorder_nodes(self._graph, self._node_index)
-            if self._get_line(child_index) is not None
-        ]
-
-        # try to find source code line information from nodes reachable from self
-        if children_lines:
-            return min(children_lines)
-
-        # try to  find source code line information from parents up to the root
-        parent_index = self._get_parent(self._node_index)
-        while line is None and parent_index is not None:
-            line = self._get_line(parent_index)
-            parent_index = self._get_parent(parent_index)
-
+        # lines are precomputed in the storage while building AST
+        line = self._ast._get_line(self._node_index)
         if line is not None:
             return line
 
@@ -83,33 +74,20 @@ class ASTNode:
         if self.is_fake:
             return None
 
-        node_type = self._get_type(self._node_index)
-        javalang_fields = attributes_by_node_type[node_type]
-        computed_fields = computed_fields_registry.get_fields(node_type)
-        if (
-            attribute_name not in common_attributes
-            and attribute_name not in javalang_fields
-            and attribute_name not in computed_fields
-        ):
+        node_type = self._ast._storage.get_type(self._node_index)
+        accessors = _accessors_by_node_type.get(node_type)
+        if accessors is None:
+            accessors = _accessors_by_node_type[node_type] = _compile_accessors(node_type)
+
+        try:
+            accessor = accessors[attribute_name]
+        except KeyError:
             raise AttributeError(
                 "Failed to retrieve property. "
                 f"'{node_type}' node does not have '{attribute_name}' attribute."
             )
 
-        if attribute_name in computed_fields:
-            attribute = computed_fields[attribute_name](self)
-        else:
-            attribute = self._graph.nodes[self._node_index][attribute_name]
-
-        # common_attributes and javalang_fields may contain ASTNodeReference
-        # which needs to be replaces with actual ASTNode for convince API
-        # computed_fields are using javalang_fields and there is no ASTNodeReference
-        if attribute_name not in computed_fields:
-            if isinstance(attribute, ASTNodeReference):
-                attribute = self._create_node_from_reference(attribute)
-            elif isinstance(attribute, list):
-                attribute = self._replace_references_with_nodes(attribute)
-        return attribute
+        return accessor(self)
 
     def __dir__(self) -> List[str]:
         attribute_names = self._get_public_fixed_interface()
@@ -149,7 +127,7 @@ class ASTNode:
             raise NotImplementedError(
                 f"ASTNode support comparission only with themselves, but {type(other)} was provided."
             )
-        return self._graph == other._graph and self._node_index == other._node_index
+        return self is other or self._ast is other._ast and self._node_index == other._node_index
 
     def __hash__(self):
         return hash(self._node_index)
@@ -173,21 +151,56 @@ class ASTNode:
         return list_with_nodes
 
     def _create_node_from_reference(self, reference: ASTNodeReference) -> "ASTNode":
-        return ASTNode(self._graph, reference.node_index)
+        return self._ast._get_node(reference.node_index)
 
     def _get_type(self, node_index: int) -> ASTNodeType:
         if self.is_fake:
             return ASTNodeType.UNKNOWN
 
-        return self._graph.nodes[node_index]["node_type"]
-
-    def _get_line(self, node_index: int) -> Optional[int]:
-        return self._graph.nodes[node_index]["line"]
-
-    def _get_parent(self, node_index: int) -> Optional[int]:
-        # there is maximum one parent in a tree
-        return next(self._graph.predecessors(node_index), None)
+        return self._ast._storage.get_type(node_index)
 
     @classmethod
     def _get_public_fixed_interface(cls) -> List[str]:
         return [name for name, _ in getmembers(cls) if not name.startswith("_")]
+
+
+AttributeAccessor = Callable[[ASTNode], Any]
+
+
+def _compile_accessors(node_type: ASTNodeType) -> Dict[str, AttributeAccessor]:
+    """
+    Creates functions retrieving each attribute of nodes with given type.
+    javalang fields are read from a storage slot directly,
+    references to other nodes are resolved to ASTNode without any further lookups.
+    """
+    accessors: Dict[str, AttributeAccessor] = {
+        attribute_name: _javalang_field_accessor_factory(slot)
+        for attribute_name, slot in attribute_slots_by_node_type[node_type].items()
+    }
+    accessors.update(computed_fields_registry.get_fields(node_type))
+    accessors["node_type"] = lambda _: node_type
+    return accessors
+
+
+def _javalang_field_accessor_factory(slot: int) -> AttributeAccessor:
+    def get_javalang_field(node: ASTNode) -> Any:
+        ast = node._ast
+        value = ast._storage.get_attribute_values(node._node_index)[slot]
+        value_type = type(value)
+        if value_type is ASTNodeReference:
+            return ast._get_node(value.node_index)
+        elif value_type is ASTNodeReferences:
+            return [ast._get_node(node_index) for node_index in value]
+        elif value_type is list:
+            return node._replace_references_with_nodes(value)
+        elif value_type is LazySubtreeReference:
+            return get_javalang_field(ast._get_lazy_subtree(node._node_index).get_root())
+        return value
+
+    return get_javalang_field
+
+
+# accessors are compiled on first access to node of particular type
+# and recompiled after any change of computed fields
+_accessors_by_node_type: Dict[ASTNodeType, Dict[str, AttributeAccessor]] = {}
+computed_fields_registry.add_change_listener(_accessors_by_node_type.clear)
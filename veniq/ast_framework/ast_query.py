@@ -0,0 +1,228 @@
+"""
+Structural queries over AST in a CSS-like selector language.
+
+A selector is a chain of steps separated by combinators:
+ - 'A B' selects B nodes having an ancestor matching A,
+ - 'A > B' selects B nodes, which parent matches A.
+Each step is a node type name (as in ASTNodeType), several names separated by '|'
+or '*' for any type, followed by any number of attribute filters:
+ - [name=value] attribute equals value,
+ - [name!=value] attribute does not equal value,
+ - [name^=value] attribute is a string starting with value.
+Values are None, True, False, integers, identifiers or quoted strings.
+
+Example: CLASS_DECLARATION[name=Foo] > METHOD_DECLARATION STATEMENT_EXPRESSION > METHOD_INVOCATION[qualifier=None]
+
+Selectors are compiled into plans, which take candidates for the last step from the type index
+and check the rest of steps going up by parents, so no full scan of an AST is performed.
+"""
+
+import re
+from functools import lru_cache
+from itertools import chain
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union, \
+    TYPE_CHECKING
+
+from veniq.ast_framework.ast_node_type import ASTNodeType
+from veniq.ast_framework.ast_node import ASTNode
+
+if TYPE_CHECKING:
+    from veniq.ast_framework.ast import AST  # noqa: F401
+
+
+NodePredicate = Callable[[ASTNode], bool]
+
+
+class _Step(NamedTuple):
+    # None stands for any node type
+    node_types: Optional[FrozenSet[ASTNodeType]]
+    predicates: Tuple[NodePredicate, ...]
+    # True if node matching previous step must be a parent, otherwise it is any ancestor
+    is_child: bool
+
+
+class ASTQuery:
+    """
+    Compiled selector. Use 'compile_query' to get it, as compiled queries are cached.
+    """
+
+    def __init__(self, selector: str):
+        self.selector = selector
+        self._steps = _parse_selector(selector)
+
+    @property
+    def node_types(self) -> Optional[FrozenSet[ASTNodeType]]:
+        """
+        Types of selected nodes, None if nodes of any type can be selected.
+        """
+        return self._steps[-1].node_types
+
+    def select(self, ast: "AST") -> Iterator[ASTNode]:
+        if self.node_types is None:
+            candidates = ast._get_nodes_indexes()
+        else:
+            candidates = ast._get_nodes_indexes_with_types(*self.node_types)
+
+        for node_index in candidates:
+            if self.matches(ast, node_index):
+                yield ast._get_node(node_index)
+
+    def matches(self, ast: "AST", node_index: int) -> bool:
+        return self._matches_step(ast, node_index, len(self._steps) - 1)
+
+    def _matches_step(self, ast: "AST", node_index: int, step_index: int) -> bool:
+        step = self._steps[step_index]
+        if step.node_types is not None and ast._storage.get_type(node_index) not in step.node_types:
+            return False
+
+        if step.predicates:
+            node = ast._get_node(node_index)
+            if not all(predicate(node) for predicate in step.predicates):
+                return False
+
+        if step_index == 0:
+            return True
+
+        ancestor_index = ast._get_parent_index(node_index)
+        if step.is_child:
+            return ancestor_index is not None and self._matches_step(ast, ancestor_index, step_index - 1)
+
+        while ancestor_index is not None:
+            if self._matches_step(ast, ancestor_index, step_index - 1):
+                return True
+            ancestor_index = ast._get_parent_index(ancestor_index)
+        return False
+
+    def __repr__(self) -> str:
+        return f"ASTQuery({self.selector!r})"
+
+
+@lru_cache(maxsize=1024)
+def compile_query(selector: str) -> ASTQuery:
+    return ASTQuery(selector)
+
+
+def run_queries(ast: "AST", queries: Sequence[Union[str, ASTQuery]]) -> List[List[ASTNode]]:
+    """
+    Runs all queries in a single pass over candidate nodes.
+    Returns a list of selected nodes for each query in the same order as queries.
+    """
+    compiled_queries = [compile_query(query) if isinstance(query, str) else query for query in queries]
+
+    queries_by_type: Dict[ASTNodeType, List[int]] = {}
+    queries_for_any_type: List[int] = []
+    for query_index, query in enumerate(compiled_queries):
+        if query.node_types is None:
+            queries_for_any_type.append(query_index)
+        else:
+            for node_type in query.node_types:
+                queries_by_type.setdefault(node_type, []).append(query_index)
+
+    if queries_for_any_type:
+        candidates = ast._get_nodes_indexes()
+    else:
+        candidates = ast._get_nodes_indexes_with_types(*queries_by_type)
+
+    selected_nodes: List[List[ASTNode]] = [[] for _ in compiled_queries]
+    for node_index in candidates:
+        node_type = ast._storage.get_type(node_index)
+        for query_index in chain(queries_by_type.get(node_type, ()), queries_for_any_type):
+            if compiled_queries[query_index].matches(ast, node_index):
+                selected_nodes[query_index].append(ast._get_node(node_index))
+    return selected_nodes
+
+
+_token_pattern = re.compile(
+    r"""
+    \s*(?:
+        (?P<child>>)
+        | (?P<step>\*|[A-Z_]+(?:\|[A-Z_]+)*)
+        | \[\s*(?P<attribute>[A-Za-z_]\w*)\s*(?P<operator>=|!=|\^=)\s*
+          (?P<value>"[^"]*"|'[^']*'|[^\]\s]+)\s*\]
+    )
+    """,
+    re.VERBOSE,
+)
+
+
+def _parse_selector(selector: str) -> List[_Step]:
+    steps: List[_Step] = []
+    node_types: Optional[FrozenSet[ASTNodeType]] = None
+    predicates: List[NodePredicate] = []
+    is_child = False
+    is_step_opened = False
+
+    position = 0
+    selector = selector.strip()
+    while position < len(selector):
+        match = _token_pattern.match(selector, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Failed to parse selector '{selector}' at position {position}.")
+        position = match.end()
+
+        if match.group("attribute") is not None:
+            if not is_step_opened:
+                raise ValueError(f"Attribute filter without node type in selector '{selector}'.")
+            predicates.append(
+                _create_predicate(match.group("attribute"), match.group("operator"), match.group("value"))
+            )
+            continue
+
+        if is_step_opened:
+            steps.append(_Step(node_types, tuple(predicates), is_child))
+            is_step_opened = False
+            is_child = False
+
+        if match.group("child") is not None:
+            if not steps or is_child:
+                raise ValueError(f"Misplaced '>' in selector '{selector}'.")
+            is_child = True
+        else:
+            node_types = _parse_node_type(match.group("step"), selector)
+            predicates = []
+            is_step_opened = True
+
+    if not is_step_opened:
+        raise ValueError(f"Selector '{selector}' must end with a node type.")
+    steps.append(_Step(node_types, tuple(predicates), is_child))
+    return steps
+
+
+def _parse_node_type(names: str, selector: str) -> Optional[FrozenSet[ASTNodeType]]:
+    if names == "*":
+        return None
+    try:
+        return frozenset(ASTNodeType[name] for name in names.split("|"))
+    except KeyError as error:
+        raise ValueError(f"Unknown node type {error} in selector '{selector}'.")
+
+
+def _parse_value(value: str) -> Any:
+    if value[0] in "\"'":
+        return value[1:-1]
+    elif value in _constants:
+        return _constants[value]
+    elif re.fullmatch(r"-?\d+", value):
+        return int(value)
+    return value
+
+
+_constants = {"None": None, "True": True, "False": False}
+
+
+def _create_predicate(attribute_name: str, operator: str, raw_value: str) -> NodePredicate:
+    value = _parse_value(raw_value)
+    if operator == "=":
+        return lambda node: _is_attribute_equal(node, attribute_name, value)
+    elif operator == "!=":
+        return lambda node: not _is_attribute_equal(node, attribute_name, value)
+    prefix = str(value)
+    return lambda node: str(getattr(node, attribute_name, None) or "").startswith(prefix)
+
+
+def _is_attribute_equal(node: ASTNode, attribute_name: str, value: Any) -> bool:
+    attribute_value = getattr(node, attribute_name, None)
+    # nodes can be compared only with nodes
+    if value is None or isinstance(attribute_value, ASTNode):
+        return attribute_value is value
+    return attribute_value == value
@@ -0,0 +1,46 @@
+from typing import Callable, Collection, Dict, Iterable, List, Optional, Tuple
+
+from veniq.ast_framework.ast_node_type import ASTNodeType
+from veniq.ast_framework.ast_node import ASTNode
+
+
+class ASTVisitor:
+    """
+    Visitor of AST nodes used by AST.traverse_many.
+    Only nodes with types listed in 'node_types' are passed to a visitor,
+    if it is None, all nodes are passed.
+    Override 'on_node_entering' and/or 'on_node_leaving' to process nodes.
+    """
+
+    node_types: Optional[Collection[ASTNodeType]] = None
+
+    def on_node_entering(self, node: ASTNode) -> None:
+        pass
+
+    def on_node_leaving(self, node: ASTNode) -> None:
+        pass
+
+
+VisitorCallback = Callable[[ASTNode], None]
+
+# callbacks of all visitors interested in a node type, ordered as visitors
+DispatchTable = Dict[ASTNodeType, List[VisitorCallback]]
+
+
+def create_dispatch_tables(visitors: Iterable[ASTVisitor]) -> Tuple[DispatchTable, DispatchTable]:
+    """
+    Returns callbacks for entering and leaving nodes grouped by node type.
+    Methods not overridden by a visitor are not included, so they are never called.
+    """
+    on_entering: DispatchTable = {}
+    on_leaving: DispatchTable = {}
+    for visitor in visitors:
+        node_types = ASTNodeType if visitor.node_types is None else visitor.node_types
+        visitor_type = type(visitor)
+        if visitor_type.on_node_entering is not ASTVisitor.on_node_entering:
+            for node_type in node_types:
+                on_entering.setdefault(node_type, []).append(visitor.on_node_entering)
+        if visitor_type.on_node_leaving is not ASTVisitor.on_node_leaving:
+            for node_type in node_types:
+                on_leaving.setdefault(node_type, []).append(visitor.on_node_leaving)
+    return on_entering, on_leaving
@@ -0,0 +1,156 @@
+from array import array
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+
+from veniq.ast_framework import ASTNode
+from .block import Block
+from .constants import BlockReason, NodeId, NodeType
+from .statement import Statement
+
+TraverseCallback = Callable[[Union[Block, Statement]], None]
+
+
+class BlockStatementGraphStorage:
+    """
+    Struct-of-arrays storage of a block statement graph.
+    Every node is identified by its index, which starts from 0, and -1 stands for "no node"
+    in parent, first child and next sibling arrays.
+    Nodes are numbered in pre-order, so any subtree occupies a single range of indexes.
+
+    Each node keeps an AST node: a statement itself for statements
+    and an explicitly set origin statement or None for blocks.
+    AST nodes are stored rather than their indexes, as bodies built lazily belong to separate ASTs.
+
+    Block and Statement objects are thin views created once per node on the first access,
+    so traversals reuse them instead of allocating new ones.
+    """
+
+    def __init__(self) -> None:
+        self._node_types: List[NodeType] = []
+        self._parents = array("i")
+        self._first_children = array("i")
+        self._next_siblings = array("i")
+        self._subtrees_ends = array("i")
+        self._ast_nodes: List[Optional[ASTNode]] = []
+        self._block_reasons: List[Optional[BlockReason]] = []
+        self._views: List[Optional[Union[Block, Statement]]] = []
+
+        # used only during construction to append children in constant time
+        self._last_children = array("i")
+
+    def __len__(self) -> int:
+        return len(self._node_types)
+
+    def add_statement(self, statement: ASTNode, parent_block: NodeId = -1) -> NodeId:
+        return self._add_node(NodeType.Statement, statement, None, parent_block)
+
+    def add_block(
+        self, reason: BlockReason, parent_statement: NodeId, origin_statement: Optional[ASTNode] = None
+    ) -> NodeId:
+        return self._add_node(NodeType.Block, origin_statement, reason, parent_statement)
+
+    def complete_node(self, node_id: NodeId) -> None:
+        """
+        Must be called after all descendants of a node are added.
+        """
+        self._subtrees_ends[node_id] = len(self)
+
+    def get_node_type(self, node_id: NodeId) -> NodeType:
+        return self._node_types[node_id]
+
+    def get_parent(self, node_id: NodeId) -> Optional[NodeId]:
+        parent_id = self._parents[node_id]
+        return parent_id if parent_id != -1 else None
+
+    def get_children(self, node_id: NodeId) -> Iterator[NodeId]:
+        child_id = self._first_children[node_id]
+        while child_id != -1:
+            yield child_id
+            child_id = self._next_siblings[child_id]
+
+    def has_children(self, node_id: NodeId) -> bool:
+        return self._first_children[node_id] != -1
+
+    def get_ast_node(self, node_id: NodeId) -> Optional[ASTNode]:
+        return self._ast_nodes[node_id]
+
+    def get_block_reason(self, node_id: NodeId) -> BlockReason:
+        block_reason = self._block_reasons[node_id]
+        assert block_reason is not None, f"Node {node_id} is not a block."
+        return block_reason
+
+    def get_view(self, node_id: NodeId) -> Union[Block, Statement]:
+        view = self._views[node_id]
+        if view is None:
+            view = self._views[node_id] = self._create_view(node_id)
+        return view
+
+    def preorder_labeled_nodes(self, source: NodeId) -> Iterator[Tuple[NodeId, bool]]:
+        """
+        Yields (node_id, is_entering) pairs in the same order as networkx 'dfs_labeled_edges' does
+        for forward and reverse edges.
+        """
+        subtrees_ends = self._subtrees_ends
+        opened_nodes: List[NodeId] = []
+        for node_id in range(source, subtrees_ends[source]):
+            while opened_nodes and subtrees_ends[opened_nodes[-1]] <= node_id:
+                yield opened_nodes.pop(), False
+            yield node_id, True
+            opened_nodes.append(node_id)
+
+        while opened_nodes:
+            yield opened_nodes.pop(), False
+
+    def traverse(
+        self,
+        source: NodeId,
+        on_node_entering: TraverseCallback,
+        on_node_leaving: TraverseCallback = lambda _: None,
+    ) -> None:
+        # same as iterating over 'preorder_labeled_nodes', but without a generator in the hot loop
+        subtrees_ends = self._subtrees_ends
+        get_view = self.get_view
+        opened_nodes: List[NodeId] = []
+        for node_id in range(source, subtrees_ends[source]):
+            while opened_nodes and subtrees_ends[opened_nodes[-1]] <= node_id:
+                on_node_leaving(get_view(opened_nodes.pop()))
+            on_node_entering(get_view(node_id))
+            opened_nodes.append(node_id)
+
+        while opened_nodes:
+            on_node_leaving(get_view(opened_nodes.pop()))
+
+    def _add_node(
+        self,
+        node_type: NodeType,
+        ast_node: Optional[ASTNode],
+        block_reason: Optional[BlockReason],
+        parent_id: NodeId,
+    ) -> NodeId:
+        node_id = len(self)
+        self._node_types.append(node_type)
+        self._parents.append(parent_id)
+        self._first_children.append(-1)
+        self._next_siblings.append(-1)
+        self._last_children.append(-1)
+        self._subtrees_ends.append(node_id + 1)
+        self._ast_nodes.append(ast_node)
+        self._block_reasons.append(block_reason)
+        self._views.append(None)
+
+        if parent_id != -1:
+            last_child_id = self._last_children[parent_id]
+            if last_child_id == -1:
+                self._first_children[parent_id] = node_id
+            else:
+                self._next_siblings[last_child_id] = node_id
+            self._last_children[parent_id] = node_id
+
+        return node_id
+
+    def _create_view(self, node_id: NodeId) -> Union[Block, Statement]:
+        node_type = self._node_types[node_id]
+        if node_type == NodeType.Statement:
+            return Statement(self, node_id)
+        elif node_type == NodeType.Block:
+            return Block(self, node_id)
+        raise ValueError(f"Unexpected node type {node_type}.")
@@ -1,51 +1,42 @@
-from networkx import DiGraph
-from typing import Any, Callable, Iterator, Optional, TYPE_CHECKING
+from typing import Any, Iterator, Optional, TYPE_CHECKING
 
 from veniq.ast_framework import ASTNode
-from .constants import BLOCK_REASON, ORIGIN_STATEMENT, NODE, BlockReason, NodeId
+from .constants import BlockReason, NodeId
 
 if TYPE_CHECKING:
     from .statement import Statement  # noqa: F401
-    from ._nodes_factory import TraverseCallback  # noqa: F401
+    from ._graph_storage import BlockStatementGraphStorage, TraverseCallback  # noqa: F401
 
 
 class Block:
-    def __init__(
-        self,
-        graph: DiGraph,
-        id: NodeId,
-        statement_factory: Callable[[DiGraph, NodeId], "Statement"],
-        traverse_function: Callable[[DiGraph, NodeId, "TraverseCallback", "TraverseCallback"], None],
-    ):
-        self._graph = graph
+    __slots__ = ("_storage", "_id")
+
+    def __init__(self, storage: "BlockStatementGraphStorage", id: NodeId):
+        self._storage = storage
         self._id = id
-        self._statement_factory = statement_factory
-        self._traverse_function = traverse_function
 
     @property
     def reason(self) -> BlockReason:
-        return self._graph.nodes[self._id][BLOCK_REASON]
+        return self._storage.get_block_reason(self._id)
 
     @property
     def statements(self) -> Iterator["Statement"]:
-        for statement_id in self._graph.successors(self._id):
-            yield self._statement_factory(self._graph, statement_id)
+        for statement_id in self._storage.get_children(self._id):
+            yield self._storage.get_view(statement_id)  # type: ignore
 
     @property
     def origin_statement(self) -> Optional[ASTNode]:
-        if ORIGIN_STATEMENT in self._graph.nodes[self._id]:
-            return self._graph.nodes[self._id][ORIGIN_STATEMENT]
+        origin_statement = self._storage.get_ast_node(self._id)
+        if origin_statement is not None:
+            return origin_statement
 
-        try:
-            statement_id = next(self._graph.predecessors(self._id))
-            return self._graph.nodes[statement_id][NODE]
-        except StopIteration:
-            return None
+        statement_id = self._storage.get_parent(self._id)
+        return self._storage.get_ast_node(statement_id) if statement_id is not None else None
 
     def traverse(
         self, on_node_entering: "TraverseCallback", on_node_leaving: "TraverseCallback" = lambda _: None
     ):
-        self._traverse_function(self._graph, self._id, on_node_entering, on_node_leaving)
+        self._storage.traverse(self._id, on_node_entering, on_node_leaving)
 
     def __eq__(self, other: Any) -> bool:
         if other is None:
@@ -54,4 +45,4 @@ class Block:
         if not isinstance(other, Block):
             raise NotImplementedError(f"Only Block objects are supported, got {other}")
 
-        return self._graph == other._graph and self._id == other._id
+        return self._storage is other._storage and self._id == other._id
@@ -2,11 +2,6 @@ from enum import Enum
 
 NodeId = int
 
-# networkx field names
-NODE = "node"
-BLOCK_REASON = "block_reason"
-ORIGIN_STATEMENT = "origin_statement"
-
 
 class NodeType(Enum):
     Statement = "Statement"
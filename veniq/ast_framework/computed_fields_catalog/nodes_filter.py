@@ -9,10 +9,13 @@ def nodes_filter_factory(
     """
     Create filter, which takes 'body_field_name' field of incoming node,
     checks if it list of ASTNode, and return it filtered by node_type.
+    Field name may be a dotted path through nested nodes, e.g. 'body.declarations'.
     """
 
     def filter(base_node: ASTNode) -> Iterator[ASTNode]:
-        base_field = getattr(base_node, base_field_name)
+        base_field = base_node
+        for field_name in base_field_name.split("."):
+            base_field = getattr(base_field, field_name)
         if isinstance(base_field, list):
             for node in base_field:
                 if isinstance(node, ASTNode) and node.node_type in node_types:
@@ -35,14 +35,21 @@ def _register_standard_nodes_filters() -> None:
         ASTNodeType.ANNOTATION_DECLARATION,
     )
 
+    # members of enums are kept in a separate enum body node
     computed_fields_registry.register(
-        nodes_filter_factory("declarations", ASTNodeType.METHOD_DECLARATION),
+        nodes_filter_factory("body.declarations", ASTNodeType.CONSTRUCTOR_DECLARATION),
+        "constructors",
+        ASTNodeType.ENUM_DECLARATION,
+    )
+
+    computed_fields_registry.register(
+        nodes_filter_factory("body.declarations", ASTNodeType.METHOD_DECLARATION),
         "methods",
         ASTNodeType.ENUM_DECLARATION,
     )
 
     computed_fields_registry.register(
-        nodes_filter_factory("declarations", ASTNodeType.FIELD_DECLARATION),
+        nodes_filter_factory("body.declarations", ASTNodeType.FIELD_DECLARATION),
         "fields",
         ASTNodeType.ENUM_DECLARATION,
     )
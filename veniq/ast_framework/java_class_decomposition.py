@@ -2,7 +2,7 @@ from typing import List, Dict, Set, Iterator, Any
 
 from networkx import DiGraph, strongly_connected_components, weakly_connected_components  # type: ignore
 
-from veniq.ast_framework import AST, ASTNodeType
+from veniq.ast_framework import AST, ASTNode, ASTNodeType, ASTVisitor
 
 from veniq.patterns.classic_setter.classic_setter import ClassicSetter as setter   # type: ignore
 from veniq.patterns.classic_getter.classic_getter import ClassicGetter as getter  # type: ignore
@@ -123,15 +123,18 @@ def _create_usage_graph(class_ast: AST) -> DiGraph:
 
     for method_declaration in class_declaration.methods:
         method_ast = class_ast.get_subtree(method_declaration)
+        local_method_invocations = _LocalMethodInvocationsCollector()
+        fields_usage = _FieldsUsageCollector()
+        method_ast.traverse_many([local_method_invocations, fields_usage])
 
-        for invoked_method_name in _find_local_method_invocations(method_ast):
+        for invoked_method_name in local_method_invocations.invoked_methods:
             if invoked_method_name in methods_ids:
                 usage_graph.add_edge(
                     methods_ids[method_declaration.name],
                     methods_ids[invoked_method_name],
                 )
 
-        for used_field_name in _find_fields_usage(method_ast):
+        for used_field_name in fields_usage.used_fields:
             if used_field_name in fields_ids:
                 usage_graph.add_edge(
                     methods_ids[method_declaration.name], fields_ids[used_field_name]
@@ -140,33 +143,47 @@ def _create_usage_graph(class_ast: AST) -> DiGraph:
     return usage_graph
 
 
-def _find_local_method_invocations(method_ast: AST) -> Set[str]:
-    invoked_methods: Set[str] = set()
-    for method_invocation in method_ast.get_proxy_nodes(ASTNodeType.METHOD_INVOCATION):
-        if method_invocation.qualifier is None:
-            invoked_methods.add(method_invocation.member)
-
-    return invoked_methods
+class _LocalMethodInvocationsCollector(ASTVisitor):
+    node_types = {ASTNodeType.METHOD_INVOCATION}
 
+    def __init__(self) -> None:
+        self.invoked_methods: Set[str] = set()
 
-def _find_fields_usage(method_ast: AST) -> Set[str]:
-    local_variables: Set[str] = set()
-    for variable_declaration in method_ast.get_proxy_nodes(
-            ASTNodeType.LOCAL_VARIABLE_DECLARATION
-    ):
-        local_variables.update(variable_declaration.names)
+    def on_node_entering(self, method_invocation: ASTNode) -> None:
+        if method_invocation.qualifier is None:
+            self.invoked_methods.add(method_invocation.member)
 
-    method_declaration = method_ast.get_root()
-    for parameter in method_declaration.parameters:
-        local_variables.add(parameter.name)
 
-    used_fields: Set[str] = set()
-    for member_reference in method_ast.get_proxy_nodes(ASTNodeType.MEMBER_REFERENCE):
-        if member_reference.qualifier is None and \
-                member_reference.member not in local_variables:
-            used_fields.add(member_reference.member)
+class _FieldsUsageCollector(ASTVisitor):
+    """
+    Collects names of members referenced in a method, which are neither local variables nor parameters.
+    """
 
-    return used_fields
+    node_types = {
+        ASTNodeType.METHOD_DECLARATION,
+        ASTNodeType.LOCAL_VARIABLE_DECLARATION,
+        ASTNodeType.MEMBER_REFERENCE,
+    }
+
+    def __init__(self) -> None:
+        self._method_declaration_found = False
+        self._local_variables: Set[str] = set()
+        self._referenced_members: Set[str] = set()
+
+    @property
+    def used_fields(self) -> Set[str]:
+        return self._referenced_members - self._local_variables
+
+    def on_node_entering(self, node: ASTNode) -> None:
+        if node.node_type == ASTNodeType.METHOD_DECLARATION:
+            # only parameters of the analyzed method are considered
+            if not self._method_declaration_found:
+                self._method_declaration_found = True
+                self._local_variables.update(parameter.name for parameter in node.parameters)
+        elif node.node_type == ASTNodeType.LOCAL_VARIABLE_DECLARATION:
+            self._local_variables.update(node.names)
+        elif node.qualifier is None:
+            self._referenced_members.add(node.member)
 
 
 def _filter_class_methods_and_fields(
@@ -175,16 +192,16 @@ def _filter_class_methods_and_fields(
         allowed_methods_names: Set[str]
 ) -> AST:
     class_declaration = class_ast.get_root()
-    allowed_nodes = {class_declaration.node_index}
+    allowed_nodes: List[ASTNode] = []
 
     for field_declaration in class_declaration.fields:
         if len(allowed_fields_names & set(field_declaration.names)) != 0:
             field_ast = class_ast.get_subtree(field_declaration)
-            allowed_nodes.update(node.node_index for node in field_ast)
+            allowed_nodes.extend(field_ast)
 
     for method_declaration in class_declaration.methods:
         if method_declaration.name in allowed_methods_names:
             method_ast = class_ast.get_subtree(method_declaration)
-            allowed_nodes.update(node.node_index for node in method_ast)
+            allowed_nodes.extend(method_ast)
 
-    return AST(class_ast.tree.subgraph(allowed_nodes), class_declaration.node_index)
+    return class_ast.get_subgraph(class_declaration, allowed_nodes)
@@ -1,6 +1,6 @@
 from cached_property import cached_property  # type: ignore
 from typing import Dict, Set, TYPE_CHECKING
-from networkx import DiGraph, dfs_tree  # type: ignore
+from networkx import DiGraph  # type: ignore
 from deprecated import deprecated  # type: ignore
 
 from veniq.utils.cfg_builder import build_cfg
@@ -13,16 +13,15 @@ if TYPE_CHECKING:
 
 @deprecated("This functionality must be transmitted to ASTNode")
 class JavaClassMethod(AST):
-    def __init__(self, tree: DiGraph, root: int, java_class: 'JavaClass'):
-        self.tree = tree
-        self.root = root
+    def __init__(self, ast: AST, java_class: 'JavaClass'):
+        super().__init__(ast._storage, ast.root, ast._intervals)
         self._java_class = java_class
 
     @cached_property
     def name(self) -> str:
         try:
             method_name = next(self.children_with_type(self.root, ASTNodeType.STRING))
-            return self.tree.nodes[method_name]['string']
+            return self.get_attr(method_name, 'string')
         except StopIteration:
             raise ValueError("Provided AST does not has 'STRING' node type right under the root")
 
@@ -36,7 +35,7 @@ class JavaClassMethod(AST):
         for parameter_node in self.children_with_type(self.root, ASTNodeType.FORMAL_PARAMETER):
             parameter_name_node = next(iter(self.children_with_type(parameter_node, ASTNodeType.STRING)))
             parameter_name = self.get_attr(parameter_name_node, 'string')
-            parameters[parameter_name] = AST(dfs_tree(self.tree, parameter_node), parameter_node)
+            parameters[parameter_name] = self.get_subtree(self._get_node(parameter_node))
 
         return parameters
 
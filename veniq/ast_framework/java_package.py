@@ -1,25 +1,25 @@
 from cached_property import cached_property  # type: ignore
 from deprecated import deprecated  # type: ignore
 
-from typing import Dict
+from typing import Dict, Optional
 
-from veniq.utils.ast_builder import build_ast
 from veniq.ast_framework import AST, ASTNodeType
+from veniq.ast_framework.ast_cache import ASTCache, build_ast_from_file
 from veniq.ast_framework.java_class import JavaClass
 
 
 @deprecated("This functionality must be transmitted to ASTNode")
 class JavaPackage(AST):
-    def __init__(self, filename: str):
-        ast = AST.build_from_javalang(build_ast(filename))
-        super().__init__(ast.tree, ast.root)
+    def __init__(self, filename: str, ast_cache: Optional[ASTCache] = None):
+        ast = build_ast_from_file(filename, ast_cache)
+        super().__init__(ast._storage, ast.root)
 
     @cached_property
     def name(self) -> str:
         try:
             package_declaration = next(self.children_with_type(self.root, ASTNodeType.PACKAGE_DECLARATION))
             package_name = next(self.children_with_type(package_declaration, ASTNodeType.STRING))
-            return self.tree.nodes[package_name]['string']
+            return self.get_attr(package_name, 'string')
         except StopIteration:
             pass
 
@@ -29,6 +29,6 @@ class JavaPackage(AST):
     def java_classes(self) -> Dict[str, JavaClass]:
         classes: Dict[str, JavaClass] = {}
         for class_ast in self.get_subtrees(ASTNodeType.CLASS_DECLARATION):
-            java_class = JavaClass(class_ast.tree, class_ast.root, self)
+            java_class = JavaClass(class_ast, self)
             classes[java_class.name] = java_class
         return classes
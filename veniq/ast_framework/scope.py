@@ -1,11 +1,11 @@
-from typing import List, Iterator, Optional
+from typing import List, Iterator, Optional, Tuple, Union
 
 from networkx import DiGraph  # type: ignore
 
 from .ast import AST
 from .ast_node import ASTNode
 from .ast_node_type import ASTNodeType
-from .scope_extractors import extract_scopes
+from .scope_extractors import extract_scopes, LambdaExpressionsIndex, ScopeAttributes
 
 
 class Scope:
@@ -54,22 +54,38 @@ class Scope:
 
     @staticmethod
     def _create_scopes_from_node(node: ASTNode, method_ast: AST, scope_tree: DiGraph) -> List[int]:
-        scopes = extract_scopes(node, method_ast)
-
+        """
+        Builds scopes in a single depth first pass with an explicit stack.
+        Entering a scope adds it to the tree and pushes its statements,
+        entering a statement pushes scopes it opens, a scope is closed, when all its statements are passed.
+        Scopes ids are assigned in pre-order.
+        """
+        lambdas_index = LambdaExpressionsIndex(method_ast)
         new_scopes_ids: List[int] = []
-        for scope in scopes:
-            new_scope_id = len(scope_tree)
-            new_scopes_ids.append(new_scope_id)
-            scope_tree.add_node(
-                new_scope_id,
-                statements=scope.statements,
-                parent_node=scope.parent_node,
-                parameters=scope.parameters,
-            )
-
-            for statement in scope.statements:
-                nested_scopes_ids = Scope._create_scopes_from_node(statement, method_ast, scope_tree)
-                for nested_scope_id in nested_scopes_ids:
-                    scope_tree.add_edge(new_scope_id, nested_scope_id)
+
+        # each item is a sequence of scopes of a statement or statements of a scope with an id of enclosing scope
+        stack: List[Tuple[Iterator[Union[ScopeAttributes, ASTNode]], Optional[int]]] = [
+            (iter(extract_scopes(node, lambdas_index)), None)
+        ]
+        while stack:
+            items, enclosing_scope_id = stack[-1]
+            item = next(items, None)
+            if item is None:
+                stack.pop()
+            elif isinstance(item, ScopeAttributes):
+                new_scope_id = len(scope_tree)
+                scope_tree.add_node(
+                    new_scope_id,
+                    statements=item.statements,
+                    parent_node=item.parent_node,
+                    parameters=item.parameters,
+                )
+                if enclosing_scope_id is None:
+                    new_scopes_ids.append(new_scope_id)
+                else:
+                    scope_tree.add_edge(enclosing_scope_id, new_scope_id)
+                stack.append((iter(item.statements), new_scope_id))
+            else:
+                stack.append((iter(extract_scopes(item, lambdas_index)), enclosing_scope_id))
 
         return new_scopes_ids
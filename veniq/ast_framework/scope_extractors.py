@@ -1,4 +1,5 @@
-from typing import Dict, List, Callable, NamedTuple
+from bisect import bisect_left
+from typing import Dict, List, Callable, NamedTuple, Optional
 from itertools import chain
 
 from .ast import AST
@@ -12,18 +13,48 @@ class ScopeAttributes(NamedTuple):
     parameters: List[ASTNode] = []
 
 
-def extract_scopes(node: ASTNode, ast: AST) -> List[ScopeAttributes]:
+class LambdaExpressionsIndex:
+    """
+    Lambda expressions of a method found once by the type index.
+    Nodes are numbered in pre-order, so lambdas inside of an expression
+    are found by a binary search over the range of its subtree.
+    """
+
+    def __init__(self, method_ast: AST):
+        self._ast = method_ast
+        self._lambdas_indexes = list(method_ast._get_nodes_indexes_with_type(ASTNodeType.LAMBDA_EXPRESSION))
+
+    def find_top_level_lambdas(self, expression: Optional[ASTNode]) -> List[ASTNode]:
+        """
+        Lambdas inside of an expression, which are not nested into other lambdas from the same expression.
+        """
+        if expression is None:
+            return []
+
+        storage = self._ast._storage
+        expression_end = storage.get_subtree_end(expression.node_index)
+        lambdas: List[ASTNode] = []
+        position = bisect_left(self._lambdas_indexes, expression.node_index)
+        while position < len(self._lambdas_indexes) and self._lambdas_indexes[position] < expression_end:
+            lambda_index = self._lambdas_indexes[position]
+            lambdas.append(self._ast._get_node(lambda_index))
+            # lambdas nested into found one are skipped
+            position = bisect_left(self._lambdas_indexes, storage.get_subtree_end(lambda_index), position + 1)
+        return lambdas
+
+
+def extract_scopes(node: ASTNode, lambdas_index: LambdaExpressionsIndex) -> List[ScopeAttributes]:
     try:
-        return _scope_extractors_by_node_type[node.node_type](node, ast)
+        scope_extractor = _scope_extractors_by_node_type[node.node_type]
     except KeyError:
         return []
+    return scope_extractor(node, lambdas_index)
 
 
-def _extract_scopes_from_assert(assert_node: ASTNode, method_ast: AST) -> List[ScopeAttributes]:
+def _extract_scopes_from_assert(assert_node: ASTNode, lambdas_index: LambdaExpressionsIndex) -> List[ScopeAttributes]:
     assert assert_node.node_type == ASTNodeType.ASSERT_STATEMENT
 
-    expression_ast = method_ast.get_subtree(assert_node.condition)
-    return _find_scopes_in_expressions(expression_ast)
+    return _find_scopes_in_expressions(assert_node.condition, lambdas_index)
 
 
 def _extract_scopes_from_block(block_node: ASTNode, _) -> List[ScopeAttributes]:
@@ -33,7 +64,7 @@ def _extract_scopes_from_block(block_node: ASTNode, _) -> List[ScopeAttributes]:
 
 
 def _extract_scopes_from_expression_statement(
-    expression_statement: ASTNode, method_ast: AST
+    expression_statement: ASTNode, lambdas_index: LambdaExpressionsIndex
 ) -> List[ScopeAttributes]:
     assert expression_statement.node_type in {
         ASTNodeType.STATEMENT_EXPRESSION,
@@ -41,15 +72,13 @@ def _extract_scopes_from_expression_statement(
         ASTNodeType.THROW_STATEMENT,
     }
 
-    expression_ast = method_ast.get_subtree(expression_statement.expression)
-    return _find_scopes_in_expressions(expression_ast)
+    return _find_scopes_in_expressions(expression_statement.expression, lambdas_index)
 
 
-def _extract_scopes_from_for_cycle(for_cycle: ASTNode, method_ast: AST) -> List[ScopeAttributes]:
+def _extract_scopes_from_for_cycle(for_cycle: ASTNode, lambdas_index: LambdaExpressionsIndex) -> List[ScopeAttributes]:
     assert for_cycle.node_type == ASTNodeType.FOR_STATEMENT
 
-    control_ast = method_ast.get_subtree(for_cycle.control)
-    scopes = _find_scopes_in_expressions(control_ast)
+    scopes = _find_scopes_in_expressions(for_cycle.control, lambdas_index)
     scopes.append(
         ScopeAttributes(statements=_get_block_statements_list(for_cycle.body), parent_node=for_cycle)
     )
@@ -57,19 +86,17 @@ def _extract_scopes_from_for_cycle(for_cycle: ASTNode, method_ast: AST) -> List[
     return scopes
 
 
-def _extract_scopes_from_if_statement(if_node: ASTNode, method_ast: AST) -> List[ScopeAttributes]:
+def _extract_scopes_from_if_statement(if_node: ASTNode, lambdas_index: LambdaExpressionsIndex) -> List[ScopeAttributes]:
     assert if_node.node_type == ASTNodeType.IF_STATEMENT
 
-    condition_ast = method_ast.get_subtree(if_node.condition)
-    scopes = _find_scopes_in_expressions(condition_ast)
+    scopes = _find_scopes_in_expressions(if_node.condition, lambdas_index)
     scopes.append(
         ScopeAttributes(statements=_get_block_statements_list(if_node.then_statement), parent_node=if_node)
     )
 
     while if_node.else_statement is not None and if_node.else_statement.node_type == ASTNodeType.IF_STATEMENT:
         if_node = if_node.else_statement
-        condition_ast = method_ast.get_subtree(if_node.condition)
-        scopes.extend(_find_scopes_in_expressions(condition_ast))
+        scopes.extend(_find_scopes_in_expressions(if_node.condition, lambdas_index))
         scopes.append(
             ScopeAttributes(
                 statements=_get_block_statements_list(if_node.then_statement), parent_node=if_node
@@ -87,13 +114,13 @@ def _extract_scopes_from_if_statement(if_node: ASTNode, method_ast: AST) -> List
 
 
 def _extract_scopes_from_variable_declaration(
-    variable_declaration: ASTNode, method_ast: AST
+    variable_declaration: ASTNode, lambdas_index: LambdaExpressionsIndex
 ) -> List[ScopeAttributes]:
     assert variable_declaration.node_type == ASTNodeType.LOCAL_VARIABLE_DECLARATION
 
     return list(
         chain.from_iterable(
-            _find_scopes_in_expressions(method_ast.get_subtree(declarator.initializer))
+            _find_scopes_in_expressions(declarator.initializer, lambdas_index)
             for declarator in variable_declaration.declarators
         )
     )
@@ -106,12 +133,11 @@ def _extract_scopes_from_method(method_declaration: ASTNode, _) -> List[ScopeAtt
 
 
 def _extract_scopes_from_switch_statement(
-    switch_statement: ASTNode, method_ast: AST
+    switch_statement: ASTNode, lambdas_index: LambdaExpressionsIndex
 ) -> List[ScopeAttributes]:
     assert switch_statement.node_type == ASTNodeType.SWITCH_STATEMENT
 
-    expression_ast = method_ast.get_subtree(switch_statement.expression)
-    scopes = _find_scopes_in_expressions(expression_ast)
+    scopes = _find_scopes_in_expressions(switch_statement.expression, lambdas_index)
 
     # all case statements belong to one scope
     # thats why cases are not surrounded with curly braces
@@ -127,28 +153,30 @@ def _extract_scopes_from_switch_statement(
     return scopes
 
 
-def _extract_scopes_from_synchronized(synchronized_block: ASTNode, method_ast: AST) -> List[ScopeAttributes]:
+def _extract_scopes_from_synchronized(
+    synchronized_block: ASTNode, lambdas_index: LambdaExpressionsIndex
+) -> List[ScopeAttributes]:
     assert synchronized_block.node_type == ASTNodeType.SYNCHRONIZED_STATEMENT
 
-    lock_ast = method_ast.get_subtree(synchronized_block.lock)
-    scopes = _find_scopes_in_expressions(lock_ast)
+    scopes = _find_scopes_in_expressions(synchronized_block.lock, lambdas_index)
     scopes.append(ScopeAttributes(statements=synchronized_block.block, parent_node=synchronized_block))
 
     return scopes
 
 
-def _extract_scopes_from_try_statement(try_node: ASTNode, method_ast: AST) -> List[ScopeAttributes]:
+def _extract_scopes_from_try_statement(
+    try_node: ASTNode, lambdas_index: LambdaExpressionsIndex
+) -> List[ScopeAttributes]:
     assert try_node.node_type == ASTNodeType.TRY_STATEMENT
 
     scopes: List[ScopeAttributes] = []
 
-    for resource in try_node.resources:
-        initializer_ast = method_ast.get_subtree(resource.value)
-        scopes.extend(_find_scopes_in_expressions(initializer_ast))
+    for resource in try_node.resources or []:
+        scopes.extend(_find_scopes_in_expressions(resource.value, lambdas_index))
 
     scopes.append(ScopeAttributes(statements=try_node.block, parent_node=try_node))
 
-    for catch in try_node.catches:
+    for catch in try_node.catches or []:
         scopes.append(ScopeAttributes(statements=catch.block, parent_node=try_node))
 
     if try_node.finally_block is not None:
@@ -157,11 +185,12 @@ def _extract_scopes_from_try_statement(try_node: ASTNode, method_ast: AST) -> Li
     return scopes
 
 
-def _extract_scopes_from_while_cycle(while_cycle: ASTNode, method_ast: AST) -> List[ScopeAttributes]:
+def _extract_scopes_from_while_cycle(
+    while_cycle: ASTNode, lambdas_index: LambdaExpressionsIndex
+) -> List[ScopeAttributes]:
     assert while_cycle.node_type in {ASTNodeType.DO_STATEMENT, ASTNodeType.WHILE_STATEMENT}
 
-    condition_ast = method_ast.get_subtree(while_cycle.condition)
-    scopes = _find_scopes_in_expressions(condition_ast)
+    scopes = _find_scopes_in_expressions(while_cycle.condition, lambdas_index)
     scopes.append(
         ScopeAttributes(statements=_get_block_statements_list(while_cycle.body), parent_node=while_cycle)
     )
@@ -169,7 +198,9 @@ def _extract_scopes_from_while_cycle(while_cycle: ASTNode, method_ast: AST) -> L
     return scopes
 
 
-def _find_scopes_in_expressions(expression_ast: AST) -> List[ScopeAttributes]:
+def _find_scopes_in_expressions(
+    expression: Optional[ASTNode], lambdas_index: LambdaExpressionsIndex
+) -> List[ScopeAttributes]:
     """
     Finds top level lambda expressions and returns their bodies.
     Each found nested scope represented by a list of its statements. List of such list is returned.
@@ -177,8 +208,7 @@ def _find_scopes_in_expressions(expression_ast: AST) -> List[ScopeAttributes]:
     """
 
     nested_scopes_statements: List[ScopeAttributes] = []
-    for nested_scope in expression_ast.get_subtrees(ASTNodeType.LAMBDA_EXPRESSION):
-        lambda_declaration = nested_scope.get_root()
+    for lambda_declaration in lambdas_index.find_top_level_lambdas(expression):
         nested_scopes_statements.append(
             ScopeAttributes(
                 statements=lambda_declaration.body,
@@ -199,7 +229,9 @@ def _get_block_statements_list(node: ASTNode) -> List[ASTNode]:
     return [node]
 
 
-_scope_extractors_by_node_type: Dict[ASTNodeType, Callable[[ASTNode, AST], List[ScopeAttributes]]] = {
+_scope_extractors_by_node_type: Dict[
+    ASTNodeType, Callable[[ASTNode, LambdaExpressionsIndex], List[ScopeAttributes]]
+] = {
     ASTNodeType.ASSERT_STATEMENT: _extract_scopes_from_assert,
     ASTNodeType.BLOCK_STATEMENT: _extract_scopes_from_block,
     ASTNodeType.DO_STATEMENT: _extract_scopes_from_while_cycle,
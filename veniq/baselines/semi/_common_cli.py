@@ -1,8 +1,9 @@
+import sys
 from argparse import ArgumentParser
 from typing import Callable, NamedTuple
 
 from veniq.ast_framework import AST, ASTNodeType
-from veniq.utils.ast_builder import build_ast
+from veniq.ast_framework.ast_cache import ASTCache, build_ast_from_file, build_ast_from_source
 
 # Main function parameters:
 #  - AST of a single method
@@ -21,7 +22,10 @@ class MethodInfo(NamedTuple):
 def common_cli(main: MainFunction, description: str) -> None:
     parser = ArgumentParser(description=description)
     parser.add_argument(
-        "-f", "--file", required=True, help="File path to JAVA source code for extracting semantic"
+        "-f",
+        "--file",
+        required=True,
+        help="File path to JAVA source code for extracting semantic, '-' reads the source from standard input",
     )
     parser.add_argument(
         "-c",
@@ -37,9 +41,20 @@ def common_cli(main: MainFunction, description: str) -> None:
         dest="method_name",
         help="Method name to parse, if omitted all method are considered",
     )
+    parser.add_argument(
+        "--ast-cache",
+        default=None,
+        dest="ast_cache_dir",
+        help="Directory for caching built ASTs between runs, if omitted ASTs are not cached",
+    )
     args = parser.parse_args()
 
-    ast = AST.build_from_javalang(build_ast(args.file))
+    ast_cache = ASTCache(args.ast_cache_dir) if args.ast_cache_dir is not None else None
+    # only bodies of selected methods are built
+    if args.file == "-":
+        ast = build_ast_from_source(sys.stdin.buffer.read(), ast_cache, lazy_methods_bodies=True)
+    else:
+        ast = build_ast_from_file(args.file, ast_cache, lazy_methods_bodies=True)
 
     classes_declarations = (
         node for node in ast.get_root().types if node.node_type == ASTNodeType.CLASS_DECLARATION
@@ -48,20 +63,28 @@ def common_cli(main: MainFunction, description: str) -> None:
     if args.class_name is not None:
         classes_declarations = (node for node in classes_declarations if node.name == args.class_name)
 
+    methods_declarations = (
+        (class_declaration, method_declaration)
+        for class_declaration in classes_declarations
+        for method_declaration in class_declaration.methods
+    )
+
+    # filter declarations before taking subtrees, as taking a subtree builds a method body
+    if args.method_name is not None:
+        methods_declarations = (
+            (class_declaration, method_declaration)
+            for class_declaration, method_declaration in methods_declarations
+            if method_declaration.name == args.method_name
+        )
+
     methods_infos = (
         MethodInfo(
             ast=ast.get_subtree(method_declaration),
             method_name=method_declaration.name,
             class_name=class_declaration.name,
         )
-        for class_declaration in classes_declarations
-        for method_declaration in class_declaration.methods
+        for class_declaration, method_declaration in methods_declarations
     )
 
-    if args.method_name is not None:
-        methods_infos = (
-            method_info for method_info in methods_infos if method_info.method_name == args.method_name
-        )
-
     for method_info in methods_infos:
         main(method_info.ast, args.file, method_info.class_name, method_info.method_name)
@@ -1,18 +1,73 @@
 from dataclasses import dataclass, field
 from itertools import accumulate
-from typing import Tuple, Set
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Set, Union, overload
 
 from veniq.ast_framework import ASTNode
 
 Statement = ASTNode
 
 
+class SemanticVocabulary:
+    """
+    Interns names used by statements of a method, so each name gets its own bit
+    and a statement semantic is represented by a single integer bitmask.
+    Objects are interned together with all their prefixes, i.e. "a.b.c" sets bits of "a", "a.b" and "a.b.c".
+    Objects and methods have separate bits, as objects are compared only with objects
+    and methods only with methods.
+    """
+
+    def __init__(self) -> None:
+        self._bits: Dict[Tuple[bool, str], int] = {}
+        self._objects_masks: Dict[str, int] = {}
+
+    def get_mask(self, semantic: "StatementSemantic") -> int:
+        mask = 0
+        for object_name in semantic.used_objects:
+            object_mask = self._objects_masks.get(object_name)
+            if object_mask is None:
+                object_mask = self._objects_masks[object_name] = self._get_object_mask(object_name)
+            mask |= object_mask
+        for method_name in semantic.used_methods:
+            mask |= self._get_bit(False, method_name)
+        return mask
+
+    def get_names(self, mask: int) -> Tuple[Set[str], Set[str]]:
+        """
+        Returns objects, including all their prefixes, and methods, which bits are set in a mask.
+        """
+        objects: Set[str] = set()
+        methods: Set[str] = set()
+        for (is_object, name), bit in self._bits.items():
+            if mask & bit:
+                (objects if is_object else methods).add(name)
+        return objects, methods
+
+    def _get_object_mask(self, object_name: str) -> int:
+        mask = 0
+        for name_parts in accumulate([name_part] for name_part in object_name.split(".")):
+            mask |= self._get_bit(True, ".".join(name_parts))
+        return mask
+
+    def _get_bit(self, is_object: bool, name: str) -> int:
+        bit = self._bits.get((is_object, name))
+        if bit is None:
+            bit = self._bits[(is_object, name)] = 1 << len(self._bits)
+        return bit
+
+
 @dataclass
 class StatementSemantic:
     used_objects: Set[str] = field(default_factory=set)
     used_methods: Set[str] = field(default_factory=set)
 
+    # bitmask of used names interned in a vocabulary, see intern_statements_semantic
+    _vocabulary: Optional[SemanticVocabulary] = field(default=None, init=False, repr=False, compare=False)
+    _mask: int = field(default=0, init=False, repr=False, compare=False)
+
     def is_similar(self, other: "StatementSemantic") -> bool:
+        if self._vocabulary is not None and self._vocabulary is other._vocabulary:
+            return self._mask & other._mask != 0
+
         return (
             len(self.used_objects_unwrapped & other.used_objects_unwrapped) != 0
             or len(self.used_methods & other.used_methods) != 0
@@ -37,6 +92,113 @@ class StatementSemantic:
         return {object_name.split(".")[0] for object_name in self.used_objects}
 
 
-ExtractionOpportunity = Tuple[Statement, ...]
+def intern_statements_semantic(statements_semantic: Iterable[StatementSemantic]) -> List[int]:
+    """
+    Makes all semantics share a single vocabulary, unless they already do, and returns their bitmasks.
+    Two semantics are similar if and only if their bitmasks intersect.
+    Semantics must not be changed after interning.
+    """
+    semantics = list(statements_semantic)
+    vocabulary = semantics[0]._vocabulary if semantics else None
+    if vocabulary is None or any(semantic._vocabulary is not vocabulary for semantic in semantics):
+        vocabulary = SemanticVocabulary()
+        for semantic in semantics:
+            semantic._vocabulary = vocabulary
+            semantic._mask = vocabulary.get_mask(semantic)
+
+    return [semantic._mask for semantic in semantics]
+
+
+class MethodStatements:
+    """
+    All statements of a method in the order of its statements semantic.
+    It is shared by all extraction opportunities of the method, which refer to statements by indexes.
+    """
+
+    __slots__ = ("statements", "statements_indexes", "real_statements_indexes", "real_statements_prefix_qty")
+
+    def __init__(self, statements: Iterable[Statement]):
+        self.statements = list(statements)
+        self.statements_indexes = {statement: index for index, statement in enumerate(self.statements)}
+        self.real_statements_indexes = [
+            index for index, statement in enumerate(self.statements) if not statement.is_fake
+        ]
+        # real_statements_prefix_qty[i] is a number of real statements before i-th statement
+        self.real_statements_prefix_qty = [0]
+        self.real_statements_prefix_qty.extend(
+            accumulate(int(not statement.is_fake) for statement in self.statements)
+        )
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+
+class ExtractionOpportunity(Sequence[Statement]):
+    """
+    Real (not fake) statements of a method with indexes in range [begin, end).
+    Only the range is stored, statements are taken from the method statements on access,
+    so a size of an extraction opportunity does not depend on a number of statements in it.
+    """
+
+    __slots__ = ("method_statements", "begin", "end")
+
+    def __init__(self, method_statements: MethodStatements, begin: int, end: int):
+        self.method_statements = method_statements
+        self.begin = begin
+        self.end = end
+
+    def __len__(self) -> int:
+        real_statements_prefix_qty = self.method_statements.real_statements_prefix_qty
+        return real_statements_prefix_qty[self.end] - real_statements_prefix_qty[self.begin]
+
+    @overload
+    def __getitem__(self, index: int) -> Statement:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Tuple[Statement, ...]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Statement, Tuple[Statement, ...]]:
+        if isinstance(index, slice):
+            return tuple(self)[index]
+
+        length = len(self)
+        if not -length <= index < length:
+            raise IndexError("Extraction opportunity index out of range.")
+        if index < 0:
+            index += length
+
+        first_real_statement = self.method_statements.real_statements_prefix_qty[self.begin]
+        statement_index = self.method_statements.real_statements_indexes[first_real_statement + index]
+        return self.method_statements.statements[statement_index]
+
+    def __iter__(self) -> Iterator[Statement]:
+        statements = self.method_statements.statements
+        for index in range(self.begin, self.end):
+            if not statements[index].is_fake:
+                yield statements[index]
+
+    def __contains__(self, statement: object) -> bool:
+        if not isinstance(statement, ASTNode):
+            return False
+        index = self.method_statements.statements_indexes.get(statement)
+        return index is not None and self.begin <= index < self.end and not statement.is_fake
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ExtractionOpportunity):
+            return NotImplemented
+        return (
+            self.method_statements is other.method_statements
+            and self.begin == other.begin
+            and self.end == other.end
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.begin, self.end))
+
+    def __repr__(self) -> str:
+        return f"ExtractionOpportunity(begin={self.begin}, end={self.end})"
+
 
 OpportunityBenefit = int
@@ -1,20 +1,162 @@
-from typing import Dict
-from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
-from ._common_types import Statement, StatementSemantic
+import numpy as np
+
+from ._common_types import (
+    ExtractionOpportunity,
+    MethodStatements,
+    Statement,
+    StatementSemantic,
+    intern_statements_semantic,
+)
+
+
+# prefix sums of similar pairs take (n + 1)^2 integers for n statements,
+# for longer methods LCOM2 of ranges is computed over masks of the similarity matrix instead
+_MAX_STATEMENTS_FOR_PAIRS_PREFIX_SUMS = 2048
 
 
 def LCOM2(statements_semantic: Dict[Statement, StatementSemantic]) -> int:
-    similar_pairs_qty = 0
-    not_similar_pairs_qty = 0
-    for semantic1, semantic2 in combinations(statements_semantic.values(), 2):
-        if semantic1.is_similar(semantic2):
-            similar_pairs_qty += 1
-        else:
-            not_similar_pairs_qty += 1
+    return StatementsSimilarity(statements_semantic).lcom2()
+
+
+class StatementsSimilarity:
+    """
+    Similarity matrix of all statements of a method computed once,
+    so LCOM2 of any subset of statements is calculated by vectorized sums over it.
+
+    Extraction opportunities are contiguous ranges of statements without fake ones,
+    for them prefix sums of similar pairs are precomputed as well,
+    so LCOM2 of such a range and of the rest statements is found in a constant time.
+    The prefix sums take O(n^2) memory, so they are not built for methods
+    with more than _MAX_STATEMENTS_FOR_PAIRS_PREFIX_SUMS statements.
+    """
+
+    def __init__(
+        self,
+        statements_semantic: Dict[Statement, StatementSemantic],
+        method_statements: Optional[MethodStatements] = None,
+    ):
+        if method_statements is None:
+            method_statements = MethodStatements(statements_semantic.keys())
+        self._method_statements = method_statements
+        self._statements_indexes = self._method_statements.statements_indexes
+        incidence_matrix = _create_incidence_matrix(intern_statements_semantic(statements_semantic.values()))
+        self._similarity_matrix = incidence_matrix @ incidence_matrix.T > 0
+        # a statement is similar to itself only if it uses any name
+        self._is_self_similar = self._similarity_matrix.diagonal().copy()
+        self._similar_pairs_qty = self._count_similar_pairs(self._similarity_matrix, self._is_self_similar)
+
+        is_real = np.array([not statement.is_fake for statement in statements_semantic], dtype=bool)
+        self._real_statements_prefix_qty = self._method_statements.real_statements_prefix_qty
+
+        # similar statements excluding itself for each real statement
+        similar_statements_qty = self._similarity_matrix.sum(axis=1) - self._is_self_similar
+        self._similar_statements_prefix_qty = _prefix_sums(similar_statements_qty * is_real)
+
+        self._similar_pairs_prefix_qty: Optional[np.ndarray] = None
+        if len(is_real) <= _MAX_STATEMENTS_FOR_PAIRS_PREFIX_SUMS:
+            # prefix_qty[i, j] is a number of similar pairs of real statements (a, b), where a < b, a < i and b < j
+            real_similar_pairs = np.triu(self._similarity_matrix & is_real[:, None] & is_real[None, :], 1)
+            self._similar_pairs_prefix_qty = np.zeros((len(is_real) + 1,) * 2, dtype=np.int32)
+            self._similar_pairs_prefix_qty[1:, 1:] = real_similar_pairs.cumsum(axis=0, dtype=np.int32).cumsum(axis=1)
+
+    def get_statements_mask(self, statements: Iterable[Statement]) -> np.ndarray:
+        mask = np.zeros(len(self._statements_indexes), dtype=bool)
+        mask[[self._statements_indexes[statement] for statement in statements]] = True
+        return mask
+
+    def lcom2(self, statements_mask: Optional[np.ndarray] = None) -> int:
+        """
+        LCOM2 of statements selected by a boolean mask, or of all statements, if mask is not given.
+        """
+        if statements_mask is None:
+            return _lcom2(len(self._statements_indexes), self._similar_pairs_qty)
+
+        similar_pairs_qty = self._count_similar_pairs(
+            self._similarity_matrix[np.ix_(statements_mask, statements_mask)], self._is_self_similar[statements_mask]
+        )
+        return _lcom2(int(np.count_nonzero(statements_mask)), similar_pairs_qty)
+
+    def split_lcom2(self, statements: Sequence[Statement]) -> Tuple[int, int]:
+        """
+        LCOM2 of given statements and LCOM2 of all the rest statements.
+        Extraction opportunities must be created from the same statements semantic.
+        """
+        prefix_qty = self._similar_pairs_prefix_qty
+        statements_range: Optional[Tuple[int, int]] = None
+        if prefix_qty is not None:
+            if isinstance(statements, ExtractionOpportunity):
+                statements_range = statements.begin, statements.end
+            else:
+                statements_range = self._get_statements_range(statements)
+        if prefix_qty is None or statements_range is None:
+            statements_mask = self.get_statements_mask(statements)
+            return self.lcom2(statements_mask), self.lcom2(~statements_mask)
+
+        begin, end = statements_range
+        range_similar_pairs_qty = int(
+            prefix_qty[end, end] - prefix_qty[begin, end] - prefix_qty[end, begin] + prefix_qty[begin, begin]
+        )
+        range_statements_qty = self._real_statements_prefix_qty[end] - self._real_statements_prefix_qty[begin]
+
+        # pairs between range and rest statements are subtracted from all pairs along with pairs inside range
+        range_similar_statements_qty = int(
+            self._similar_statements_prefix_qty[end] - self._similar_statements_prefix_qty[begin]
+        )
+        rest_similar_pairs_qty = self._similar_pairs_qty - range_similar_statements_qty + range_similar_pairs_qty
+        rest_statements_qty = len(self._statements_indexes) - range_statements_qty
+
+        return (
+            _lcom2(range_statements_qty, range_similar_pairs_qty),
+            _lcom2(rest_statements_qty, rest_similar_pairs_qty),
+        )
+
+    def _get_statements_range(self, statements: Sequence[Statement]) -> Optional[Tuple[int, int]]:
+        """
+        Returns [begin, end) range of indexes if statements are exactly all real statements in it, otherwise None.
+        """
+        if not statements:
+            return None
+
+        indexes = [self._statements_indexes[statement] for statement in statements]
+        begin, end = indexes[0], indexes[-1] + 1
+        real_indexes = self._method_statements.real_statements_indexes[
+            self._real_statements_prefix_qty[begin]:self._real_statements_prefix_qty[end]
+        ]
+        return (begin, end) if indexes == real_indexes else None
+
+    @staticmethod
+    def _count_similar_pairs(similarity_matrix: np.ndarray, is_self_similar: np.ndarray) -> int:
+        return (int(np.count_nonzero(similarity_matrix)) - int(np.count_nonzero(is_self_similar))) // 2
+
+
+def _lcom2(statements_qty: int, similar_pairs_qty: int) -> int:
+    pairs_qty = statements_qty * (statements_qty - 1) // 2
+    not_similar_pairs_qty = pairs_qty - similar_pairs_qty
 
     lcom2 = not_similar_pairs_qty - similar_pairs_qty
     if lcom2 < 0:
         lcom2 = 0
 
     return lcom2
+
+
+def _prefix_sums(values: np.ndarray) -> np.ndarray:
+    prefix_sums = np.zeros(len(values) + 1, dtype=np.int32)
+    np.cumsum(values, out=prefix_sums[1:])
+    return prefix_sums
+
+
+def _create_incidence_matrix(semantic_masks: List[int]) -> np.ndarray:
+    """
+    Unpacks bitmasks into a statements x identifiers matrix with 1 where a statement uses an identifier.
+    """
+    bytes_qty = max((max(semantic_masks, default=0).bit_length() + 7) // 8, 1)
+    packed_masks = b"".join(mask.to_bytes(bytes_qty, "little") for mask in semantic_masks)
+    incidence_matrix = np.unpackbits(
+        np.frombuffer(packed_masks, dtype=np.uint8).reshape(len(semantic_masks), bytes_qty),
+        axis=1,
+        bitorder="little",
+    )
+    return incidence_matrix.astype(np.int32)
@@ -1,12 +1,14 @@
-from typing import Dict, Union, Set, List
+from operator import or_
+from typing import Callable, Dict, Union, Set, List, Sequence
 
-from ._common_types import StatementSemantic, ExtractionOpportunity, Statement as ExtractionStatement
+from ._common_types import StatementSemantic, Statement as ExtractionStatement
+from ._statements_layout import StatementsLayout
 from veniq.ast_framework.block_statement_graph import Block, Statement
 from veniq.ast_framework import ASTNode, ASTNodeType
 
 
 def semantic_filter(
-    statements: ExtractionOpportunity,
+    statements: Sequence[ExtractionStatement],
     statements_semantic: Dict[ASTNode, StatementSemantic],
     method_block_statement_graph: Statement,
 ) -> bool:
@@ -19,10 +21,134 @@ def semantic_filter(
     return symantic_filter_callbacks.is_statements_extractable
 
 
+class SemanticFilter:
+    """
+    Checks statements against the same conditions as 'semantic_filter'.
+    Statements consecutive in the layout of the method, which all extraction opportunities
+    passed syntactic filter are, are checked in a constant time using data precomputed in a single pass:
+     - variables declared by each statement, joined over any range with a sparse table,
+     - variables used after each position, found by a backward pass,
+     - the closest cycle around each break and continue statement.
+    Variables are interned as bits, so sets of them are integers.
+    Other statements are checked by traversal of the method.
+    """
+
+    def __init__(self, statements_semantic: Dict[ASTNode, StatementSemantic], statements_layout: StatementsLayout):
+        self._statements_semantic = statements_semantic
+        self._layout = statements_layout
+
+        variables_bits: Dict[str, int] = {}
+        self._declared_variables = _SparseTable(
+            self._collect_declared_variables(statements_layout.statements, variables_bits), or_
+        )
+        self._used_variables_after = self._collect_used_variables_after(
+            statements_layout.statements, statements_semantic, variables_bits
+        )
+        self._breaking_statements_cycles = _SparseTable(self._find_breaking_statements_cycles(statements_layout), min)
+
+    @staticmethod
+    def _collect_declared_variables(statements: List[ExtractionStatement], variables_bits: Dict[str, int]) -> List[int]:
+        """
+        Returns a mask of variables declared by each statement, variables get their bits on the first declaration.
+        """
+        declared_variables: List[int] = []
+        for statement in statements:
+            declared_variables_mask = 0
+            if statement.node_type == ASTNodeType.LOCAL_VARIABLE_DECLARATION:
+                for variable_name in statement.names:
+                    variable_bit = variables_bits.setdefault(variable_name, 1 << len(variables_bits))
+                    declared_variables_mask |= variable_bit
+            declared_variables.append(declared_variables_mask)
+        return declared_variables
+
+    @staticmethod
+    def _collect_used_variables_after(
+        statements: List[ExtractionStatement],
+        statements_semantic: Dict[ASTNode, StatementSemantic],
+        variables_bits: Dict[str, int],
+    ) -> List[int]:
+        """
+        Returns a mask of variables used by statements starting from each position.
+        Only variables declared in a method can be needed to return, others are skipped.
+        """
+        used_variables_after = [0] * (len(statements) + 1)
+        for position in reversed(range(len(statements))):
+            used_variables_mask = 0
+            statement_semantic = statements_semantic.get(statements[position])
+            if statement_semantic is not None:
+                for object_name in statement_semantic.used_based_objects:
+                    used_variables_mask |= variables_bits.get(object_name, 0)
+            used_variables_after[position] = used_variables_after[position + 1] | used_variables_mask
+        return used_variables_after
+
+    @staticmethod
+    def _find_breaking_statements_cycles(statements_layout: StatementsLayout) -> List[int]:
+        """
+        For control flow breaking statements returns a position of the closest cycle around them or -1,
+        any other statement never breaks control flow, so it gets a position after all statements.
+        """
+        statements = statements_layout.statements
+        closest_cycles: List[int] = []
+        breaking_statements_cycles: List[int] = []
+        for statement, parent_position in zip(statements, statements_layout.parent_statements):
+            if parent_position == -1:
+                closest_cycles.append(-1)
+            elif statements[parent_position].node_type in _SymanticFilterCallbacks._cycles_statements:
+                closest_cycles.append(parent_position)
+            else:
+                closest_cycles.append(closest_cycles[parent_position])
+
+            if statement.node_type in _SymanticFilterCallbacks._control_flow_breaking_statements:
+                breaking_statements_cycles.append(closest_cycles[-1])
+            else:
+                breaking_statements_cycles.append(len(statements))
+        return breaking_statements_cycles
+
+    def is_extractable(self, statements: Sequence[ExtractionStatement]) -> bool:
+        positions_range = self._layout.get_positions_range(statements)
+        if positions_range is None:
+            return semantic_filter(statements, self._statements_semantic, self._layout.block_statement_graph)
+
+        first_position, last_position = positions_range
+        # break and continue statements must be inside of cycles among statements
+        if self._breaking_statements_cycles.query(first_position, last_position) < first_position:
+            return False
+
+        variables_needed_to_return = (
+            self._declared_variables.query(first_position, last_position)
+            & self._used_variables_after[last_position + 1]
+        )
+        # at most a single variable can be returned
+        return variables_needed_to_return & (variables_needed_to_return - 1) == 0
+
+
+class _SparseTable:
+    """
+    Combines values in any range in a constant time by an idempotent operation, e.g. 'min' or bitwise 'or'.
+    """
+
+    def __init__(self, values: List[int], operation: Callable[[int, int], int]):
+        self._operation = operation
+        self._levels = [values]
+        range_length = 1
+        while 2 * range_length <= len(values):
+            previous_level = self._levels[-1]
+            self._levels.append([
+                operation(previous_level[index], previous_level[index + range_length])
+                for index in range(len(values) - 2 * range_length + 1)
+            ])
+            range_length *= 2
+
+    def query(self, first_index: int, last_index: int) -> int:
+        level_index = (last_index - first_index + 1).bit_length() - 1
+        level = self._levels[level_index]
+        return self._operation(level[first_index], level[last_index - (1 << level_index) + 1])
+
+
 class _SymanticFilterCallbacks:
     def __init__(
         self,
-        statements: ExtractionOpportunity,
+        statements: Sequence[ExtractionStatement],
         statements_semantic: Dict[ASTNode, StatementSemantic],
         method_block_statement_graph: Statement,
     ):
@@ -0,0 +1,107 @@
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from veniq.ast_framework.block_statement_graph import Block, Statement
+from ._common_types import ExtractionOpportunity, MethodStatements, Statement as ExtractionStatement
+
+
+class StatementsLayout:
+    """
+    Statements of a block statement graph of a method laid out in order of its traversal.
+    For each statement its position in that order, depth in blocks, parent statement
+    and a position of the last statement in its parent block are stored.
+    Method declaration is the first statement, it is not in any block and it is treated
+    as a statement of its body.
+
+    Filters use it to check extraction opportunities as ranges of positions
+    instead of traversing the graph for each of them.
+    """
+
+    def __init__(self, method_block_statement_graph: Statement):
+        self.block_statement_graph = method_block_statement_graph
+        self.statements: List[ExtractionStatement] = []
+        self.statements_positions: Dict[ExtractionStatement, int] = {}
+        self.depths: List[int] = []
+        self.parent_statements: List[int] = []
+
+        parent_blocks: List[int] = []
+        blocks_ends: List[int] = []
+        blocks_stack: List[int] = []
+        statements_stack: List[int] = []
+
+        def on_node_entering(node: Union[Block, Statement]) -> None:
+            if isinstance(node, Block):
+                blocks_stack.append(len(blocks_ends))
+                blocks_ends.append(-1)
+            else:
+                self.statements_positions[node.node] = len(self.statements)
+                self.depths.append(len(blocks_stack) or 1)
+                self.parent_statements.append(statements_stack[-1] if statements_stack else -1)
+                parent_blocks.append(blocks_stack[-1] if blocks_stack else 0)
+                statements_stack.append(len(self.statements))
+                self.statements.append(node.node)
+
+        def on_node_leaving(node: Union[Block, Statement]) -> None:
+            if isinstance(node, Block):
+                blocks_ends[blocks_stack.pop()] = len(self.statements) - 1
+            else:
+                statements_stack.pop()
+
+        method_block_statement_graph.traverse(on_node_entering, on_node_leaving)
+        self.parent_blocks_ends = [blocks_ends[block] for block in parent_blocks]
+
+        # opportunities of the last seen method statements are mapped to positions in a constant time
+        self._method_statements: Optional[MethodStatements] = None
+        self._real_statements_positions: List[int] = []
+        self._chained_statements_prefix_qty: List[int] = []
+
+    def get_positions_range(self, statements: Sequence[ExtractionStatement]) -> Optional[Tuple[int, int]]:
+        """
+        Returns positions of the first and the last statements, if statements are consecutive in the layout.
+        Otherwise returns None.
+        """
+        if len(statements) == 0:
+            return None
+        elif isinstance(statements, ExtractionOpportunity):
+            return self._get_opportunity_positions_range(statements)
+
+        first_position = self.statements_positions.get(statements[0])
+        if first_position is None:
+            return None
+
+        for offset, statement in enumerate(statements):
+            if self.statements_positions.get(statement) != first_position + offset:
+                return None
+        return first_position, first_position + len(statements) - 1
+
+    def _get_opportunity_positions_range(
+        self, extraction_opportunity: ExtractionOpportunity
+    ) -> Optional[Tuple[int, int]]:
+        method_statements = extraction_opportunity.method_statements
+        if method_statements is not self._method_statements:
+            self._map_method_statements(method_statements)
+
+        first_real_statement = method_statements.real_statements_prefix_qty[extraction_opportunity.begin]
+        last_real_statement = first_real_statement + len(extraction_opportunity) - 1
+        first_position = self._real_statements_positions[first_real_statement]
+        chained_statements_qty = (
+            self._chained_statements_prefix_qty[last_real_statement]
+            - self._chained_statements_prefix_qty[first_real_statement]
+        )
+        if first_position == -1 or chained_statements_qty != last_real_statement - first_real_statement:
+            return None
+        return first_position, first_position + last_real_statement - first_real_statement
+
+    def _map_method_statements(self, method_statements: MethodStatements) -> None:
+        """
+        Finds positions of real statements and for each pair of consecutive statements
+        checks, whether they are consecutive in the layout too.
+        """
+        self._method_statements = method_statements
+        self._real_statements_positions = [
+            self.statements_positions.get(method_statements.statements[index], -1)
+            for index in method_statements.real_statements_indexes
+        ]
+        self._chained_statements_prefix_qty = [0]
+        for position, next_position in zip(self._real_statements_positions, self._real_statements_positions[1:]):
+            is_chained = position != -1 and next_position == position + 1
+            self._chained_statements_prefix_qty.append(self._chained_statements_prefix_qty[-1] + is_chained)
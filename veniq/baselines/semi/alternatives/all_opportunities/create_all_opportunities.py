@@ -1,25 +1,24 @@
-from typing import Dict, List
+from typing import Dict, Iterator
 
 from veniq.ast_framework import AST
 from ...extract_semantic import extract_method_statements_semantic
 from ..._common_cli import common_cli
-from ..._common_types import Statement, StatementSemantic, ExtractionOpportunity
+from ..._common_types import Statement, StatementSemantic, ExtractionOpportunity, MethodStatements
 
 
 def create_extraction_opportunities(
     statements_semantic: Dict[Statement, StatementSemantic]
-) -> List[ExtractionOpportunity]:
-    statements = [statement for statement in statements_semantic.keys() if not statement.is_fake]
-    extraction_opportunities: List[ExtractionOpportunity] = []
-    for first in range(len(statements)):
-        for last in range(first, len(statements)):
-            extraction_opportunities.append(tuple(statements[first: last + 1]))
-    return extraction_opportunities
+) -> Iterator[ExtractionOpportunity]:
+    method_statements = MethodStatements(statements_semantic.keys())
+    real_statements_indexes = method_statements.real_statements_indexes
+    for first, first_statement_index in enumerate(real_statements_indexes):
+        for last_statement_index in real_statements_indexes[first:]:
+            yield ExtractionOpportunity(method_statements, first_statement_index, last_statement_index + 1)
 
 
 def _print_extraction_opportunities(method_ast: AST, filepath: str, class_name: str, method_name: str):
     statements_semantic = extract_method_statements_semantic(method_ast)
-    extraction_opportunities = create_extraction_opportunities(statements_semantic)
+    extraction_opportunities = list(create_extraction_opportunities(statements_semantic))
     print(
         f"{len(extraction_opportunities)} opportunities found in method {method_name} "
         f"in class {class_name} in file {filepath}:"
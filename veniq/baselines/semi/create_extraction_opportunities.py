@@ -1,27 +1,61 @@
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
 from veniq.ast_framework import AST
 from .extract_semantic import extract_method_statements_semantic
 from ._common_cli import common_cli
-from ._common_types import Statement, StatementSemantic, ExtractionOpportunity
+from ._common_types import (
+    Statement,
+    StatementSemantic,
+    ExtractionOpportunity,
+    MethodStatements,
+    intern_statements_semantic,
+)
 
 
 def create_extraction_opportunities(
+    statements_semantic: Dict[Statement, StatementSemantic],
+    method_statements: Optional[MethodStatements] = None,
+) -> Iterator[ExtractionOpportunity]:
+    """
+    Lazily generates unique extraction opportunities in the order they are found,
+    so they can be filtered before all of them are created.
+    Method statements must be created from the same statements semantic, if they are given.
+    """
+    if method_statements is None:
+        method_statements = MethodStatements(statements_semantic.keys())
+    for first_statement_index, last_statement_index in create_extraction_opportunities_ranges(statements_semantic):
+        yield ExtractionOpportunity(method_statements, first_statement_index, last_statement_index + 1)
+
+
+def create_extraction_opportunities_ranges(
     statements_semantic: Dict[Statement, StatementSemantic]
-) -> List[ExtractionOpportunity]:
-    extraction_opportunities: List[ExtractionOpportunity] = []
-    for step in range(1, len(statements_semantic) + 1):
-        for extraction_opportunity in _ExtractionOpportunityIterator(statements_semantic, step):
-            if extraction_opportunity and extraction_opportunity not in extraction_opportunities:
-                extraction_opportunities.append(extraction_opportunity)
-
-    return extraction_opportunities
+) -> Iterator[Tuple[int, int]]:
+    """
+    Generates unique extraction opportunities as pairs of indexes of their first and last statements.
+    Fake statements are excluded from extraction opportunities, so ranges are trimmed to start and end with
+    real statements, as ranges different only in fake statements on their borders are the same opportunity.
+    """
+    statements = list(statements_semantic.keys())
+    semantic_masks = intern_statements_semantic(statements_semantic.values())
+    is_fake = [statement.is_fake for statement in statements]
+
+    found_ranges: Set[Tuple[int, int]] = set()
+    for step in range(1, len(statements) + 1):
+        for first_statement_index, last_statement_index in _ExtractionOpportunityIterator(semantic_masks, step):
+            while first_statement_index <= last_statement_index and is_fake[first_statement_index]:
+                first_statement_index += 1
+            while first_statement_index <= last_statement_index and is_fake[last_statement_index]:
+                last_statement_index -= 1
+
+            statements_range = (first_statement_index, last_statement_index)
+            if first_statement_index <= last_statement_index and statements_range not in found_ranges:
+                found_ranges.add(statements_range)
+                yield statements_range
 
 
 class _ExtractionOpportunityIterator:
-    def __init__(self, statements_semantic: Dict[Statement, StatementSemantic], step: int):
-        self._statements_semantic = statements_semantic
-        self._statements = list(statements_semantic.keys())
+    def __init__(self, semantic_masks: List[int], step: int):
+        self._semantic_masks = semantic_masks
         self._step = step
 
         self._statement_index = 0
@@ -29,8 +63,8 @@ class _ExtractionOpportunityIterator:
     def __iter__(self):
         return self
 
-    def __next__(self) -> ExtractionOpportunity:
-        if self._statement_index >= len(self._statements_semantic):
+    def __next__(self) -> Tuple[int, int]:
+        if self._statement_index >= len(self._semantic_masks):
             raise StopIteration
 
         fails_qty = 0
@@ -39,11 +73,11 @@ class _ExtractionOpportunityIterator:
 
         self._statement_index += 1
 
-        while self._statement_index < len(self._statements) and last_statement_index is None:
-            previous_statement_semantic = self._get_statement_semantic(self._statement_index - fails_qty - 1)
-            current_statement_semantic = self._get_statement_semantic(self._statement_index)
+        while self._statement_index < len(self._semantic_masks) and last_statement_index is None:
+            previous_statement_mask = self._semantic_masks[self._statement_index - fails_qty - 1]
+            current_statement_mask = self._semantic_masks[self._statement_index]
 
-            if current_statement_semantic.is_similar(previous_statement_semantic):
+            if current_statement_mask & previous_statement_mask:
                 fails_qty = 0
                 self._statement_index += 1
             else:
@@ -54,25 +88,17 @@ class _ExtractionOpportunityIterator:
                 else:
                     self._statement_index += 1
 
-        # self._statement_index has passed over self._statements
+        # self._statement_index has passed over self._semantic_masks
         # put last_statement_index to the last statement before sequence of failures
         if last_statement_index is None:
-            last_statement_index = len(self._statements) - fails_qty - 1
-
-        return tuple(
-            self._statements[i]
-            for i in range(first_statement_index, last_statement_index + 1)
-            if not self._statements[i].is_fake
-        )
+            last_statement_index = len(self._semantic_masks) - fails_qty - 1
 
-    def _get_statement_semantic(self, statement_index: int) -> StatementSemantic:
-        current_statement = self._statements[statement_index]
-        return self._statements_semantic[current_statement]
+        return first_statement_index, last_statement_index
 
 
 def _print_extraction_opportunities(method_ast: AST, filepath: str, class_name: str, method_name: str):
     statements_semantic = extract_method_statements_semantic(method_ast)
-    extraction_opportunities = create_extraction_opportunities(statements_semantic)
+    extraction_opportunities = list(create_extraction_opportunities(statements_semantic))
     print(
         f"{len(extraction_opportunities)} opportunities found in method {method_name} "
         f"in class {class_name} in file {filepath}:"
@@ -1,17 +1,26 @@
+from bisect import bisect_left
 from collections import OrderedDict
-from typing import Callable, Dict, Union
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 from veniq.ast_framework import AST, ASTNode, ASTNodeType
 from veniq.ast_framework.block_statement_graph import build_block_statement_graph, Block, Statement
 from veniq.ast_framework.block_statement_graph.constants import BlockReason
 from ._common_cli import common_cli
-from ._common_types import Statement as ExtractionStatement, StatementSemantic
+from ._common_types import Statement as ExtractionStatement, StatementSemantic, intern_statements_semantic
 
 
-def extract_method_statements_semantic(method_ast: AST) -> Dict[ExtractionStatement, StatementSemantic]:
-    block_statement_graph = build_block_statement_graph(method_ast)
+def extract_method_statements_semantic(
+    method_ast: AST, block_statement_graph: Optional[Statement] = None
+) -> Dict[ExtractionStatement, StatementSemantic]:
+    """
+    Block statement graph of the method is built, unless an already built one is given.
+    """
+    if block_statement_graph is None:
+        block_statement_graph = build_block_statement_graph(method_ast)
     semantic_extractor = _SemanticExtractor(method_ast)
     block_statement_graph.traverse(semantic_extractor.on_node_entering, semantic_extractor.on_node_leaving)
+    # names are interned once per method, so all further similarity checks are bitwise
+    intern_statements_semantic(semantic_extractor.statements_semantic.values())
     return semantic_extractor.statements_semantic
 
 
@@ -20,6 +29,13 @@ class _SemanticExtractor:
         self.statements_semantic: Dict[ExtractionStatement, StatementSemantic] = OrderedDict()
         self._ast = method_ast
 
+        # Names used by each member reference, method invocation and variable declarator of the method
+        # are gathered in a single pass. Nodes are numbered in pre-order, so usages of any subtree
+        # are a continuous slice of them, which is found by a binary search.
+        self._names_usages_nodes: List[int] = []
+        self._names_usages: List[Tuple[Optional[str], Optional[str]]] = []
+        self._collect_names_usages()
+
         self._semantic_extractors: Dict[ASTNodeType, Callable[[ExtractionStatement], StatementSemantic]] = {
             ASTNodeType.FOR_STATEMENT: self._extract_semantic_from_field_factory("control"),
             ASTNodeType.DO_STATEMENT: self._extract_semantic_from_field_factory("condition"),
@@ -65,6 +81,7 @@ class _SemanticExtractor:
         # "If" statements is handled separately in _on_block_entering due to "else if" construction
         if extraction_statement.node_type in {
             ASTNodeType.METHOD_DECLARATION,
+            ASTNodeType.CONSTRUCTOR_DECLARATION,
             ASTNodeType.BLOCK_STATEMENT,
             ASTNodeType.IF_STATEMENT,
         }:
@@ -122,22 +139,42 @@ class _SemanticExtractor:
         ):
             self.statements_semantic[self._ast.create_fake_node()] = StatementSemantic()
 
-    def _extract_semantic_from_ast(self, ast_root: ASTNode) -> StatementSemantic:
-        statement_semantic = StatementSemantic()
-        for node in self._ast.get_subtree(ast_root).get_proxy_nodes(
+    def _collect_names_usages(self) -> None:
+        """
+        Stores an object name and a method name used by each node, either of them can be None.
+        """
+        storage = self._ast._storage
+        for node_index in self._ast._get_nodes_indexes_with_types(
             ASTNodeType.MEMBER_REFERENCE, ASTNodeType.METHOD_INVOCATION, ASTNodeType.VARIABLE_DECLARATOR
         ):
-            if node.node_type == ASTNodeType.MEMBER_REFERENCE:
-                used_object_name = node.member
-                if node.qualifier is not None:
-                    used_object_name = node.qualifier + "." + used_object_name
+            node_type = storage.get_type(node_index)
+            used_object_name: Optional[str] = None
+            used_method_name: Optional[str] = None
+            if node_type == ASTNodeType.MEMBER_REFERENCE:
+                used_object_name = storage.get_attribute(node_index, "member")
+                qualifier = storage.get_attribute(node_index, "qualifier")
+                if qualifier is not None:
+                    used_object_name = qualifier + "." + used_object_name
+            elif node_type == ASTNodeType.METHOD_INVOCATION:
+                used_method_name = storage.get_attribute(node_index, "member")
+                used_object_name = storage.get_attribute(node_index, "qualifier")
+            elif node_type == ASTNodeType.VARIABLE_DECLARATOR:
+                used_object_name = storage.get_attribute(node_index, "name")
+
+            self._names_usages_nodes.append(node_index)
+            self._names_usages.append((used_object_name, used_method_name))
+
+    def _extract_semantic_from_ast(self, ast_root: ASTNode) -> StatementSemantic:
+        statement_semantic = StatementSemantic()
+        first_usage = bisect_left(self._names_usages_nodes, ast_root.node_index)
+        last_usage = bisect_left(
+            self._names_usages_nodes, self._ast._storage.get_subtree_end(ast_root.node_index), first_usage
+        )
+        for used_object_name, used_method_name in self._names_usages[first_usage:last_usage]:
+            if used_object_name is not None:
                 statement_semantic.used_objects.add(used_object_name)
-            elif node.node_type == ASTNodeType.METHOD_INVOCATION:
-                statement_semantic.used_methods.add(node.member)
-                if node.qualifier is not None:
-                    statement_semantic.used_objects.add(node.qualifier)
-            elif node.node_type == ASTNodeType.VARIABLE_DECLARATOR:
-                statement_semantic.used_objects.add(node.name)
+            if used_method_name is not None:
+                statement_semantic.used_methods.add(used_method_name)
 
         return statement_semantic
 
@@ -1,9 +1,10 @@
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional
 
 from .extract_semantic import extract_method_statements_semantic
 from .create_extraction_opportunities import create_extraction_opportunities
-from ._syntactic_filter import syntactic_filter
-from ._semantic_filter import semantic_filter
+from ._syntactic_filter import SyntacticFilter
+from ._semantic_filter import SemanticFilter
+from ._statements_layout import StatementsLayout
 from ._common_types import Statement, StatementSemantic, ExtractionOpportunity
 from ._common_cli import common_cli
 from veniq.ast_framework import AST
@@ -11,14 +12,21 @@ from veniq.ast_framework.block_statement_graph import build_block_statement_grap
 
 
 def filter_extraction_opportunities(
-    extraction_opportunities: List[ExtractionOpportunity],
+    extraction_opportunities: Iterable[ExtractionOpportunity],
     statements_semantic: Dict[Statement, StatementSemantic],
     method_ast: AST,
+    statements_layout: Optional[StatementsLayout] = None,
 ) -> List[ExtractionOpportunity]:
-    block_statement_graph = build_block_statement_graph(method_ast)
+    """
+    Statements layout is built from the block statement graph of the method, unless it is given.
+    """
+    if statements_layout is None:
+        statements_layout = StatementsLayout(build_block_statement_graph(method_ast))
+    syntactic_filter = SyntacticFilter(statements_layout)
+    semantic_filter = SemanticFilter(statements_semantic, statements_layout)
     extraction_opportunities_filtered = filter(
-        lambda extraction_opportunity: syntactic_filter(extraction_opportunity, block_statement_graph)
-        and semantic_filter(extraction_opportunity, statements_semantic, block_statement_graph),
+        lambda extraction_opportunity: syntactic_filter.is_extractable(extraction_opportunity)
+        and semantic_filter.is_extractable(extraction_opportunity),
         extraction_opportunities,
     )
     return list(extraction_opportunities_filtered)
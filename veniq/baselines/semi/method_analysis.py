@@ -0,0 +1,59 @@
+from typing import Dict, List
+
+from cached_property import cached_property  # type: ignore
+
+from veniq.ast_framework import AST
+from veniq.ast_framework.block_statement_graph import build_block_statement_graph, Statement
+from .extract_semantic import extract_method_statements_semantic
+from .create_extraction_opportunities import create_extraction_opportunities
+from .filter_extraction_opportunities import filter_extraction_opportunities
+from .rank_extraction_opportunities import rank_extraction_opportunities, ExtractionOpportunityGroup
+from ._common_types import Statement as ExtractionStatement, StatementSemantic, ExtractionOpportunity, \
+    MethodStatements
+from ._lcom2 import StatementsSimilarity
+from ._statements_layout import StatementsLayout
+
+
+class MethodAnalysis:
+    """
+    Context of a single method shared by all stages of SEMI.
+    Block statement graph, statements semantic and structures built over them
+    are created once on the first access and reused by every stage.
+    """
+
+    def __init__(self, method_ast: AST):
+        self.method_ast = method_ast
+
+    @cached_property
+    def block_statement_graph(self) -> Statement:
+        return build_block_statement_graph(self.method_ast)
+
+    @cached_property
+    def statements_semantic(self) -> Dict[ExtractionStatement, StatementSemantic]:
+        return extract_method_statements_semantic(self.method_ast, self.block_statement_graph)
+
+    @cached_property
+    def method_statements(self) -> MethodStatements:
+        return MethodStatements(self.statements_semantic.keys())
+
+    @cached_property
+    def statements_layout(self) -> StatementsLayout:
+        return StatementsLayout(self.block_statement_graph)
+
+    @cached_property
+    def statements_similarity(self) -> StatementsSimilarity:
+        return StatementsSimilarity(self.statements_semantic, self.method_statements)
+
+    def find_extraction_opportunities(self) -> List[ExtractionOpportunity]:
+        """
+        Extraction opportunities, which passed syntactic and semantic filters.
+        """
+        extraction_opportunities = create_extraction_opportunities(self.statements_semantic, self.method_statements)
+        return filter_extraction_opportunities(
+            extraction_opportunities, self.statements_semantic, self.method_ast, self.statements_layout
+        )
+
+    def find_extraction_opportunities_groups(self) -> List[ExtractionOpportunityGroup]:
+        return rank_extraction_opportunities(
+            self.statements_semantic, self.find_extraction_opportunities(), self.statements_similarity
+        )
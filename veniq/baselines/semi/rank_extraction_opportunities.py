@@ -1,4 +1,5 @@
-from typing import List, Dict, Tuple, Iterator, NamedTuple
+from bisect import bisect_left
+from typing import List, Dict, Tuple, Iterator, NamedTuple, Optional
 
 from veniq.ast_framework import AST
 from .extract_semantic import extract_method_statements_semantic
@@ -6,7 +7,7 @@ from .create_extraction_opportunities import create_extraction_opportunities
 from .filter_extraction_opportunities import filter_extraction_opportunities
 from ._common_types import Statement, StatementSemantic, ExtractionOpportunity, OpportunityBenefit
 from ._common_cli import common_cli
-from ._lcom2 import LCOM2
+from ._lcom2 import StatementsSimilarity
 
 
 class ExtractionOpportunityGroupSettings(NamedTuple):
@@ -21,10 +22,11 @@ class ExtractionOpportunityGroup:
         extraction_opportunity: ExtractionOpportunity,
         statements_semantic: Dict[Statement, StatementSemantic],
         settings: ExtractionOpportunityGroupSettings = ExtractionOpportunityGroupSettings(),
+        statements_similarity: Optional[StatementsSimilarity] = None,
     ):
         self._optimal_opportunity = extraction_opportunity
-        self._statements_semantic = statements_semantic
-        self._all_statements_benefit = LCOM2(statements_semantic)
+        self._statements_similarity = statements_similarity or StatementsSimilarity(statements_semantic)
+        self._all_statements_benefit = self._statements_similarity.lcom2()
 
         self._opportunities_to_benefit: Dict[ExtractionOpportunity, OpportunityBenefit] = {
             extraction_opportunity: self._calculate_benefit(extraction_opportunity)
@@ -76,22 +78,14 @@ class ExtractionOpportunityGroup:
     def _is_significantly_overlapping(
         self, extraction_opportunity1: ExtractionOpportunity, extraction_opportunity2: ExtractionOpportunity
     ) -> bool:
-        shared_statements_qty = len(set(extraction_opportunity1) & set(extraction_opportunity2))
+        shared_statements_qty = _count_shared_statements(extraction_opportunity1, extraction_opportunity2)
         max_size = max(len(extraction_opportunity1), len(extraction_opportunity2))
         return shared_statements_qty / max_size > self._settings.min_overlap
 
     def _calculate_benefit(self, extraction_opportunity: ExtractionOpportunity) -> OpportunityBenefit:
-        opportunity_semantic = {
-            statement: self._statements_semantic[statement] for statement in extraction_opportunity
-        }
-        opportunity_benefit = LCOM2(opportunity_semantic)
-
-        rest_statements_semantic = {
-            statement: self._statements_semantic[statement]
-            for statement in self._statements_semantic
-            if statement not in extraction_opportunity
-        }
-        rest_statements_benefit = LCOM2(rest_statements_semantic)
+        opportunity_benefit, rest_statements_benefit = self._statements_similarity.split_lcom2(
+            extraction_opportunity
+        )
 
         return self._all_statements_benefit - max(opportunity_benefit, rest_statements_benefit)
 
@@ -99,11 +93,36 @@ class ExtractionOpportunityGroup:
 def rank_extraction_opportunities(
     statements_semantic: Dict[Statement, StatementSemantic],
     extraction_opportunities: List[ExtractionOpportunity],
+    statements_similarity: Optional[StatementsSimilarity] = None,
+) -> List[ExtractionOpportunityGroup]:
+    if statements_similarity is None:
+        statements_similarity = StatementsSimilarity(statements_semantic)
+    extraction_opportunities_groups: List[ExtractionOpportunityGroup]
+    if _is_ranges_index_applicable(extraction_opportunities):
+        extraction_opportunities_groups = _group_extraction_opportunities_ranges(
+            statements_semantic, extraction_opportunities, statements_similarity
+        )
+    else:
+        extraction_opportunities_groups = _group_extraction_opportunities(
+            statements_semantic, extraction_opportunities, statements_similarity
+        )
+
+    return sorted(
+        extraction_opportunities_groups,
+        key=lambda extraction_opportunity_group: extraction_opportunity_group.benefit,
+        reverse=True,
+    )
+
+
+def _group_extraction_opportunities(
+    statements_semantic: Dict[Statement, StatementSemantic],
+    extraction_opportunities: List[ExtractionOpportunity],
+    statements_similarity: StatementsSimilarity,
 ) -> List[ExtractionOpportunityGroup]:
     extraction_opportunities_groups: List[ExtractionOpportunityGroup] = []
     while len(extraction_opportunities) > 0:
         new_extraction_opportunity_group = _create_extraction_opportunities_group(
-            statements_semantic, extraction_opportunities
+            statements_semantic, extraction_opportunities, statements_similarity
         )
         extraction_opportunities_groups.append(new_extraction_opportunity_group)
 
@@ -114,21 +133,18 @@ def rank_extraction_opportunities(
             opportunity for opportunity in extraction_opportunities if opportunity not in used_opportunities
         ]
 
-    return sorted(
-        extraction_opportunities_groups,
-        key=lambda extraction_opportunity_group: extraction_opportunity_group.benefit,
-        reverse=True,
-    )
+    return extraction_opportunities_groups
 
 
 def _create_extraction_opportunities_group(
     statements_semantic: Dict[Statement, StatementSemantic],
     extraction_opportunities: List[ExtractionOpportunity],
+    statements_similarity: StatementsSimilarity,
 ) -> ExtractionOpportunityGroup:
     assert len(extraction_opportunities) > 0, "Cannot create a group from empty list of opportunities."
 
     extraction_opportunity_group = ExtractionOpportunityGroup(
-        extraction_opportunities[0], statements_semantic
+        extraction_opportunities[0], statements_semantic, statements_similarity=statements_similarity
     )
     for extraction_opportunity in extraction_opportunities[1:]:
         if extraction_opportunity_group.is_allowed_to_add_opportunity(extraction_opportunity):
@@ -137,6 +153,112 @@ def _create_extraction_opportunities_group(
     return extraction_opportunity_group
 
 
+def _is_ranges_index_applicable(extraction_opportunities: List[ExtractionOpportunity]) -> bool:
+    """
+    Index is used for distinct ranges of the same method only.
+    Opportunities without shared statements must never be grouped, i.e. minimal overlap is not negative.
+    """
+    if len(extraction_opportunities) == 0 or ExtractionOpportunityGroupSettings().min_overlap < 0:
+        return False
+
+    method_statements = getattr(extraction_opportunities[0], "method_statements", None)
+    return all(
+        isinstance(extraction_opportunity, ExtractionOpportunity)
+        and extraction_opportunity.method_statements is method_statements
+        for extraction_opportunity in extraction_opportunities
+    ) and len(set(extraction_opportunities)) == len(extraction_opportunities)
+
+
+def _group_extraction_opportunities_ranges(
+    statements_semantic: Dict[Statement, StatementSemantic],
+    extraction_opportunities: List[ExtractionOpportunity],
+    statements_similarity: StatementsSimilarity,
+) -> List[ExtractionOpportunityGroup]:
+    """
+    Makes the same groups as _group_extraction_opportunities.
+    Each group is checked only against opportunities overlapping its optimal opportunity, which are
+    looked up in the index. They are tried in the original order, until the optimal opportunity changes,
+    then opportunities overlapping the new one, which go after the last added, are looked up.
+    """
+    ranges_index = _ExtractionOpportunitiesRangesIndex(extraction_opportunities)
+    is_grouped = [False] * len(extraction_opportunities)
+    extraction_opportunities_groups: List[ExtractionOpportunityGroup] = []
+    for first_opportunity_index, first_opportunity in enumerate(extraction_opportunities):
+        if is_grouped[first_opportunity_index]:
+            continue
+
+        is_grouped[first_opportunity_index] = True
+        extraction_opportunity_group = ExtractionOpportunityGroup(
+            first_opportunity, statements_semantic, statements_similarity=statements_similarity
+        )
+
+        last_opportunity_index = first_opportunity_index
+        is_optimal_opportunity_changed = True
+        while is_optimal_opportunity_changed:
+            is_optimal_opportunity_changed = False
+            optimal_opportunity = extraction_opportunity_group._optimal_opportunity
+            candidates_indexes = sorted(
+                opportunity_index
+                for opportunity_index in ranges_index.find_overlapping(optimal_opportunity)
+                if opportunity_index > last_opportunity_index and not is_grouped[opportunity_index]
+            )
+            for opportunity_index in candidates_indexes:
+                extraction_opportunity = extraction_opportunities[opportunity_index]
+                if extraction_opportunity_group.is_allowed_to_add_opportunity(extraction_opportunity):
+                    extraction_opportunity_group.add_extraction_opportunity(extraction_opportunity)
+                    is_grouped[opportunity_index] = True
+                    last_opportunity_index = opportunity_index
+                    if extraction_opportunity_group._optimal_opportunity is not optimal_opportunity:
+                        is_optimal_opportunity_changed = True
+                        break
+
+        extraction_opportunities_groups.append(extraction_opportunity_group)
+
+    return extraction_opportunities_groups
+
+
+class _ExtractionOpportunitiesRangesIndex:
+    """
+    Extraction opportunities sorted by beginnings of their ranges.
+    Ranges overlapping a given one begin before its end and not earlier,
+    than the longest range length before its beginning, so they are in a window of sorted beginnings.
+    """
+
+    def __init__(self, extraction_opportunities: List[ExtractionOpportunity]):
+        self._extraction_opportunities = extraction_opportunities
+        self._sorted_indexes = sorted(
+            range(len(extraction_opportunities)), key=lambda index: extraction_opportunities[index].begin
+        )
+        self._sorted_begins = [extraction_opportunities[index].begin for index in self._sorted_indexes]
+        self._max_range_length = max(
+            extraction_opportunity.end - extraction_opportunity.begin
+            for extraction_opportunity in extraction_opportunities
+        )
+
+    def find_overlapping(self, extraction_opportunity: ExtractionOpportunity) -> Iterator[int]:
+        window_begin = bisect_left(self._sorted_begins, extraction_opportunity.begin - self._max_range_length + 1)
+        window_end = bisect_left(self._sorted_begins, extraction_opportunity.end)
+        for opportunity_index in self._sorted_indexes[window_begin:window_end]:
+            if self._extraction_opportunities[opportunity_index].end > extraction_opportunity.begin:
+                yield opportunity_index
+
+
+def _count_shared_statements(
+    extraction_opportunity1: ExtractionOpportunity, extraction_opportunity2: ExtractionOpportunity
+) -> int:
+    if (
+        isinstance(extraction_opportunity1, ExtractionOpportunity)
+        and isinstance(extraction_opportunity2, ExtractionOpportunity)
+        and extraction_opportunity1.method_statements is extraction_opportunity2.method_statements
+    ):
+        real_statements_prefix_qty = extraction_opportunity1.method_statements.real_statements_prefix_qty
+        shared_begin = max(extraction_opportunity1.begin, extraction_opportunity2.begin)
+        shared_end = min(extraction_opportunity1.end, extraction_opportunity2.end)
+        return max(real_statements_prefix_qty[shared_end] - real_statements_prefix_qty[shared_begin], 0)
+
+    return len(set(extraction_opportunity1) & set(extraction_opportunity2))
+
+
 def _print_extraction_opportunities(
     method_ast: AST, filepath: str, class_name: str, method_name: str
 ) -> None:
@@ -1,44 +1,52 @@
-from typing import List, Tuple
-from tempfile import NamedTemporaryFile
-from functools import reduce
-from operator import itemgetter
+import json
 import os
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import Future, as_completed
+from functools import partial, reduce
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple, Union
 
 from javalang.parser import JavaSyntaxError
+from pebble import ProcessPool
 
-from veniq.utils.ast_builder import build_ast
-from veniq.ast_framework import AST, ASTNodeType
+from veniq.ast_framework import AST, ASTNode, ASTNodeType
+from veniq.ast_framework.ast_cache import ASTCache, build_ast_from_source
 from veniq.baselines.semi.rank_extraction_opportunities import \
-    rank_extraction_opportunities, ExtractionOpportunityGroup
-from veniq.baselines.semi.create_extraction_opportunities import \
-    create_extraction_opportunities
-from veniq.baselines.semi.extract_semantic import \
-    extract_method_statements_semantic
-from veniq.baselines.semi.filter_extraction_opportunities import \
-    filter_extraction_opportunities
+    ExtractionOpportunityGroup
+from veniq.baselines.semi.method_analysis import MethodAnalysis
 from veniq.baselines.semi._common_types import ExtractionOpportunity,\
     OpportunityBenefit
+from veniq.utils.encoding_detector import decode_with_autodetected_encoding
+from veniq.utils.timeout import TerminateExecution, deadline
 
 
 EMORange = Tuple[int, int]
 
 
+class MethodRecommendation(NamedTuple):
+    '''
+    EMORanges recommended for a single method of a file in the order of decreasing recommendation.
+    Unlike in recommend_for_method, lines of ranges are numbered as in the file starting from 1.
+    If a file or a method can not be processed, ranges are empty and the error describes the reason,
+    class and method are None for files, which can not be parsed.
+    '''
+    filepath: str
+    class_name: Optional[str]
+    method_name: Optional[str]
+    method_line: Optional[int]
+    emo_ranges: List[EMORange]
+    error: Optional[str] = None
+
+
 def _add_class_decl_wrap(method_decl: List[str]) -> List[str]:
     class_decl = ['class FakeClass {'] + method_decl + ['}']
     return class_decl
 
 
-def _get_method_subtree(class_decl: List[str]) -> AST:
-    with NamedTemporaryFile(delete=False) as f:
-        _name = f.name
-        f.write('\n'.join(class_decl).encode())
-    try:
-        javalang_ast = build_ast(_name)
-        ast = AST.build_from_javalang(javalang_ast)
-        os.unlink(_name)
-    except JavaSyntaxError as e:
-        os.unlink(_name)
-        raise e
+def _get_method_subtree(class_decl: List[str], ast_cache: Optional[ASTCache] = None) -> AST:
+    ast = build_ast_from_source('\n'.join(class_decl), ast_cache)
 
     class_node = list(ast.get_proxy_nodes(ASTNodeType.CLASS_DECLARATION))[0]
     objects_to_consider = list(class_node.methods) + \
@@ -50,16 +58,7 @@ def _get_method_subtree(class_decl: List[str]) -> AST:
 
 
 def _find_EMO_groups(method_subtree: AST) -> List[ExtractionOpportunityGroup]:
-    statements_semantic = extract_method_statements_semantic(method_subtree)
-    extraction_opportunities = create_extraction_opportunities(
-        statements_semantic)
-    filtered_extraction_opportunities = filter_extraction_opportunities(
-        extraction_opportunities, statements_semantic, method_subtree)
-    extraction_opportunities_groups = rank_extraction_opportunities(
-        statements_semantic, filtered_extraction_opportunities
-    )
-
-    return extraction_opportunities_groups
+    return MethodAnalysis(method_subtree).find_extraction_opportunities_groups()
 
 
 def _find_closing_brackets(extraction_till_end: List[str], num_extr_lines_orig: int) -> int:
@@ -96,31 +95,201 @@ def _convert_ExtractionOpportunity_to_EMO(
     return (start_line_opportunity, start_line_opportunity + addit_lines_brackets)
 
 
-def recommend_for_method(method_decl: str) -> List[EMORange]:
+def recommend_for_method(method_decl: str, ast_cache: Optional[ASTCache] = None) -> List[EMORange]:
     '''
     Takes method declaration in form of a string with newline delimiters,
     outputs list of EMORanges in the order of decreasing recommendation.
     EMORange is a (start_line_extraction, end_line_extraction)
     (the range is inclusive).
+    If AST cache is given, method ASTs are looked up there before parsing.
     '''
     method_decl_lines = method_decl.splitlines()
     class_decl_fake = _add_class_decl_wrap(method_decl_lines)
     try:
-        method_subtree = _get_method_subtree(class_decl_fake)
+        method_subtree = _get_method_subtree(class_decl_fake, ast_cache)
     except JavaSyntaxError as e:
         raise e
     emo_groups_semi = _find_EMO_groups(method_subtree)
-    if emo_groups_semi is None or emo_groups_semi == []:
-        return []
+    emo_ranges_ranked = _rank_EMO_ranges(emo_groups_semi, class_decl_fake)
+
+    # subtract 1 because we added fake class declaration line
+    emo_ranges_ranked = [(x[0] - 1, x[1] - 1) for x in emo_ranges_ranked]
+    return emo_ranges_ranked
+
+
+def recommend_for_file(
+    filepath: Union[str, Path],
+    ast_cache: Optional[ASTCache] = None,
+    method_timeout: Optional[float] = None,
+) -> List[MethodRecommendation]:
+    '''
+    Parses a file once and recommends EMORanges for every method and constructor
+    of its top level and member classes, enums and interfaces, which has a body.
+    Class name of a recommendation is a name of any of these declarations.
+    Methods, which are analyzed longer than method_timeout seconds, are skipped with 'timeout' error.
+    If AST cache is given, the file AST is looked up there before parsing.
+    '''
+    filepath = str(filepath)
+    try:
+        source = Path(filepath).read_bytes()
+        text_lines = decode_with_autodetected_encoding(source).split('\n')
+        # bodies are built only for methods being analyzed
+        ast = build_ast_from_source(source, ast_cache, lazy_methods_bodies=True)
+    except Exception as e:
+        return [MethodRecommendation(filepath, None, None, None, [], _describe_error(e))]
+
+    recommendations: List[MethodRecommendation] = []
+    for class_declaration in _iterate_types_declarations(ast.get_root().types):
+        for method_declaration in list(class_declaration.methods) + list(class_declaration.constructors):
+            if not _has_body(method_declaration, class_declaration):
+                continue
+
+            emo_ranges: List[EMORange] = []
+            error: Optional[str] = None
+            try:
+                with deadline(method_timeout):
+                    emo_groups = _find_EMO_groups(ast.get_subtree(method_declaration))
+                    # add 1 because lines of the file are counted from 0
+                    emo_ranges = [(x[0] + 1, x[1] + 1) for x in _rank_EMO_ranges(emo_groups, text_lines)]
+            except TerminateExecution:
+                error = 'timeout'
+            except Exception as e:
+                error = _describe_error(e)
+
+            recommendations.append(MethodRecommendation(
+                filepath, class_declaration.name, method_declaration.name, method_declaration.line, emo_ranges, error
+            ))
+
+    return recommendations
+
+
+def recommend_for_corpus(
+    filepaths: Iterable[Union[str, Path]],
+    jobs: int = 1,
+    ast_cache: Optional[ASTCache] = None,
+    method_timeout: Optional[float] = None,
+) -> Iterator[MethodRecommendation]:
+    '''
+    Recommends EMORanges for all methods of given files, see recommend_for_file for details.
+    Files are distributed among a pool of processes and recommendations are yielded file by file
+    as soon as they are ready, so files may come in any order.
+    With a single job files are processed in the current process in the given order.
+    '''
+    recommend = partial(recommend_for_file, ast_cache=ast_cache, method_timeout=method_timeout)
+    if jobs <= 1:
+        for filepath in filepaths:
+            yield from recommend(filepath)
+        return
+
+    with ProcessPool(jobs) as pool:
+        futures: Dict[Future, str] = {
+            pool.schedule(recommend, args=[filepath]): str(filepath) for filepath in filepaths
+        }
+        for future in as_completed(futures):
+            try:
+                yield from future.result()
+            except Exception as e:  # worker has crashed
+                yield MethodRecommendation(futures[future], None, None, None, [], _describe_error(e))
 
+
+def write_recommendations(recommendations: Iterable[MethodRecommendation], output: TextIO) -> None:
+    '''
+    Streams recommendations as JSON Lines, each line is flushed as soon as it is written.
+    '''
+    for recommendation in recommendations:
+        output.write(json.dumps(recommendation._asdict()) + '\n')
+        output.flush()
+
+
+def _rank_EMO_ranges(emo_groups: List[ExtractionOpportunityGroup], lines: List[str]) -> List[EMORange]:
     all_opportunities_semi: List[Tuple[ExtractionOpportunity, OpportunityBenefit]] = \
-        reduce(lambda x, y: x + list(y.opportunities), emo_groups_semi, [])
+        reduce(lambda x, y: x + list(y.opportunities), emo_groups, [])
 
     all_opportunities_semi_ranked = sorted(all_opportunities_semi, key=itemgetter(1),
                                            reverse=True)
-    emo_ranges_ranked = [_convert_ExtractionOpportunity_to_EMO(
-        x[0], class_decl_fake) for x in all_opportunities_semi_ranked]
+    return [_convert_ExtractionOpportunity_to_EMO(x[0], lines) for x in all_opportunities_semi_ranked]
 
-    # subtract 1 because we added fake class declaration line
-    emo_ranges_ranked = [(x[0] - 1, x[1] - 1) for x in emo_ranges_ranked]
-    return emo_ranges_ranked
+
+_TYPES_DECLARATIONS = (
+    ASTNodeType.CLASS_DECLARATION,
+    ASTNodeType.ENUM_DECLARATION,
+    ASTNodeType.INTERFACE_DECLARATION,
+)
+
+
+def _iterate_types_declarations(declarations: Iterable[ASTNode]) -> Iterator[ASTNode]:
+    '''
+    Yields classes, enums and interfaces declared at the top level or as members of other ones.
+    Local classes inside methods bodies are not yielded, so the same methods are found
+    whether their bodies are built lazily or not.
+    '''
+    for declaration in declarations:
+        if declaration.node_type not in _TYPES_DECLARATIONS:
+            continue
+        yield declaration
+        if declaration.node_type == ASTNodeType.ENUM_DECLARATION:
+            yield from _iterate_types_declarations(declaration.body.declarations)
+        else:
+            yield from _iterate_types_declarations(declaration.body)
+
+
+def _has_body(method_declaration: ASTNode, type_declaration: ASTNode) -> bool:
+    '''
+    Decides by modifiers, so lazily built bodies are not built just to be checked.
+    Methods of interfaces have bodies only if they are default, static or private.
+    '''
+    modifiers = method_declaration.modifiers
+    if type_declaration.node_type == ASTNodeType.INTERFACE_DECLARATION:
+        return bool(modifiers & {'default', 'static', 'private'})
+    return not modifiers & {'abstract', 'native'}
+
+
+def _describe_error(error: BaseException) -> str:
+    return f'{type(error).__name__}: {error}'
+
+
+def _find_java_files(paths: Iterable[str]) -> Iterator[Path]:
+    for path in map(Path, paths):
+        if path.is_dir():
+            yield from sorted(path.rglob('*.java'))
+        else:
+            yield path
+
+
+if __name__ == '__main__':
+    system_cores_qty = os.cpu_count() or 1
+    parser = ArgumentParser(description='Recommends EMORanges for all methods of Java files as JSON Lines')
+    parser.add_argument(
+        'paths', nargs='+', help='Java files and directories, which are searched for Java files recursively'
+    )
+    parser.add_argument(
+        '-o', '--output', default=None, help='File path to write JSON Lines to, if omitted standard output is used'
+    )
+    parser.add_argument(
+        '--jobs',
+        '-j',
+        type=int,
+        default=max(system_cores_qty - 1, 1),
+        help='Number of processes to spawn. By default one less than number of cores.',
+    )
+    parser.add_argument(
+        '--method-timeout',
+        type=float,
+        default=10.0,
+        help='Seconds to analyze a single method, methods taking longer are reported with timeout error',
+    )
+    parser.add_argument(
+        '--ast-cache',
+        default=None,
+        dest='ast_cache_dir',
+        help='Directory for caching built ASTs between runs, if omitted ASTs are not cached',
+    )
+    args = parser.parse_args()
+
+    ast_cache = ASTCache(args.ast_cache_dir) if args.ast_cache_dir is not None else None
+    recommendations = recommend_for_corpus(_find_java_files(args.paths), args.jobs, ast_cache, args.method_timeout)
+    if args.output is None:
+        write_recommendations(recommendations, sys.stdout)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            write_recommendations(recommendations, output)
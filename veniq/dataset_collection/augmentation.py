@@ -16,9 +16,9 @@ from pebble import ProcessPool
 from tqdm import tqdm
 
 from veniq.ast_framework import AST, ASTNodeType, ASTNode
+from veniq.ast_framework.ast_cache import ASTCache, build_ast_from_file, build_ast_from_source
 from veniq.dataset_collection.types_identifier import AlgorithmFactory, InlineTypesAlgorithms
 from veniq.metrics.ncss.ncss import NCSSMetric
-from veniq.utils.ast_builder import build_ast
 from veniq.utils.encoding_detector import read_text_with_autodetected_encoding
 
 
@@ -217,19 +217,22 @@ def check_whether_method_has_return_type(
 def get_variables_decl_in_node(
         method_decl: AST) -> List[str]:
     names = []
-    for x in method_decl.get_proxy_nodes(ASTNodeType.VARIABLE_DECLARATOR):
+    variable_declarators, variable_declarations, try_resources = method_decl.select_many(
+        ['VARIABLE_DECLARATOR', 'VARIABLE_DECLARATION', 'TRY_RESOURCE']
+    )
+    for x in variable_declarators:
         if hasattr(x, 'name'):
             names.append(x.name)
         elif hasattr(x, 'names'):
             names.extend(x.names)
 
-    for x in method_decl.get_proxy_nodes(ASTNodeType.VARIABLE_DECLARATION):
+    for x in variable_declarations:
         if hasattr(x, 'name'):
             names.append(x.name)
         elif hasattr(x, 'names'):
             names.extend(x.names)
 
-    for x in method_decl.get_proxy_nodes(ASTNodeType.TRY_RESOURCE):
+    for x in try_resources:
         names.append(x.name)
 
     return names
@@ -329,12 +332,14 @@ def insert_code_with_new_file_creation(
                     line_to_csv['inline_insertion_line_start'] = inline_method_bounds[0]
                     line_to_csv['inline_insertion_line_end'] = inline_method_bounds[1]
 
-                    if get_ast_if_possible(new_full_filename):
+                    changed_ast = get_ast_if_possible(new_full_filename)
+                    if changed_ast:
                         rest_of_csv_row_for_changed_file = find_lines_in_changed_file(
                             class_name=class_name,
                             method_node=method_node,
                             new_full_filename=new_full_filename,
-                            original_func=original_func)
+                            original_func=original_func,
+                            changed_ast=changed_ast)
 
                         can_be_parsed = True
                         line_to_csv.update(rest_of_csv_row_for_changed_file)
@@ -351,27 +356,28 @@ def find_lines_in_changed_file(
         new_full_filename: Path,
         method_node: ASTNode,
         original_func: ASTNode,
-        class_name: str) -> Dict[str, Any]:
+        class_name: str,
+        changed_ast: Optional[AST] = None) -> Dict[str, Any]:
     """
     Find start and end line of invocation for changed file
     :param class_name: class name of old file
     :param new_full_filename: name of new file
     :param method_node: method declaration of old file
     :param original_func: method declaration of invoked function in old file
+    :param changed_ast: already built AST of new file, it is parsed again if omitted
     :return:
     """
-    changed_ast = get_ast_if_possible(new_full_filename)
+    if changed_ast is None:
+        changed_ast = get_ast_if_possible(new_full_filename)
     if changed_ast:
-        class_node_of_changed_file = [
-            x for x in changed_ast.get_proxy_nodes(ASTNodeType.CLASS_DECLARATION)
-            if x.name == class_name][0]
+        class_node_of_changed_file = list(changed_ast.select(f'CLASS_DECLARATION[name="{class_name}"]'))[0]
         class_subtree = changed_ast.get_subtree(class_node_of_changed_file)
-        node = [x for x in class_subtree.get_proxy_nodes(
-            ASTNodeType.METHOD_DECLARATION,
-            ASTNodeType.CONSTRUCTOR_DECLARATION)
-            if x.name == method_node.name][0]  # type: ignore
-        original_func_changed = [x for x in class_subtree.get_proxy_nodes(
-            ASTNodeType.METHOD_DECLARATION) if x.name == original_func.name][0]
+        changed_methods, changed_original_funcs = class_subtree.select_many([
+            f'METHOD_DECLARATION|CONSTRUCTOR_DECLARATION[name="{method_node.name}"]',  # type: ignore
+            f'METHOD_DECLARATION[name="{original_func.name}"]',
+        ])
+        node = changed_methods[0]
+        original_func_changed = changed_original_funcs[0]
 
         body_start_line, body_end_line = method_body_lines(original_func_changed, new_full_filename)
         return {
@@ -383,14 +389,21 @@ def find_lines_in_changed_file(
         return {}
 
 
-def get_ast_if_possible(file_path: Path) -> Optional[AST]:
+def get_ast_if_possible(
+        file_path: Path,
+        ast_cache: Optional[ASTCache] = None,
+        text: Optional[str] = None) -> Optional[AST]:
     """
     Processing file in order to check
-    that its original version can be parsed
+    that its original version can be parsed.
+    If text of the file is given, it is parsed in memory instead of reading the file.
     """
     ast = None
     try:
-        ast = AST.build_from_javalang(build_ast(str(file_path)))
+        if text is not None:
+            ast = build_ast_from_source(text, ast_cache)
+        else:
+            ast = build_ast_from_file(file_path, ast_cache)
     except Exception:
         print(f"Processing {file_path} is aborted due to parsing")
     return ast
@@ -416,12 +429,14 @@ def remove_comments(string):
 def analyze_file(
         file_path: Path,
         output_path: Path,
-        input_dir: Path
+        input_dir: Path,
+        ast_cache: Optional[ASTCache] = None
 ) -> List[Any]:
     """
     In this function we process each file.
     For each file we find each invocation inside,
     which can be inlined.
+    ASTs of processed files are taken from the cache, if it is given.
     """
     # print(file_path)
     results: List[Any] = []
@@ -430,12 +445,12 @@ def analyze_file(
     text_without_comments = remove_comments(original_text)
     # remove whitespaces
     text = "\n".join([ll.rstrip() for ll in text_without_comments.splitlines() if ll.strip()])
-    dst_filename = save_text_to_new_file(input_dir, text, file_path)
 
-    ast = get_ast_if_possible(dst_filename)
+    ast = get_ast_if_possible(file_path, ast_cache, text=text)
     if ast is None:
-        dst_filename.unlink()
         return results
+    # inlining algorithms read and copy lines of the file, so it is saved only when it can be parsed
+    dst_filename = save_text_to_new_file(input_dir, text, file_path)
 
     method_declarations: Dict[str, List[ASTNode]] = defaultdict(list)
     classes_declaration = [
@@ -560,6 +575,12 @@ if __name__ == '__main__':  # noqa: C901
         default=100,
         type=int,
     )
+    parser.add_argument(
+        "--ast-cache",
+        default=None,
+        dest="ast_cache_dir",
+        help="Directory for caching built ASTs between runs, if omitted ASTs are not cached",
+    )
 
     args = parser.parse_args()
 
@@ -597,7 +618,8 @@ if __name__ == '__main__':  # noqa: C901
         p_analyze = partial(
             analyze_file,
             output_path=output_dir.absolute(),
-            input_dir=input_dir
+            input_dir=input_dir,
+            ast_cache=ASTCache(args.ast_cache_dir) if args.ast_cache_dir is not None else None
         )
         future = executor.map(p_analyze, files_without_tests, timeout=1000, )
         result = future.result()
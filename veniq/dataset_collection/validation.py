@@ -4,7 +4,7 @@ from argparse import ArgumentParser
 from dataclasses import dataclass, asdict
 from functools import partial
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import pandas as pd
 from numpy import mean
@@ -14,27 +14,16 @@ from tqdm import tqdm
 from veniq.utils.timeout import invoke_with_timeout
 from veniq.ast_framework import AST, ASTNodeType
 from veniq.ast_framework import ASTNode
-from veniq.baselines.semi.create_extraction_opportunities import create_extraction_opportunities
-from veniq.baselines.semi.extract_semantic import extract_method_statements_semantic
-from veniq.baselines.semi.filter_extraction_opportunities import filter_extraction_opportunities
-from veniq.baselines.semi.rank_extraction_opportunities import rank_extraction_opportunities, ExtractionOpportunityGroup
+from veniq.ast_framework.ast_cache import ASTCache, build_ast_from_source
+from veniq.baselines.semi.method_analysis import MethodAnalysis
+from veniq.baselines.semi.rank_extraction_opportunities import ExtractionOpportunityGroup
 from veniq.metrics.ncss.ncss import NCSSMetric
-from veniq.utils.ast_builder import build_ast
-from veniq.utils.encoding_detector import read_text_with_autodetected_encoding
+from veniq.utils.encoding_detector import decode_with_autodetected_encoding, read_text_with_autodetected_encoding
 
 
 def find_extraction_opportunities(
         method_ast: AST) -> List[ExtractionOpportunityGroup]:
-    statements_semantic = extract_method_statements_semantic(method_ast)
-    extraction_opportunities = create_extraction_opportunities(statements_semantic)
-    filtered_extraction_opportunities = filter_extraction_opportunities(
-        extraction_opportunities, statements_semantic, method_ast
-    )
-    extraction_opportunities_groups = rank_extraction_opportunities(
-        statements_semantic, filtered_extraction_opportunities
-    )
-
-    return extraction_opportunities_groups
+    return MethodAnalysis(method_ast).find_extraction_opportunities_groups()
 
 
 @dataclass
@@ -58,20 +47,23 @@ class RowResult:
 
 def fix_start_end_lines_for_opportunity(
         extracted_lines_of_opportunity: List[int],
-        filepath: str) -> Tuple[int, int]:
+        filepath: str,
+        text_lines: Optional[List[str]] = None) -> Tuple[int, int]:
     """
     Finds start and end lines for opportunity
 
     :param filepath: filename where opportunity was found
     :param extracted_lines_of_opportunity: list of lines for opportunity
+    :param text_lines: already read lines of the file, it is read if they are omitted
     :return: list of extracted lines for opportunity
     """
     start_line_opportunity = min(extracted_lines_of_opportunity)
     end_line_opportunity = max(extracted_lines_of_opportunity)
-    text = read_text_with_autodetected_encoding(filepath).split('\n')
+    if text_lines is None:
+        text_lines = read_text_with_autodetected_encoding(filepath).split('\n')
     extraction_lines_number = end_line_opportunity - start_line_opportunity
     #  Extract everything from the beginning of semi opportunity
-    extraction = text[start_line_opportunity - 1:]
+    extraction = text_lines[start_line_opportunity - 1:]
 
     balance = 0
     first_line_found = False
@@ -95,7 +87,7 @@ def fix_start_end_lines_for_opportunity(
 
 
 # flake8: noqa: C901
-def validate_row(dataset_dir: Path, row: pd.Series) \
+def validate_row(dataset_dir: Path, row: pd.Series, ast_cache: Optional[ASTCache] = None) \
         -> List[RowResult]:
     """
     Validate row of dataset
@@ -103,6 +95,7 @@ def validate_row(dataset_dir: Path, row: pd.Series) \
     :param dataset_dir: directory to dataset, path before the relative path in
     output_filename
     :param row: row of dataframe of synth validation dataset
+    :param ast_cache: cache of built ASTs, ASTs are not cached if it is omitted
     :return: Stats - return collected stats
     """
     results = []
@@ -113,7 +106,11 @@ def validate_row(dataset_dir: Path, row: pd.Series) \
         src_filename = row[1]['output_filename']
         class_name = row[1]['class_name']
         full_path = dataset_dir / src_filename
-        ast = AST.build_from_javalang(build_ast(full_path))
+        # the file is read once, its lines are reused for fixing opportunities bounds
+        source = full_path.read_bytes()
+        text_lines = decode_with_autodetected_encoding(source).split('\n')
+        # only a single method is analyzed, so other methods bodies are not built
+        ast = build_ast_from_source(source, ast_cache, lazy_methods_bodies=True)
         function_to_analyze = row[1]['method_where_invocation_occurred']
 
         for class_decl in ast.get_proxy_nodes(ASTNodeType.CLASS_DECLARATION):
@@ -151,7 +148,8 @@ def validate_row(dataset_dir: Path, row: pd.Series) \
                                 end_line_of_inserted_block,
                                 full_path,
                                 opport,
-                                result)
+                                result,
+                                text_lines)
                         else:
                             result.no_opportunity_chosen = True
 
@@ -182,14 +180,16 @@ def find_matched_lines(
         end_line_of_inserted_block: int,
         full_path: str,
         opportunities_list: List[ExtractionOpportunityGroup],
-        result: RowResult) -> None:
+        result: RowResult,
+        text_lines: Optional[List[str]] = None) -> None:
     best_group = opportunities_list[0]
     lines = [node.line for node in best_group._optimal_opportunity]
     fixed_lines = invoke_with_timeout(
         5,
         fix_start_end_lines_for_opportunity,
         lines,
-        full_path
+        full_path,
+        text_lines
     )
 
     start_line_opportunity = min(fixed_lines)
@@ -241,6 +241,12 @@ if __name__ == '__main__':
              "By default one less than number of cores. "
              "Be careful to raise it above, machine may stop responding while creating dataset.",
     )
+    parser.add_argument(
+        "--ast-cache",
+        default=None,
+        dest="ast_cache_dir",
+        help="Directory for caching built ASTs between runs, if omitted ASTs are not cached",
+    )
     args = parser.parse_args()
     dataset_dir = Path(args.dataset_dir)
     csv_dataset_filename = Path(args.csv_input)
@@ -250,7 +256,8 @@ if __name__ == '__main__':
     output_df = pd.DataFrame(columns=list(RowResult.__annotations__.keys()))
 
     with ProcessPool(system_cores_qty) as executor:
-        validate_row_f = partial(validate_row, dataset_dir)
+        ast_cache = ASTCache(args.ast_cache_dir) if args.ast_cache_dir is not None else None
+        validate_row_f = partial(validate_row, dataset_dir, ast_cache=ast_cache)
         future = executor.map(validate_row_f, df.iterrows(), timeout=10000, )
         result = future.result()
         for index, row in tqdm(df.iterrows(), total=df.shape[0]):
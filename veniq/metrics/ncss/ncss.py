@@ -12,20 +12,21 @@ class NCSSMetric:
 
     def value(self, ast: AST) -> int:
         metric = 0
-        for node in ast.get_proxy_nodes(
-            *NCSSMetric._keyword_node_types,
-            *NCSSMetric._declarations_node_types,
-            *NCSSMetric._misc_node_types
-        ):
-            metric += 1
-
-            if node.node_type == ASTNodeType.IF_STATEMENT and self._has_pure_else_statements(node):
-                metric += 1
-            elif node.node_type == ASTNodeType.TRY_STATEMENT and self._has_finally_block(node):
-                metric += 1
+        for node in ast.get_proxy_nodes(*NCSSMetric.counted_node_types):
+            metric += self.node_value(node)
 
         return metric
 
+    def node_value(self, node: ASTNode) -> int:
+        """
+        Contribution of a single node with one of counted_node_types to the metric.
+        """
+        if node.node_type == ASTNodeType.IF_STATEMENT and self._has_pure_else_statements(node):
+            return 2
+        elif node.node_type == ASTNodeType.TRY_STATEMENT and self._has_finally_block(node):
+            return 2
+        return 1
+
     def _has_pure_else_statements(self, if_statement: ASTNode) -> bool:
         """
         Checks is there else branch.
@@ -85,3 +86,5 @@ class NCSSMetric:
         # Statement expressions also includes assignments
         ASTNodeType.STATEMENT_EXPRESSION,
     }
+
+    counted_node_types = _keyword_node_types | _declarations_node_types | _misc_node_types
@@ -28,8 +28,7 @@ class ClassicGetter:
 
     def value(self, ast: AST) -> List[int]:
         lines: List[int] = []
-        for node in ast.get_proxy_nodes(ASTNodeType.METHOD_DECLARATION):
-            method_name = node.name
-            if method_name.startswith('get') and self._check_body_nodes(node.body):
+        for node in ast.select('METHOD_DECLARATION[name^=get]'):
+            if self._check_body_nodes(node.body):
                 lines.append(node.line)
         return sorted(lines)
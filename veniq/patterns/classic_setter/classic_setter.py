@@ -25,9 +25,7 @@ class ClassicSetter:
 
     def value(self, ast: AST) -> List[int]:
         lines: List[int] = []
-        for node in ast.get_proxy_nodes(ASTNodeType.METHOD_DECLARATION):
-            method_name = node.name
-            if node.return_type is None and method_name.startswith('set') and \
-                    self._check_body_nodes(node.body):
+        for node in ast.select('METHOD_DECLARATION[return_type=None][name^=set]'):
+            if self._check_body_nodes(node.body):
                 lines.append(node.line)
         return sorted(lines)
@@ -1,8 +1,19 @@
+from typing import Union
+
 from javalang.parse import parse
 from javalang.tree import CompilationUnit
 
-from veniq.utils.encoding_detector import read_text_with_autodetected_encoding
+from veniq.utils.encoding_detector import read_text_with_autodetected_encoding, decode_with_autodetected_encoding
 
 
 def build_ast(filename: str) -> CompilationUnit:
     return parse(read_text_with_autodetected_encoding(filename))
+
+
+def build_ast_from_source(source: Union[str, bytes]) -> CompilationUnit:
+    """
+    Parses Java source kept in memory. Encoding of bytes is autodetected.
+    """
+    if isinstance(source, bytes):
+        source = decode_with_autodetected_encoding(source)
+    return parse(source)
@@ -1,6 +1,7 @@
 import threading
 import signal
 import os
+from contextlib import contextmanager
 
 
 class TerminateExecution(Exception):
@@ -43,3 +44,23 @@ def invoke_with_timeout(timeout, fn, *args, **kwargs):
         raise BaseException("xxx")
 
     return result
+
+
+@contextmanager
+def deadline(seconds):
+    """
+    Raises TerminateExecution inside the block, if it runs longer than given seconds.
+    Unlike invoke_with_timeout no process is killed, so it is safe to use in workers of a process pool.
+    It relies on SIGALRM, so nothing is limited, if seconds are None or it is used outside the main thread.
+    """
+    if seconds is None or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    old_handler = signal.signal(signal.SIGALRM, handle_term)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, old_handler)